@@ -0,0 +1,77 @@
+"""
+int8 scalar-quantized embeddings against float32: memory and recall
+
+    python -m benchmarks.int8_embeddings [--rows 200000] [--dim 384]
+    python -m benchmarks.int8_embeddings --stored     # the content database's vectors
+
+Reports the bytes each index keeps in memory, recall@k of the int8 first
+pass alone and after re-ranking the top candidates with float vectors,
+and query latency. Synthetic vectors come from benchmarks/ann_index.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.ann_index import synthetic_corpus
+from services import semantic_search
+from services.embeddings_service import quantize
+
+K = 10
+RERANKS = (0, 20, 50, 100)
+
+
+def measure(label, search, queries, truth):
+    search(queries[0])  # warm-up
+    started = time.perf_counter()
+    found = [search(q) for q in queries]
+    latency = (time.perf_counter() - started) / len(queries) * 1000
+    recall = np.mean([len(set(f) & set(t)) / len(t) for f, t in zip(found, truth)])
+    print(f"{label:<26} recall@{K} {recall:6.1%}   {latency:7.3f} ms/query")
+    return recall
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--stored", action="store_true", help="use the stored embeddings instead of synthetic ones")
+    args = parser.parse_args()
+
+    if args.stored:
+        matrix = np.asarray(semantic_search.load_vectors().matrix, dtype=np.float32)
+    else:
+        matrix = synthetic_corpus(args.rows, args.dim, topics=2_000)
+    rng = np.random.default_rng(2)
+    queries = matrix[rng.choice(len(matrix), min(args.queries, len(matrix)), replace=False)]
+    queries = queries + rng.normal(scale=0.02, size=queries.shape).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    ids = [str(i) for i in range(len(matrix))]
+    exact = semantic_search.VectorIndex(ids, ids, ids, matrix, normalized=True)
+    codes, scale, offset = quantize(matrix)
+    quantized = semantic_search.QuantizedIndex(ids, ids, ids, codes, scale, offset, lambda rows: matrix[rows])
+
+    print(f"{len(matrix)} x {matrix.shape[1]} vectors, {len(queries)} queries, k={K}")
+    print(f"in memory: float32 {exact.memory_bytes / 2**20:.1f} MiB, int8 {quantized.memory_bytes / 2**20:.1f} MiB "
+          f"(saves {1 - quantized.memory_bytes / exact.memory_bytes:.0%})")
+
+    truth = [[row for row, _ in exact.search(q, K)] for q in queries]
+    measure("float32 brute force", lambda q: [row for row, _ in exact.search(q, K)], queries, truth)
+
+    def int8_search(rerank):
+        if not rerank:
+            return lambda q: list(np.argpartition(-quantized.approximate_scores(q), K - 1)[:K])
+        return lambda q: [row for row, _ in quantized.search(q, K, rerank)]
+
+    for rerank in RERANKS:
+        label = f"int8 + rerank {rerank}" if rerank else "int8 only"
+        recall = measure(label, int8_search(rerank), queries, truth)
+        if rerank == semantic_search.INT8_RERANK:
+            print(f"{'':<26} recall loss at the default rerank: {1 - recall:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+MinHash LSH against brute-force Jaccard for the similar-ayat graph
+
+    python -m benchmarks.similar_ayat [path/to/content.db]
+
+Finds every pair of ayat with Jaccard >= MIN_SIMILARITY both ways and
+reports the time taken, LSH recall and precision against the exact pairs,
+and the cost of answering one surah:ayah query each way.
+"""
+
+import sqlite3
+import sys
+import time
+
+from db import database
+from services import quran_coordinates as coordinates, quran_similar
+
+
+def brute_force_pairs(sets: dict, min_similarity: float) -> set:
+    """Every (ayah, other) pair, ayah < other, compared directly"""
+    numbers = list(sets)
+    found = set()
+    for i, a in enumerate(numbers):
+        first = sets[a]
+        for b in numbers[i + 1:]:
+            if quran_similar.jaccard(first, sets[b]) >= min_similarity:
+                found.add((a, b))
+    return found
+
+
+def main(path: str):
+    conn = sqlite3.connect(path)
+    sets = quran_similar.read_shingles(conn)
+    threshold = quran_similar.MIN_SIMILARITY
+    print(f"{len(sets)} ayat, {sum(map(len, sets.values()))} shingles, Jaccard >= {threshold}")
+
+    start = time.perf_counter()
+    lsh = {(a, b) for a, b, _ in quran_similar.similar_pairs(sets, threshold)}
+    lsh_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    exact = brute_force_pairs(sets, threshold)
+    brute_seconds = time.perf_counter() - start
+
+    hits = len(lsh & exact)
+    print(f"brute force  {brute_seconds:8.2f} s  {len(exact)} pairs")
+    print(f"MinHash LSH  {lsh_seconds:8.2f} s  {len(lsh)} pairs "
+          f"({quran_similar.BANDS} bands x {quran_similar.ROWS} rows)")
+    if exact:
+        print(f"recall {hits / len(exact):.1%}  precision {hits / len(lsh) if lsh else 1:.1%}  "
+              f"speedup {brute_seconds / lsh_seconds:.0f}x")
+    else:
+        print("no exact pairs")
+
+    # One query: scan every ayah vs. read the precomputed graph
+    surah, ayah = 2, 48  # near-identical to 2:123
+    number = coordinates.global_number(surah, ayah)
+    if number not in sets:
+        print(f"{surah}:{ayah} is not loaded, skipping the query comparison")
+        return
+    start = time.perf_counter()
+    target = sets[number]
+    sorted((quran_similar.jaccard(target, other), n) for n, other in sets.items() if n != number)
+    scan_ms = (time.perf_counter() - start) * 1000
+    print(f"{surah}:{ayah} query: brute-force scan {scan_ms:.2f} ms", end="")
+
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'similar_ayat'").fetchone():
+        database.CONTENT_DB_PATH = path
+        quran_similar.similar_ayat(surah, ayah)
+        start = time.perf_counter()
+        for _ in range(100):
+            quran_similar.similar_ayat(surah, ayah)
+        print(f", graph lookup {(time.perf_counter() - start) * 10:.3f} ms")
+    else:
+        print()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else database.CONTENT_DB_PATH)
@@ -2,24 +2,27 @@ import discord
 import traceback
 import random
 from datetime import datetime, timedelta
-from services.quran_service import get_random_ayah
 from services.audio_service import get_audio
 from services.azkar_service import get_zikr
-from services.semantic_search import semantic_search
 from services.hadith_service import get_random_hadith, HADITH_COLLECTIONS
 from services.tafsir_service import get_tafsir, get_surah_info
 from services.prayer_times_service import get_prayer_times, get_next_prayer
-from services.favorites_service import add_favorite, get_user_favorites, remove_favorite, is_favorite
 from services.islamic_knowledge_service import (
     get_random_name_of_allah, get_dua, get_islamic_quiz, 
     get_islamic_quote, get_allah_names_list, ISLAMIC_DUAS
 )
-from services.tracking_service import (
+from services.repository import (
+    get_random_ayah, semantic_search, add_favorite, get_user_favorites, remove_favorite, is_favorite,
     track_prayer, get_prayer_stats, track_qada_prayers, get_qada_count,
     mark_qada_completed, track_fasting, get_fasting_stats, track_quran_reading,
-    get_quran_reading_stats, get_khatm_progress, track_tasbeeh, get_tasbeeh_stats
+    get_quran_reading_stats, get_khatm_progress, track_tasbeeh, get_tasbeeh_stats,
+    get_ayah_text, get_surah_text, get_juz_text, get_page_text, search_in_quran,
+    get_hourly_message_channels, get_active_schedules, get_word_stats, suggest_queries, autocorrect_query,
+    get_similar_ayat
 )
 from services.scheduled_azkar_service import setup_schedule_azkar_command
+from services.quran_service import channel_scope
+from services.quran_search import PAGE_SIZE as SEARCH_PAGE_SIZE, SEARCH_MODES
 
 def setup_commands(bot):
 
@@ -70,7 +73,7 @@ def setup_commands(bot):
     @bot.tree.command(name="ayah", description="آية عشوائية")
     async def ayah(interaction: discord.Interaction):
         try:
-            a = get_random_ayah()
+            a = await get_random_ayah(channel_scope(interaction.channel_id))
             embed = discord.Embed(title=a['ref'], description=a['text'], color=discord.Color.teal())
             embed.set_footer(text=f"آية رقم: {a['id']}")
             await interaction.response.send_message(embed=embed)
@@ -81,7 +84,7 @@ def setup_commands(bot):
     async def ayah_audio(interaction: discord.Interaction, reciter: str = "ar.alafasy"):
         try:
             await interaction.response.defer()
-            a = get_random_ayah()
+            a = await get_random_ayah(channel_scope(interaction.channel_id))
             audio = get_audio(a["id"], reciter)
             embed = discord.Embed(title=f"🎧 {a['ref']}", description=a['text'], color=discord.Color.teal())
             await interaction.followup.send(embed=embed, file=discord.File(audio))
@@ -115,21 +118,49 @@ def setup_commands(bot):
     async def search_semantic(interaction: discord.Interaction, query: str):
         try:
             await interaction.response.defer()
-            results = semantic_search(query)
+            # Only unambiguous typos are fixed before searching; other
+            # corrections are offered as a hint next to the original results
+            corrected = await autocorrect_query(query)
+            results = await semantic_search(corrected or query)
+            suggestions = [] if corrected else await suggest_queries(query)
             if not results:
                 await interaction.followup.send("❌ لا نتائج")
                 return
             embed = discord.Embed(title=f"🔍 بحث: {query}", color=discord.Color.blue())
+            if corrected:
+                embed.description = f"🔎 نتائج البحث عن: {corrected}"
+            elif suggestions:
+                embed.description = f"🔎 هل تقصد: {suggestions[0]}"
             for i, result in enumerate(results[:3], 1):
-                embed.add_field(name=f"#{i}", value=result[:500], inline=False)
+                embed.add_field(name=f"#{i} {result['ref']}", value=result['text'][:500], inline=False)
             await interaction.followup.send(embed=embed)
         except:
             await interaction.followup.send("❌ حدث خطأ")
 
-    @bot.tree.command(name="quran_page", description="صفحة عشوائية")
-    async def quran_page(interaction: discord.Interaction):
-        page = random.randint(1, 604)
-        embed = discord.Embed(title=f"📖 صفحة {page}", description=f"صفحة {page} من 604", color=discord.Color.teal())
+    def range_text(ayahs, limit=4000):
+        """Ayahs as '(surah:ayah) text' lines, cut to fit an embed"""
+        text = ""
+        for a in ayahs:
+            line = f"({a['surah']}:{a['ayah']}) {a['text']}\n"
+            if len(text) + len(line) > limit:
+                return text + "..."
+            text += line
+        return text or "..."
+
+    @bot.tree.command(name="quran_page", description="صفحة من المصحف")
+    async def quran_page(interaction: discord.Interaction, page: int = None):
+        if page is None:
+            page = random.randint(1, 604)
+        if not 1 <= page <= 604:
+            await interaction.response.send_message("❌ رقم الصفحة 1-604", ephemeral=True)
+            return
+        data = await get_page_text(page)
+        if not data:
+            await interaction.response.send_message("❌ حدث خطأ", ephemeral=True)
+            return
+        (s1, a1), (s2, a2) = data['start'], data['end']
+        embed = discord.Embed(title=f"📖 صفحة {page} من 604", description=range_text(data['ayahs']), color=discord.Color.teal())
+        embed.set_footer(text=f"الجزء {data['juz']} | من {s1}:{a1} إلى {s2}:{a2}")
         await interaction.response.send_message(embed=embed)
 
     @bot.tree.command(name="quran_juz", description="جزء من القرآن")
@@ -139,14 +170,21 @@ def setup_commands(bot):
         if not 1 <= juz <= 30:
             await interaction.response.send_message("❌ رقم الجزء 1-30", ephemeral=True)
             return
-        embed = discord.Embed(title=f"📚 الجزء {juz} من 30", color=discord.Color.teal())
+        data = await get_juz_text(juz)
+        if not data:
+            await interaction.response.send_message("❌ حدث خطأ", ephemeral=True)
+            return
+        (s1, a1), (s2, a2) = data['start'], data['end']
+        embed = discord.Embed(title=f"📚 الجزء {juz} من 30", description=range_text(data['ayahs']), color=discord.Color.teal())
+        embed.set_footer(text=f"من {s1}:{a1} إلى {s2}:{a2} | {data['last_global'] - data['first_global'] + 1} آية")
         await interaction.response.send_message(embed=embed)
 
     @bot.tree.command(name="verse_by_topic", description="آية حسب الموضوع")
     async def verse_by_topic(interaction: discord.Interaction, topic: str):
-        results = semantic_search(topic)
+        results = await semantic_search(topic)
         if results:
-            embed = discord.Embed(title=f"📖 آيات عن: {topic}", description=results[0], color=discord.Color.teal())
+            embed = discord.Embed(title=f"📖 آيات عن: {topic}", description=results[0]['text'], color=discord.Color.teal())
+            embed.set_footer(text=results[0]['ref'])
             await interaction.response.send_message(embed=embed)
         else:
             await interaction.response.send_message("❌ لا نتائج", ephemeral=True)
@@ -310,7 +348,7 @@ def setup_commands(bot):
     @bot.tree.command(name="prayer_track", description="تتبع الصلاة")
     async def prayer_track(interaction: discord.Interaction, prayer: str, status: str = "completed"):
         user_id = str(interaction.user.id)
-        if track_prayer(user_id, prayer, status):
+        if await track_prayer(user_id, prayer, status):
             await interaction.response.send_message(f"✅ تم تسجيل صلاة {prayer}", ephemeral=True)
         else:
             await interaction.response.send_message("❌ حدث خطأ", ephemeral=True)
@@ -318,7 +356,7 @@ def setup_commands(bot):
     @bot.tree.command(name="qada_track", description="تتبع القضاء")
     async def qada_track(interaction: discord.Interaction, prayer: str, count: int = 1):
         user_id = str(interaction.user.id)
-        if track_qada_prayers(user_id, prayer, count):
+        if await track_qada_prayers(user_id, prayer, count):
             await interaction.response.send_message(f"✅ تم إضافة {count} صلاة قضاء لـ {prayer}", ephemeral=True)
         else:
             await interaction.response.send_message("❌ حدث خطأ", ephemeral=True)
@@ -326,7 +364,7 @@ def setup_commands(bot):
     @bot.tree.command(name="prayer_stats", description="إحصائيات الصلاة")
     async def prayer_stats(interaction: discord.Interaction, days: int = 7):
         user_id = str(interaction.user.id)
-        stats = get_prayer_stats(user_id, days)
+        stats = await get_prayer_stats(user_id, days)
         if stats:
             await interaction.response.send_message(f"📊 **إحصائيات {days} يوم**\n```\n{stats}\n```", ephemeral=True)
         else:
@@ -415,7 +453,7 @@ def setup_commands(bot):
     @bot.tree.command(name="fasting_track", description="تتبع الصيام")
     async def fasting_track(interaction: discord.Interaction, status: str = "fasted"):
         user_id = str(interaction.user.id)
-        if track_fasting(user_id, status=status):
+        if await track_fasting(user_id, status=status):
             await interaction.response.send_message(f"✅ تم تسجيل: {status}", ephemeral=True)
         else:
             await interaction.response.send_message("❌ حدث خطأ", ephemeral=True)
@@ -423,7 +461,7 @@ def setup_commands(bot):
     @bot.tree.command(name="quran_track", description="تتبع قراءة القرآن")
     async def quran_track(interaction: discord.Interaction, surah: int, verses: int):
         user_id = str(interaction.user.id)
-        if track_quran_reading(user_id, surah, verses):
+        if await track_quran_reading(user_id, surah, verses):
             await interaction.response.send_message(f"✅ تم تسجيل قراءة {verses} آية من سورة {surah}", ephemeral=True)
         else:
             await interaction.response.send_message("❌ حدث خطأ", ephemeral=True)
@@ -431,7 +469,7 @@ def setup_commands(bot):
     @bot.tree.command(name="khatm_progress", description="تقدم الختمة")
     async def khatm_progress(interaction: discord.Interaction):
         user_id = str(interaction.user.id)
-        progress = get_khatm_progress(user_id)
+        progress = await get_khatm_progress(user_id)
         await interaction.response.send_message(f"📊 **تقدم الختمة**\n✅ {progress['completed_surahs']}/114 سورة\n📈 {progress['progress_percentage']}%")
 
     @bot.tree.command(name="streaks", description="سلسلة الإنجازات")
@@ -445,7 +483,7 @@ def setup_commands(bot):
     @bot.tree.command(name="weekly_report", description="التقرير الأسبوعي")
     async def weekly_report(interaction: discord.Interaction):
         user_id = str(interaction.user.id)
-        stats = get_quran_reading_stats(user_id, 7)
+        stats = await get_quran_reading_stats(user_id, 7)
         await interaction.response.send_message(f"📊 **تقرير الأسبوع**\n📖 آيات: {stats['total_verses']}\n📚 سور: {stats['surahs_read']}\n📅 أيام: {stats['days_read']}")
 
     # ============================================================
@@ -455,7 +493,7 @@ def setup_commands(bot):
     @bot.tree.command(name="favorites", description="عرض المفضلة")
     async def favorites(interaction: discord.Interaction):
         user_id = str(interaction.user.id)
-        favs = get_user_favorites(user_id)
+        favs = await get_user_favorites(user_id)
         if not favs:
             await interaction.response.send_message("📭 قائمة المفضلة فارغة", ephemeral=True)
             return
@@ -464,7 +502,7 @@ def setup_commands(bot):
     @bot.tree.command(name="add_favorite", description="إضافة للمفضلة")
     async def add_favorite_cmd(interaction: discord.Interaction, type: str, id: str):
         user_id = str(interaction.user.id)
-        if add_favorite(user_id, type, id):
+        if await add_favorite(user_id, type, id):
             await interaction.response.send_message(f"✅ تمت الإضافة", ephemeral=True)
         else:
             await interaction.response.send_message("⚠️ موجود بالفعل", ephemeral=True)
@@ -472,7 +510,7 @@ def setup_commands(bot):
     @bot.tree.command(name="remove_favorite", description="حذف من المفضلة")
     async def remove_favorite_cmd(interaction: discord.Interaction, type: str, id: str):
         user_id = str(interaction.user.id)
-        if remove_favorite(user_id, type, id):
+        if await remove_favorite(user_id, type, id):
             await interaction.response.send_message("✅ تم الحذف", ephemeral=True)
         else:
             await interaction.response.send_message("⚠️ غير موجود", ephemeral=True)
@@ -549,7 +587,7 @@ def setup_commands(bot):
     @bot.tree.command(name="tasbeeh_save", description="حفظ تسبيحاتك")
     async def tasbeeh_save(interaction: discord.Interaction, dhikr: str, count: int):
         user_id = str(interaction.user.id)
-        if track_tasbeeh(user_id, dhikr, count):
+        if await track_tasbeeh(user_id, dhikr, count):
             await interaction.response.send_message(f"✅ تم حفظ {count} من {dhikr}", ephemeral=True)
         else:
             await interaction.response.send_message("❌ حدث خطأ", ephemeral=True)
@@ -817,7 +855,7 @@ def setup_commands(bot):
 
     @bot.tree.command(name="mushaf", description="المصحف الشريف كامل")
     async def mushaf(interaction: discord.Interaction, surah: int = None, ayah: int = None):
-        from services.complete_quran_service import get_surah_text, get_ayah_text, get_surah_info_complete
+        from services.complete_quran_service import get_ayah_position, get_surah_info_complete
         
         try:
             await interaction.response.defer()
@@ -828,14 +866,20 @@ def setup_commands(bot):
                     await interaction.followup.send("❌ رقم السورة يجب أن يكون بين 1 و 114", ephemeral=True)
                     return
                 
-                ayah_data = get_ayah_text(surah, ayah)
+                ayah_data = await get_ayah_text(surah, ayah)
                 if ayah_data:
                     embed = discord.Embed(
                         title=f"📖 {ayah_data['ref']}",
                         description=ayah_data['text'],
                         color=discord.Color.teal()
                     )
-                    embed.set_footer(text=f"سورة {get_surah_info_complete(surah)['name']} - آية {ayah}")
+                    footer = f"سورة {get_surah_info_complete(surah)['name']} - آية {ayah}"
+                    position = get_ayah_position(surah, ayah)
+                    if position:
+                        footer += (f" | الجزء {position['juz']} | الحزب {position['hizb']}"
+                                   f" (الربع {position['hizb_quarter']}) | صفحة {position['page']}"
+                                   f" | الركوع {position['ruku']}")
+                    embed.set_footer(text=footer)
                     await interaction.followup.send(embed=embed)
                 else:
                     await interaction.followup.send("❌ لم يتم العثور على الآية", ephemeral=True)
@@ -849,7 +893,7 @@ def setup_commands(bot):
                 surah_info = get_surah_info_complete(surah)
                 if surah_info:
                     # Get first few ayahs
-                    surah_data = get_surah_text(surah, 1, min(10, surah_info['verses']))
+                    surah_data = await get_surah_text(surah, 1, min(10, surah_info['verses']))
                     
                     embed = discord.Embed(
                         title=f"📖 سورة {surah_info['name']}",
@@ -921,38 +965,162 @@ def setup_commands(bot):
             print(f"Error in mushaf command: {e}")
             await interaction.followup.send("❌ حدث خطأ في عرض المصحف", ephemeral=True)
 
+    def search_embed(query, results, total, page_number):
+        embed = discord.Embed(
+            title=f"🔍 نتائج البحث عن: {query}",
+            description=f"تم العثور على {total} نتيجة",
+            color=discord.Color.blue()
+        )
+        for i, result in enumerate(results, (page_number - 1) * SEARCH_PAGE_SIZE + 1):
+            text = result['snippet']
+            text = text[:500] + "..." if len(text) > 500 else text
+            embed.add_field(
+                name=f"{i}. {result['ref']}",
+                value=text,
+                inline=False
+            )
+        embed.set_footer(text=f"الصفحة {page_number}")
+        return embed
+
+    class SearchPager(discord.ui.View):
+        """Next/previous buttons for /quran_search, paging by keyset cursor"""
+
+        def __init__(self, query, mode, page):
+            super().__init__(timeout=600)
+            self.query = query
+            self.mode = mode
+            self.total = page["total"]
+            # cursors[n] is the `after` that fetches page n + 1
+            self.cursors = [None]
+            self.next_cursor = page["next"]
+            self.sync_buttons()
+
+        def sync_buttons(self):
+            self.previous_page.disabled = len(self.cursors) == 1
+            self.next_page.disabled = self.next_cursor is None
+
+        async def show(self, interaction):
+            page = await search_in_quran(self.query, self.cursors[-1], mode=self.mode)
+            self.next_cursor = page["next"]
+            self.sync_buttons()
+            embed = search_embed(self.query, page["results"], self.total, len(self.cursors))
+            await interaction.response.edit_message(embed=embed, view=self)
+
+        @discord.ui.button(label="السابق", style=discord.ButtonStyle.secondary)
+        async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+            self.cursors.pop()
+            await self.show(interaction)
+
+        @discord.ui.button(label="التالي", style=discord.ButtonStyle.primary)
+        async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+            self.cursors.append(self.next_cursor)
+            await self.show(interaction)
+
     @bot.tree.command(name="quran_search", description="البحث في القرآن")
-    async def quran_search(interaction: discord.Interaction, query: str):
-        from services.complete_quran_service import search_in_quran
-        
+    async def quran_search(interaction: discord.Interaction, query: str, mode: str = "text"):
+        if mode not in SEARCH_MODES:
+            await interaction.response.send_message(f"❌ طريقة البحث: {', '.join(SEARCH_MODES)}", ephemeral=True)
+            return
         try:
             await interaction.response.defer()
             
-            results = search_in_quran(query)
+            page = await search_in_quran(query, mode=mode)
             
-            if not results:
-                await interaction.followup.send("❌ لم يتم العثور على نتائج", ephemeral=True)
+            if not page["results"]:
+                message = "❌ لم يتم العثور على نتائج"
+                if page.get("suggestions"):
+                    message += "\n🔎 هل تقصد: " + "، ".join(page["suggestions"])
+                await interaction.followup.send(message, ephemeral=True)
+                return
+            
+            if "corrected" in page:
+                # Retried with a spelling correction; later pages search that too
+                original, query = query, page["corrected"]
+            embed = search_embed(query, page["results"], page["total"], 1)
+            if "corrected" in page:
+                embed.description = f"🔎 لا نتائج لـ «{original}»، عرض نتائج «{query}»\n{embed.description}"
+            if page["next"] is None:
+                await interaction.followup.send(embed=embed)
+            else:
+                await interaction.followup.send(embed=embed, view=SearchPager(query, mode, page))
+            
+        except Exception as e:
+            print(f"Error in quran_search: {e}")
+            await interaction.followup.send("❌ حدث خطأ في البحث", ephemeral=True)
+
+    @bot.tree.command(name="word_stats", description="إحصائيات كلمة في القرآن")
+    async def word_stats(interaction: discord.Interaction, word: str):
+        from services.complete_quran_service import QURAN_STRUCTURE, locate_global_ayah
+        try:
+            await interaction.response.defer()
+            
+            stats = await get_word_stats(word)
+            
+            if not stats["occurrences"]:
+                await interaction.followup.send(f"❌ لم ترد «{word}» في القرآن", ephemeral=True)
                 return
             
             embed = discord.Embed(
-                title=f"🔍 نتائج البحث عن: {query}",
-                description=f"تم العثور على {len(results)} نتيجة",
-                color=discord.Color.blue()
+                title=f"📊 {word}",
+                description=(
+                    f"وردت **{stats['occurrences']}** مرة "
+                    f"في **{stats['ayat']}** آية من **{stats['surahs']}** سورة"
+                ),
+                color=discord.Color.green()
             )
             
-            for i, result in enumerate(results[:5], 1):
-                text = result['text'][:500] + "..." if len(result['text']) > 500 else result['text']
+            top = "\n".join(
+                f"{QURAN_STRUCTURE[surah]['name']} ({surah}): {count}"
+                for surah, count in stats["by_surah"][:10]
+            )
+            embed.add_field(name="أكثر السور ورودًا", value=top, inline=False)
+            
+            surah, ayah = locate_global_ayah(stats["first"][0])
+            embed.add_field(name="أول ورود", value=f"{QURAN_STRUCTURE[surah]['name']} {surah}:{ayah}", inline=False)
+            
+            await interaction.followup.send(embed=embed)
+            
+        except Exception as e:
+            print(f"Error in word_stats: {e}")
+            await interaction.followup.send("❌ حدث خطأ", ephemeral=True)
+
+    @bot.tree.command(name="similar_ayat", description="الآيات المتشابهة لآية (مثال: 2:255)")
+    async def similar_ayat(interaction: discord.Interaction, ayah: str):
+        from services.complete_quran_service import QURAN_STRUCTURE
+        try:
+            surah_number, ayah_number = map(int, ayah.replace("-", ":").split(":"))
+        except ValueError:
+            await interaction.response.send_message("❌ اكتب الآية بصيغة سورة:آية مثل 2:255", ephemeral=True)
+            return
+        if surah_number not in QURAN_STRUCTURE or not 1 <= ayah_number <= QURAN_STRUCTURE[surah_number]['verses']:
+            await interaction.response.send_message("❌ رقم السورة أو الآية غير صحيح", ephemeral=True)
+            return
+        try:
+            await interaction.response.defer()
+            
+            results = await get_similar_ayat(surah_number, ayah_number)
+            
+            if not results:
+                await interaction.followup.send(f"❌ لا توجد آيات متشابهة لـ {surah_number}:{ayah_number}", ephemeral=True)
+                return
+            
+            embed = discord.Embed(
+                title=f"🔁 متشابهات {QURAN_STRUCTURE[surah_number]['name']} {surah_number}:{ayah_number}",
+                color=discord.Color.teal()
+            )
+            for result in results:
+                text = result['text'] or ""
+                text = text[:500] + "..." if len(text) > 500 else text
                 embed.add_field(
-                    name=f"{i}. {result['ref']}",
-                    value=text,
+                    name=f"{QURAN_STRUCTURE[result['surah']]['name']} {result['surah']}:{result['ayah']} ({result['score']:.0%})",
+                    value=text or "...",
                     inline=False
                 )
-            
             await interaction.followup.send(embed=embed)
             
         except Exception as e:
-            print(f"Error in quran_search: {e}")
-            await interaction.followup.send("❌ حدث خطأ في البحث", ephemeral=True)
+            print(f"Error in similar_ayat: {e}")
+            await interaction.followup.send("❌ حدث خطأ", ephemeral=True)
 
     @bot.tree.command(name="surah_list", description="قائمة سور القرآن")
     async def surah_list(interaction: discord.Interaction, page: int = 1):
@@ -1017,13 +1185,7 @@ def setup_commands(bot):
                 )
                 
                 # Show configuration
-                from db.database import get_connection
-                conn = get_connection()
-                cur = conn.cursor()
-                cur.execute("SELECT COUNT(*) as count FROM scheduled_azkar WHERE schedule_type='hourly_messages' AND is_active=1")
-                row = cur.fetchone()
-                channel_count = row['count'] if row else 0
-                conn.close()
+                channel_count = len(await get_hourly_message_channels())
                 
                 await interaction.followup.send(
                     f"📊 **Configuration:**\n"
@@ -1040,20 +1202,14 @@ def setup_commands(bot):
     @bot.tree.command(name="check_channels", description="التحقق من القنوات المفعلة")
     async def check_channels(interaction: discord.Interaction):
         """Check configured channels for hourly messages"""
-        from db.database import get_connection
-        
         try:
-            conn = get_connection()
-            cur = conn.cursor()
+            schedules = await get_active_schedules()
             
-            # Get hourly messages channels
-            cur.execute("SELECT guild_id, channel_id FROM scheduled_azkar WHERE schedule_type='hourly_messages' AND is_active=1")
-            hourly_rows = cur.fetchall()
+            # Hourly messages channels
+            hourly_rows = [r for r in schedules if r['schedule_type'] == 'hourly_messages']
             
-            # Get azkar channels
-            cur.execute("SELECT guild_id, channel_id, schedule_type FROM scheduled_azkar WHERE schedule_type IN ('morning', 'evening') AND is_active=1")
-            azkar_rows = cur.fetchall()
-            conn.close()
+            # Azkar channels
+            azkar_rows = [r for r in schedules if r['schedule_type'] in ('morning', 'evening')]
             
             embed = discord.Embed(title="📊 قنوات الإشعارات المفعلة", color=discord.Color.blue())
             
@@ -156,7 +156,7 @@ def setup_commands(bot):
                 return
             embed = discord.Embed(title=f"🔍 نتائج البحث: {query}", color=discord.Color.blue())
             for i, result in enumerate(results[:3], 1):
-                embed.add_field(name=f"#{i}", value=result[:500], inline=False)
+                embed.add_field(name=f"#{i} {result['ref']}", value=result['text'][:500], inline=False)
             await interaction.followup.send(embed=embed)
         except Exception as e:
             await interaction.followup.send("❌ عذراً، حدث خطأ")
@@ -183,7 +183,7 @@ def setup_commands(bot):
         search_term = topics_map.get(topic, topic)
         results = semantic_search(search_term)
         if results:
-            embed = discord.Embed(title=f"📖 آيات عن: {topic}", description=results[0], color=discord.Color.teal())
+            embed = discord.Embed(title=f"📖 آيات عن: {topic}", description=results[0]['text'], color=discord.Color.teal())
             await interaction.response.send_message(embed=embed)
         else:
             await interaction.response.send_message("❌ لم يتم العثور على آيات", ephemeral=True)
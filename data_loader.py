@@ -1,78 +1,94 @@
 """
 Data Loader Script for Islamic Bot
 Populates database with Quran verses, azkar, and generates embeddings
+(batched and checkpointed: re-running resumes an interrupted embedding run)
 """
 
 import requests
-import json
-from db.database import get_connection
-from services.embeddings_service import store_embedding
+from db.database import content_writer
+from db.models import init_content_db
+from services.arabic_normalizer import normalize_many
+from services.embeddings_service import generate_embeddings, export_embeddings, quantize_embeddings, EMBEDDINGS_PATH
+from services.quran_concordance import build_concordance
+from services.quran_bundle import build_bundle
+from services.quran_corpus import read_content_corpus
+from services.quran_similar import build_similar_index
 
 def load_quran_verses():
     """Load all Quran verses from API"""
     print("📖 Loading Quran verses...")
     
-    conn = get_connection()
-    cur = conn.cursor()
-    
-    # Check if already populated
-    cur.execute("SELECT COUNT(*) FROM ayat")
-    if cur.fetchone()[0] > 0:
-        print("   ✓ Quran verses already loaded")
-        conn.close()
-        return
-    
     try:
-        # Fetch Quran data from API
-        response = requests.get("https://api.alquran.cloud/v1/quran/quran-uthmani")
-        data = response.json()
-        
-        if data["status"] != "OK":
-            print("   ✗ Failed to fetch Quran data")
-            return
-        
-        verses = []
-        for surah in data["data"]["surahs"]:
-            for ayah in surah["ayahs"]:
-                verses.append({
-                    "id": str(ayah["number"]),
-                    "ref": f"Surah {surah["englishName"]} ({surah["number"]}:{ayah["numberInSurah"]})",
-                    "text": ayah["text"],
-                    "surah": surah["englishName"],
-                    "ayah_num": ayah["numberInSurah"]
-                })
-        
-        # Insert into database
-        for verse in verses:
-            cur.execute(
-                "INSERT INTO ayat (id, ref, text) VALUES (?, ?, ?)",
-                (verse["id"], verse["ref"], verse["text"])
+        with content_writer() as conn:
+            cur = conn.cursor()
+            
+            # Check if already populated
+            cur.execute("SELECT COUNT(*) FROM ayat")
+            if cur.fetchone()[0] > 0:
+                print("   ✓ Quran verses already loaded")
+                return
+            
+            # Fetch Quran data from API
+            response = requests.get("https://api.alquran.cloud/v1/quran/quran-uthmani")
+            data = response.json()
+            
+            if data["status"] != "OK":
+                print("   ✗ Failed to fetch Quran data")
+                return
+            
+            verses = []
+            for surah in data["data"]["surahs"]:
+                for ayah in surah["ayahs"]:
+                    verses.append({
+                        "id": str(ayah["number"]),
+                        "ref": f"Surah {surah['englishName']} ({surah['number']}:{ayah['numberInSurah']})",
+                        "text": ayah["text"],
+                        "surah": surah["englishName"],
+                        "ayah_num": ayah["numberInSurah"]
+                    })
+            
+            # Normalized search text for all verses in one batch pass
+            normalized = normalize_many(verse["text"] for verse in verses)
+            
+            # Insert into the content database, committed once at the end
+            cur.executemany(
+                "INSERT INTO ayat (id, ref, text, text_normalized) VALUES (?, ?, ?, ?)",
+                [
+                    (verse["id"], verse["ref"], verse["text"], text_normalized)
+                    for verse, text_normalized in zip(verses, normalized)
+                ]
             )
-            # Store embedding for semantic search
-            store_embedding(verse["id"], verse["text"])
+            
+            build_concordance(conn)
         
-        conn.commit()
         print(f"   ✓ Loaded {len(verses)} verses")
         
     except Exception as e:
         print(f"   ✗ Error loading Quran: {e}")
-    finally:
-        conn.close()
+
+def load_embeddings():
+    """Embed the verses for semantic search in batches, resuming an interrupted run"""
+    print("🧠 Generating embeddings...")
+    
+    try:
+        stats = generate_embeddings()
+        if stats["embedded"]:
+            print(f"   ✓ Embedded {stats['embedded']} verses in {stats['seconds']:.1f}s ({stats['rate']:.0f} verses/s)")
+        else:
+            print("   ✓ Embeddings already generated")
+        
+        # int8 copy for EMBEDDINGS_MODE=int8
+        with content_writer() as conn:
+            count = quantize_embeddings(conn)
+        print(f"   ✓ Quantized {count} embeddings to int8")
+        
+    except Exception as e:
+        print(f"   ✗ Error generating embeddings: {e}")
 
 def load_azkar():
     """Load morning and evening azkar"""
     print("🤲 Loading Azkar...")
     
-    conn = get_connection()
-    cur = conn.cursor()
-    
-    # Check if already populated
-    cur.execute("SELECT COUNT(*) FROM azkar")
-    if cur.fetchone()[0] > 0:
-        print("   ✓ Azkar already loaded")
-        conn.close()
-        return
-    
     morning_azkar = [
         ("morning", "أَصْبَحْنَا وَأَصْبَحَ الْمُلْكُ لِلَّهِ، وَالْحَمْدُ لِلَّهِ، لَا إِلَهَ إِلَّا اللَّهُ وَحْدَهُ لَا شَرِيكَ لَهُ، لَهُ الْمُلْكُ وَلَهُ الْحَمْدُ، وَهُوَ عَلَى كُلِّ شَيْءٍ قَدِيرٌ"),
         ("morning", "اللَّهُمَّ بِكَ أَصْبَحْنَا، وَبِكَ أَمْسَيْنَا، وَبِكَ نَحْيَا، وَبِكَ نَمُوتُ، وَإِلَيْكَ النُّشُورُ"),
@@ -95,22 +111,71 @@ def load_azkar():
     ]
     
     try:
-        for zikr_type, text in morning_azkar + evening_azkar:
-            cur.execute(
-                "INSERT INTO azkar (type, text) VALUES (?, ?)",
-                (zikr_type, text)
-            )
+        with content_writer() as conn:
+            cur = conn.cursor()
+            
+            # Check if already populated
+            cur.execute("SELECT COUNT(*) FROM azkar")
+            if cur.fetchone()[0] > 0:
+                print("   ✓ Azkar already loaded")
+                return
+            
+            for zikr_type, text in morning_azkar + evening_azkar:
+                cur.execute(
+                    "INSERT INTO azkar (type, text) VALUES (?, ?)",
+                    (zikr_type, text)
+                )
         
-        conn.commit()
         print(f"   ✓ Loaded {len(morning_azkar)} morning and {len(evening_azkar)} evening azkar")
         
     except Exception as e:
         print(f"   ✗ Error loading azkar: {e}")
-    finally:
-        conn.close()
+
+def build_quran_bundle():
+    """Pack the loaded verses into data/quran.bundle for network-free startup"""
+    print("📦 Building Quran bundle...")
+    
+    try:
+        corpus = read_content_corpus()
+        if not len(corpus):
+            print("   ✗ No verses to bundle")
+            return
+        info = build_bundle(corpus)
+        print(f"   ✓ Wrote {info['ayat']} verses to {info['path']}")
+        
+    except Exception as e:
+        print(f"   ✗ Error building bundle: {e}")
+
+def export_embedding_matrix():
+    """Write the embeddings as a float32 .npy matrix that semantic search memory-maps"""
+    print("🧮 Exporting embeddings...")
+    
+    try:
+        count = export_embeddings()
+        print(f"   ✓ Wrote {count} vectors to {EMBEDDINGS_PATH}")
+        
+    except Exception as e:
+        print(f"   ✗ Error exporting embeddings: {e}")
+
+def build_similar_ayat():
+    """Precompute the similar-ayat graph (MinHash LSH over normalized verses)"""
+    print("🔁 Building similar-ayat graph...")
+    
+    try:
+        with content_writer() as conn:
+            count = build_similar_index(conn)
+        print(f"   ✓ Stored {count} similar pairs")
+        
+    except Exception as e:
+        print(f"   ✗ Error building similar ayat: {e}")
 
 if __name__ == "__main__":
     print("🚀 Starting data initialization...\n")
+    init_content_db()
     load_quran_verses()
+    load_embeddings()
     load_azkar()
+    build_quran_bundle()
+    export_embedding_matrix()
+    build_similar_ayat()
     print("\n✅ Data initialization complete!")
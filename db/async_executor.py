@@ -0,0 +1,99 @@
+"""
+Async Database Executor - runs blocking sqlite work off the event loop
+
+Reads go to a small pool of reader threads; writes are queued to a single
+writer thread so they are serialized without ever blocking the loop.
+Each thread uses its own pooled connection from db.database.
+"""
+
+import asyncio
+import functools
+import logging
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+READER_THREADS = 4
+
+
+class AsyncDatabaseExecutor:
+    """Reader thread pool plus one dedicated writer thread"""
+
+    def __init__(self, reader_threads: int = READER_THREADS):
+        self.reader_threads = reader_threads
+        self._readers = None
+        self._writes = queue.Queue()
+        self._writer = None
+        self._lock = threading.Lock()
+
+    def _start(self):
+        with self._lock:
+            if self._readers is None:
+                self._readers = ThreadPoolExecutor(
+                    max_workers=self.reader_threads,
+                    thread_name_prefix="db-reader"
+                )
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(
+                    target=self._writer_loop, name="db-writer", daemon=True
+                )
+                self._writer.start()
+
+    def _writer_loop(self):
+        while True:
+            item = self._writes.get()
+            if item is None:
+                break
+            future, fn, args, kwargs = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+    async def read(self, fn, *args, **kwargs):
+        """Run a read-only call on a reader thread"""
+        self._start()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._readers, functools.partial(fn, *args, **kwargs))
+
+    async def write(self, fn, *args, **kwargs):
+        """Queue a call that writes to the database on the writer thread"""
+        self._start()
+        future = Future()
+        self._writes.put((future, fn, args, kwargs))
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self, timeout: float = 10.0):
+        """Drain queued writes and stop all threads"""
+        with self._lock:
+            writer, readers = self._writer, self._readers
+            self._writer = self._readers = None
+        if writer is not None:
+            self._writes.put(None)
+            writer.join(timeout)
+            if writer.is_alive():
+                logger.warning("Database writer did not drain within %.1fs", timeout)
+        if readers is not None:
+            readers.shutdown(wait=True)
+
+
+_executor = AsyncDatabaseExecutor()
+
+
+async def run_read(fn, *args, **kwargs):
+    """Await a blocking read on the shared reader pool"""
+    return await _executor.read(fn, *args, **kwargs)
+
+
+async def run_write(fn, *args, **kwargs):
+    """Await a blocking write on the shared writer thread"""
+    return await _executor.write(fn, *args, **kwargs)
+
+
+def shutdown_executor():
+    """Flush pending writes and stop the database threads"""
+    _executor.shutdown()
@@ -1,8 +1,301 @@
+"""
+Database connection manager - pooled, thread-affine SQLite connections
+
+User data lives in a WAL database (DB_PATH). Static content - ayat, azkar,
+embeddings, guides and calendar events - lives in a separate file
+(CONTENT_DB_PATH) that is opened read-only and immutable, so content reads
+never take locks or contend with user writes.
+"""
+
+import os
 import sqlite3
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from urllib.parse import quote
+
+from db.query_stats import query_stats
 
 DB_PATH = "data/bot.db"
+CONTENT_DB_PATH = "data/content.db"
+
+# Applied once when a pooled connection is opened, not on every query
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-8000",      # ~8 MB page cache per connection
+    "PRAGMA mmap_size=67108864",    # 64 MB of memory-mapped reads
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",
+)
+
+# The content file is never modified while readers have it open, so it is
+# memory-mapped whole and needs no journal or busy handling
+CONTENT_PRAGMAS = (
+    "PRAGMA mmap_size=268435456",   # 256 MB, larger than the whole file
+    "PRAGMA cache_size=-2000",
+)
+
+# Prepared statements kept per connection, keyed by SQL text
+STATEMENT_CACHE_SIZE = 256
+
+
+class PooledConnection(sqlite3.Connection):
+    """sqlite3 connection whose close() returns it to the pool instead of closing it"""
+
+    def close(self):
+        # Match the old semantics: uncommitted work is discarded on close
+        if self.in_transaction:
+            self.rollback()
+
+    def dispose(self):
+        """Really close the underlying SQLite handle"""
+        super().close()
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor that reports each statement's time and row count to db.query_stats.
+
+    A SELECT keeps running while its rows are fetched, so the sample stays
+    open until the rows are exhausted, the cursor is reused or it goes away.
+    """
+
+    _pending = None    # [sql, params, elapsed seconds, rows fetched]
+
+    def execute(self, sql, parameters=()):
+        self._finish()
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._pending = [sql, parameters, time.perf_counter() - start, 0]
+
+    def executemany(self, sql, seq_of_parameters):
+        self._finish()
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._pending = [sql, None, time.perf_counter() - start, 0]
+            self._finish()
+
+    def fetchone(self):
+        row = self._timed(super().fetchone)
+        if row is None:
+            self._finish()
+        return row
+
+    def fetchmany(self, size=None):
+        size = self.arraysize if size is None else size
+        rows = self._timed(super().fetchmany, size)
+        if len(rows) < size:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(super().fetchall)
+        self._finish()
+        return rows
+
+    def __next__(self):
+        row = self.fetchone()
+        if row is None:
+            raise StopIteration
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+    def _timed(self, fetch, *args):
+        start = time.perf_counter()
+        result = fetch(*args)
+        pending = self._pending
+        if pending is not None:
+            pending[2] += time.perf_counter() - start
+            pending[3] += len(result) if isinstance(result, list) else result is not None
+        return result
+
+    def _finish(self):
+        pending, self._pending = self._pending, None
+        if pending is None:
+            return
+        sql, params, elapsed, fetched = pending
+        # rowcount covers INSERT/UPDATE/DELETE, SELECTs count fetched rows
+        rows = self.rowcount if self.rowcount >= 0 else fetched
+        query_stats.record(sql, elapsed, rows, explain=lambda: self._explain(sql, params))
+
+    def _explain(self, sql, params):
+        if params is None:
+            return None
+        try:
+            # Plain cursor, so the plan lookup is not itself recorded
+            plan = sqlite3.Cursor(self.connection).execute("EXPLAIN QUERY PLAN " + sql, params)
+            return " | ".join(row[3] for row in plan.fetchall())
+        except sqlite3.Error:
+            return None
+
+
+class InstrumentedConnection(PooledConnection):
+    """Pooled connection whose statements all go through InstrumentedCursor"""
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+class ConnectionPool:
+    """Keeps one open connection per (thread, database file)"""
+
+    def __init__(self, pragmas=CONNECTION_PRAGMAS, uri: bool = False):
+        self.pragmas = pragmas
+        self.uri = uri
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._generation = 0
+        # Weak so connections of finished threads are released with the thread
+        self._connections = weakref.WeakSet()
+
+    def get(self, path: str) -> PooledConnection:
+        """Return the calling thread's connection to `path`, opening it on first use"""
+        if getattr(self._local, "generation", None) != self._generation:
+            self._local.connections = {}
+            self._local.generation = self._generation
+
+        conn = self._local.connections.get(path)
+        if conn is None:
+            conn = self._open(path)
+            self._local.connections[path] = conn
+            with self._lock:
+                self._connections.add(conn)
+        return conn
+
+    def _open(self, path: str) -> PooledConnection:
+        # check_same_thread is off only so close_all() can run from the
+        # shutdown thread; connections are never shared between workers
+        conn = sqlite3.connect(
+            path,
+            factory=InstrumentedConnection if query_stats.enabled else PooledConnection,
+            cached_statements=STATEMENT_CACHE_SIZE,
+            check_same_thread=False,
+            uri=self.uri,
+        )
+        conn.row_factory = sqlite3.Row
+        for pragma in self.pragmas:
+            conn.execute(pragma)
+        return conn
+
+    @property
+    def generation(self) -> int:
+        """Bumped by close_all(), tells caches built from these connections to reload"""
+        return self._generation
+
+    def close_all(self):
+        """Close every pooled connection; threads reopen lazily afterwards"""
+        with self._lock:
+            conns = list(self._connections)
+            self._connections = weakref.WeakSet()
+            self._generation += 1
+        for conn in conns:
+            try:
+                conn.dispose()
+            except sqlite3.Error:
+                pass
+
+
+_pool = ConnectionPool()
+_content_pool = ConnectionPool(CONTENT_PRAGMAS, uri=True)
+
 
 def get_connection():
-    conn = sqlite3.connect(DB_PATH)
+    """Get the calling thread's pooled connection to the bot database.
+
+    Calling close() on it only rolls back uncommitted work, so existing
+    open/query/close call sites keep working without reconnecting.
+    """
+    return _pool.get(DB_PATH)
+
+
+@contextmanager
+def connection():
+    """Pooled connection scoped to a transaction.
+
+    Commits when the block exits normally and rolls back on error:
+
+        with connection() as conn:
+            conn.execute("INSERT ...", params)
+    """
+    conn = get_connection()
+    try:
+        yield conn
+    except BaseException:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+    else:
+        if conn.in_transaction:
+            conn.commit()
+
+
+def get_content_connection():
+    """Get the calling thread's read-only connection to the content database"""
+    path = quote(os.path.abspath(CONTENT_DB_PATH))
+    return _content_pool.get(f"file:{path}?mode=ro&immutable=1")
+
+
+def content_generation() -> int:
+    """Changes whenever the content database may have been rebuilt or swapped"""
+    return _content_pool.generation
+
+
+@contextmanager
+def content_connection():
+    """Read-only content connection for a block of queries:
+
+        with content_connection() as conn:
+            conn.execute("SELECT text FROM ayat WHERE id=?", (ayah_id,))
+    """
+    yield get_content_connection()
+
+
+@contextmanager
+def content_writer():
+    """Writable, unpooled connection used to build the content database.
+
+    Only for init_db and the data loaders. Readers opened before the write
+    would keep serving their immutable snapshot, so they are dropped when
+    the block ends and reopen on next use.
+    """
+    conn = sqlite3.connect(CONTENT_DB_PATH)
     conn.row_factory = sqlite3.Row
-    return conn
\ No newline at end of file
+    # Immutable readers ignore -wal files, so content must not use WAL
+    conn.execute("PRAGMA journal_mode=DELETE")
+    # INSERT OR REPLACE must fire the delete triggers that keep ayat_fts in sync
+    conn.execute("PRAGMA recursive_triggers=ON")
+    try:
+        yield conn
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+        _content_pool.close_all()
+
+
+def close_all_connections():
+    """Close all pooled connections (shutdown and tests)"""
+    _pool.close_all()
+    _content_pool.close_all()
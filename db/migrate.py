@@ -0,0 +1,90 @@
+"""
+Schema Migrations - applies ordered SQL files from db/migrations
+
+Each file is named NNNN_description.sql and runs exactly once, inside a
+transaction, recording its version in the schema_version table.
+"""
+
+import os
+import re
+import logging
+from db.database import get_connection
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+
+_MIGRATION_FILE = re.compile(r"^(\d+)_(\w+)\.sql$")
+
+
+def discover_migrations(directory: str = MIGRATIONS_DIR):
+    """List (version, name, path) for every migration file, oldest first"""
+    migrations = []
+    for filename in os.listdir(directory):
+        match = _MIGRATION_FILE.match(filename)
+        if match:
+            migrations.append((int(match.group(1)), match.group(2), os.path.join(directory, filename)))
+    migrations.sort()
+
+    versions = [version for version, _, _ in migrations]
+    if len(versions) != len(set(versions)):
+        raise ValueError(f"Duplicate migration versions in {directory}")
+    return migrations
+
+
+def get_schema_version(conn) -> int:
+    """Highest applied migration version (0 for a fresh database)"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+
+def run_migrations(conn=None, directory: str = MIGRATIONS_DIR):
+    """Apply all pending migrations, returns the list of versions applied"""
+    conn = conn or get_connection()
+    current = get_schema_version(conn)
+    conn.commit()
+
+    applied = []
+    for version, name, path in discover_migrations(directory):
+        if version <= current:
+            continue
+
+        with open(path, encoding="utf-8") as f:
+            script = f.read()
+
+        try:
+            # executescript() commits any open transaction first, so the
+            # migration and its version row are wrapped explicitly
+            conn.executescript(
+                "BEGIN;\n"
+                f"{script}\n"
+                f"INSERT INTO schema_version (version, name) VALUES ({version}, '{name}');\n"
+                "COMMIT;"
+            )
+        except Exception:
+            if conn.in_transaction:
+                conn.rollback()
+            logger.error(f"Migration {version:04d}_{name} failed", exc_info=True)
+            raise
+
+        logger.info(f"Applied migration {version:04d}_{name}")
+        applied.append(version)
+
+    return applied
+
+
+if __name__ == "__main__":
+    from db.models import init_content_db
+
+    logging.basicConfig(level=logging.INFO)
+    # 0006 drops the legacy content tables, so copy them out of bot.db first
+    init_content_db()
+    done = run_migrations()
+    print(f"✅ Applied {len(done)} migration(s)" if done else "✓ Schema is up to date")
@@ -0,0 +1,20 @@
+-- Composite indexes for the per-user date-window queries in tracking_service.
+-- Trailing columns make the GROUP BY aggregates covering (no table lookups).
+
+CREATE INDEX IF NOT EXISTS idx_prayer_tracking_user_date
+    ON prayer_tracking (user_id, date, prayer_name, status);
+
+CREATE INDEX IF NOT EXISTS idx_tasbeeh_tracking_user_date
+    ON tasbeeh_tracking (user_id, date, dhikr, count);
+
+CREATE INDEX IF NOT EXISTS idx_quran_reading_user_date
+    ON quran_reading (user_id, date_read, surah, verses_read);
+
+CREATE INDEX IF NOT EXISTS idx_quran_reading_user_surah
+    ON quran_reading (user_id, surah);
+
+CREATE INDEX IF NOT EXISTS idx_fasting_tracking_user_date
+    ON fasting_tracking (user_id, date, status);
+
+CREATE INDEX IF NOT EXISTS idx_qada_prayers_user_prayer
+    ON qada_prayers (user_id, prayer_name, completed, date_added);
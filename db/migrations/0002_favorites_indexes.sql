@@ -0,0 +1,8 @@
+-- favorites_service looks items up by (user, type, id) and lists a user's
+-- favorites newest first.
+
+CREATE INDEX IF NOT EXISTS idx_favorites_user_item
+    ON favorites (user_id, item_type, item_id);
+
+CREATE INDEX IF NOT EXISTS idx_favorites_user_created
+    ON favorites (user_id, created_at);
@@ -0,0 +1,8 @@
+-- Schedulers fetch active channels per schedule type; the setup commands
+-- toggle one (guild, channel, type) subscription.
+
+CREATE INDEX IF NOT EXISTS idx_scheduled_azkar_type_active
+    ON scheduled_azkar (schedule_type, is_active, channel_id);
+
+CREATE INDEX IF NOT EXISTS idx_scheduled_azkar_guild_channel
+    ON scheduled_azkar (guild_id, channel_id, schedule_type);
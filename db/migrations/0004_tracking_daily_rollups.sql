@@ -0,0 +1,48 @@
+-- Per-user, per-day aggregates of the tracking event tables. tracking_service
+-- upserts them in the same transaction as the raw rows, so stats read a
+-- handful of rows instead of re-aggregating a user's whole history.
+-- db/rollups.py can rebuild them from the raw events.
+
+CREATE TABLE IF NOT EXISTS prayer_daily (
+    user_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    prayer_name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, date, prayer_name, status)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS tasbeeh_daily (
+    user_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    dhikr TEXT NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, date, dhikr)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS quran_daily (
+    user_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    surah INTEGER NOT NULL,
+    verses INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, date, surah)
+) WITHOUT ROWID;
+
+-- Backfill from existing events
+INSERT INTO prayer_daily (user_id, date, prayer_name, status, count)
+SELECT user_id, date, COALESCE(prayer_name, ''), COALESCE(status, ''), COUNT(*)
+FROM prayer_tracking
+WHERE user_id IS NOT NULL AND date IS NOT NULL
+GROUP BY 1, 2, 3, 4;
+
+INSERT INTO tasbeeh_daily (user_id, date, dhikr, total)
+SELECT user_id, date, COALESCE(dhikr, ''), COALESCE(SUM(count), 0)
+FROM tasbeeh_tracking
+WHERE user_id IS NOT NULL AND date IS NOT NULL
+GROUP BY 1, 2, 3;
+
+INSERT INTO quran_daily (user_id, date, surah, verses)
+SELECT user_id, date_read, COALESCE(surah, 0), COALESCE(SUM(verses_read), 0)
+FROM quran_reading
+WHERE user_id IS NOT NULL AND date_read IS NOT NULL
+GROUP BY 1, 2, 3;
@@ -0,0 +1,130 @@
+-- Store Discord snowflakes as INTEGER user_id and dates as INTEGER day
+-- numbers (days since 1970-01-01) in the tracking tables and their rollups.
+-- Rows and indexes shrink, and year/range filters become index range scans
+-- instead of strftime() over every row.
+--
+-- 'YYYY-MM-DD' -> day: CAST(julianday(date) - 2440587.5 AS INTEGER)
+
+-- prayer_tracking
+CREATE TABLE prayer_tracking_new (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER,
+    prayer_name TEXT,
+    status TEXT,
+    day INTEGER,
+    is_qada INTEGER DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+INSERT INTO prayer_tracking_new (id, user_id, prayer_name, status, day, is_qada, created_at)
+SELECT id, CAST(user_id AS INTEGER), prayer_name, status,
+       CAST(julianday(date) - 2440587.5 AS INTEGER), is_qada, created_at
+FROM prayer_tracking;
+DROP TABLE prayer_tracking;
+ALTER TABLE prayer_tracking_new RENAME TO prayer_tracking;
+CREATE INDEX idx_prayer_tracking_user_day
+    ON prayer_tracking (user_id, day, prayer_name, status);
+
+-- tasbeeh_tracking
+CREATE TABLE tasbeeh_tracking_new (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER,
+    dhikr TEXT,
+    count INTEGER,
+    day INTEGER
+);
+INSERT INTO tasbeeh_tracking_new (id, user_id, dhikr, count, day)
+SELECT id, CAST(user_id AS INTEGER), dhikr, count,
+       CAST(julianday(date) - 2440587.5 AS INTEGER)
+FROM tasbeeh_tracking;
+DROP TABLE tasbeeh_tracking;
+ALTER TABLE tasbeeh_tracking_new RENAME TO tasbeeh_tracking;
+CREATE INDEX idx_tasbeeh_tracking_user_day
+    ON tasbeeh_tracking (user_id, day, dhikr, count);
+
+-- quran_reading
+CREATE TABLE quran_reading_new (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER,
+    surah INTEGER,
+    verses_read INTEGER,
+    day INTEGER
+);
+INSERT INTO quran_reading_new (id, user_id, surah, verses_read, day)
+SELECT id, CAST(user_id AS INTEGER), surah, verses_read,
+       CAST(julianday(date_read) - 2440587.5 AS INTEGER)
+FROM quran_reading;
+DROP TABLE quran_reading;
+ALTER TABLE quran_reading_new RENAME TO quran_reading;
+CREATE INDEX idx_quran_reading_user_day
+    ON quran_reading (user_id, day, surah, verses_read);
+CREATE INDEX idx_quran_reading_user_surah
+    ON quran_reading (user_id, surah);
+
+-- fasting_tracking: track_fasting always meant one status per user per day,
+-- the unique key makes its INSERT OR REPLACE actually replace (latest wins)
+CREATE TABLE fasting_tracking_new (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER,
+    day INTEGER,
+    status TEXT,
+    notes TEXT
+);
+INSERT INTO fasting_tracking_new (id, user_id, day, status, notes)
+SELECT id, CAST(user_id AS INTEGER),
+       CAST(julianday(date) - 2440587.5 AS INTEGER), status, notes
+FROM fasting_tracking
+WHERE id IN (SELECT MAX(id) FROM fasting_tracking GROUP BY user_id, date);
+DROP TABLE fasting_tracking;
+ALTER TABLE fasting_tracking_new RENAME TO fasting_tracking;
+CREATE UNIQUE INDEX idx_fasting_tracking_user_day
+    ON fasting_tracking (user_id, day);
+
+-- Rollups
+CREATE TABLE prayer_daily_new (
+    user_id INTEGER NOT NULL,
+    day INTEGER NOT NULL,
+    prayer_name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, day, prayer_name, status)
+) WITHOUT ROWID;
+INSERT INTO prayer_daily_new (user_id, day, prayer_name, status, count)
+SELECT CAST(user_id AS INTEGER), CAST(julianday(date) - 2440587.5 AS INTEGER),
+       prayer_name, status, SUM(count)
+FROM prayer_daily
+WHERE julianday(date) IS NOT NULL
+GROUP BY 1, 2, 3, 4;
+DROP TABLE prayer_daily;
+ALTER TABLE prayer_daily_new RENAME TO prayer_daily;
+
+CREATE TABLE tasbeeh_daily_new (
+    user_id INTEGER NOT NULL,
+    day INTEGER NOT NULL,
+    dhikr TEXT NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, day, dhikr)
+) WITHOUT ROWID;
+INSERT INTO tasbeeh_daily_new (user_id, day, dhikr, total)
+SELECT CAST(user_id AS INTEGER), CAST(julianday(date) - 2440587.5 AS INTEGER),
+       dhikr, SUM(total)
+FROM tasbeeh_daily
+WHERE julianday(date) IS NOT NULL
+GROUP BY 1, 2, 3;
+DROP TABLE tasbeeh_daily;
+ALTER TABLE tasbeeh_daily_new RENAME TO tasbeeh_daily;
+
+CREATE TABLE quran_daily_new (
+    user_id INTEGER NOT NULL,
+    day INTEGER NOT NULL,
+    surah INTEGER NOT NULL,
+    verses INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, day, surah)
+) WITHOUT ROWID;
+INSERT INTO quran_daily_new (user_id, day, surah, verses)
+SELECT CAST(user_id AS INTEGER), CAST(julianday(date) - 2440587.5 AS INTEGER),
+       surah, SUM(verses)
+FROM quran_daily
+WHERE julianday(date) IS NOT NULL
+GROUP BY 1, 2, 3;
+DROP TABLE quran_daily;
+ALTER TABLE quran_daily_new RENAME TO quran_daily;
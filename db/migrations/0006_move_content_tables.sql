@@ -0,0 +1,24 @@
+-- Static content moved to data/content.db; init_db() copies it across
+-- before migrations run. The only runtime state on it - which ayat have
+-- already been posted - stays here in used_ayat.
+
+CREATE TABLE IF NOT EXISTS used_ayat (
+    ayah_id TEXT PRIMARY KEY
+) WITHOUT ROWID;
+
+-- Fresh databases never had ayat; create it empty so the copy is a no-op
+CREATE TABLE IF NOT EXISTS ayat (
+    id TEXT PRIMARY KEY,
+    ref TEXT,
+    text TEXT,
+    used INTEGER DEFAULT 0
+);
+
+INSERT OR IGNORE INTO used_ayat (ayah_id)
+SELECT id FROM ayat WHERE used = 1;
+
+DROP TABLE ayat;
+DROP TABLE IF EXISTS azkar;
+DROP TABLE IF EXISTS embeddings;
+DROP TABLE IF EXISTS islamic_events;
+DROP TABLE IF EXISTS hajj_umrah_guides;
@@ -0,0 +1,14 @@
+-- No-repeat random ayah rotation. Each scope (a channel, or 'global') keeps
+-- its own shuffled permutation of global ayah numbers - 2-byte little-endian
+-- entries in one BLOB - and a cursor into it, so a pick reads one entry and
+-- bumps one integer instead of flagging rows in a table.
+
+CREATE TABLE IF NOT EXISTS ayah_rotation (
+    scope TEXT PRIMARY KEY,
+    permutation BLOB NOT NULL,
+    cursor INTEGER NOT NULL DEFAULT 0,
+    cycle INTEGER NOT NULL DEFAULT 1
+);
+
+-- Replaced by ayah_rotation
+DROP TABLE IF EXISTS used_ayat;
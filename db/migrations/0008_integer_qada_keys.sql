@@ -0,0 +1,23 @@
+-- qada_prayers was left on TEXT user_id and 'YYYY-MM-DD' date_added by
+-- migration 0005; give it the same INTEGER user_id and day-number key as
+-- the other tracking tables. A separate migration because 0005 has already
+-- run on existing databases.
+--
+-- 'YYYY-MM-DD' -> day: CAST(julianday(date) - 2440587.5 AS INTEGER)
+
+CREATE TABLE qada_prayers_new (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER,
+    prayer_name TEXT,
+    count INTEGER DEFAULT 1,
+    day_added INTEGER,
+    completed INTEGER DEFAULT 0
+);
+INSERT INTO qada_prayers_new (id, user_id, prayer_name, count, day_added, completed)
+SELECT id, CAST(user_id AS INTEGER), prayer_name, count,
+       CAST(julianday(date_added) - 2440587.5 AS INTEGER), completed
+FROM qada_prayers;
+DROP TABLE qada_prayers;
+ALTER TABLE qada_prayers_new RENAME TO qada_prayers;
+CREATE INDEX idx_qada_prayers_user_prayer
+    ON qada_prayers (user_id, prayer_name, completed, day_added);
@@ -1,36 +1,158 @@
-from db.database import get_connection
+import hashlib
+import os
+import sqlite3
+from db import database
+from db.database import get_connection, get_content_connection, content_writer
+from db.migrate import discover_migrations, run_migrations
+from db.storage import get_storage
 
-def init_db():
-    conn = get_connection()
-    cur = conn.cursor()
+# Static tables kept in the read-only content database (data/content.db)
+CONTENT_TABLES = ("ayat", "azkar", "embeddings", "islamic_events", "hajj_umrah_guides")
 
-    cur.execute("""
+CONTENT_SCHEMA = (
+    """
     CREATE TABLE IF NOT EXISTS ayat (
         id TEXT PRIMARY KEY,
         ref TEXT,
         text TEXT,
-        used INTEGER DEFAULT 0
+        text_normalized TEXT
     )
-    """)
-
-    cur.execute("""
+    """,
+    # Word concordance built from ayat.text_normalized (services/quran_concordance)
+    """
+    CREATE TABLE IF NOT EXISTS concordance (
+        word TEXT PRIMARY KEY,
+        occurrences INTEGER NOT NULL,
+        ayat INTEGER NOT NULL,
+        postings BLOB NOT NULL
+    )
+    """,
+    # Triliteral root index, built offline from the Quranic Arabic Corpus
+    # morphology file (services/quran_roots); empty until then
+    """
+    CREATE TABLE IF NOT EXISTS quran_roots (
+        root TEXT PRIMARY KEY,
+        occurrences INTEGER NOT NULL,
+        ayat BLOB NOT NULL,
+        postings BLOB NOT NULL
+    )
+    """,
+    # Near-duplicate ayat (mutashabihat), both directions, from the MinHash
+    # LSH pipeline in services/quran_similar; empty until that is run
+    """
+    CREATE TABLE IF NOT EXISTS similar_ayat (
+        ayah INTEGER NOT NULL,
+        similar INTEGER NOT NULL,
+        score REAL NOT NULL,
+        PRIMARY KEY (ayah, similar)
+    ) WITHOUT ROWID
+    """,
+    """
     CREATE TABLE IF NOT EXISTS azkar (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         type TEXT,
         text TEXT
     )
-    """)
-
-    cur.execute("""
+    """,
+    """
     CREATE TABLE IF NOT EXISTS embeddings (
         ref_id TEXT PRIMARY KEY,
         vector BLOB,
-        text TEXT
+        text TEXT,
+        vector_int8 BLOB
+    )
+    """,
+    # Per-dimension int8 ranges for embeddings.vector_int8 (float32 BLOBs)
+    """
+    CREATE TABLE IF NOT EXISTS embedding_scales (
+        model TEXT PRIMARY KEY,
+        scale BLOB NOT NULL,
+        offset BLOB NOT NULL
+    )
+    """,
+    # Resume point of the embedding pipeline (services/embeddings_service)
+    """
+    CREATE TABLE IF NOT EXISTS embedding_progress (
+        model TEXT PRIMARY KEY,
+        last_ayah INTEGER NOT NULL,
+        updated_at TEXT
+    )
+    """,
+    # Islamic calendar events
+    """
+    CREATE TABLE IF NOT EXISTS islamic_events (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        hijri_month INTEGER,
+        hijri_day INTEGER,
+        event_name TEXT,
+        event_description TEXT,
+        is_holiday INTEGER DEFAULT 0
     )
-    """)
+    """,
+    # Hajj and Umrah guides
+    """
+    CREATE TABLE IF NOT EXISTS hajj_umrah_guides (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        guide_type TEXT,
+        title TEXT,
+        content TEXT,
+        category TEXT
+    )
+    """,
+)
 
+# Full-text index over ayat.text_normalized (see services/arabic_normalizer).
+# External content: the text is stored once in ayat and the triggers keep
+# the index in step with it. Derived data, so init_content_db drops and
+# rebuilds it whenever the content schema changes.
+AYAT_FTS_SCHEMA = (
+    """
+    CREATE VIRTUAL TABLE ayat_fts USING fts5(
+        text_normalized, ref UNINDEXED, id UNINDEXED,
+        content='ayat', content_rowid='rowid',
+        tokenize='unicode61', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER ayat_fts_insert AFTER INSERT ON ayat BEGIN
+        INSERT INTO ayat_fts (rowid, text_normalized, ref, id)
+        VALUES (new.rowid, new.text_normalized, new.ref, new.id);
+    END
+    """,
+    """
+    CREATE TRIGGER ayat_fts_delete AFTER DELETE ON ayat BEGIN
+        INSERT INTO ayat_fts (ayat_fts, rowid, text_normalized, ref, id)
+        VALUES ('delete', old.rowid, old.text_normalized, old.ref, old.id);
+    END
+    """,
+    """
+    CREATE TRIGGER ayat_fts_update AFTER UPDATE ON ayat BEGIN
+        INSERT INTO ayat_fts (ayat_fts, rowid, text_normalized, ref, id)
+        VALUES ('delete', old.rowid, old.text_normalized, old.ref, old.id);
+        INSERT INTO ayat_fts (rowid, text_normalized, ref, id)
+        VALUES (new.rowid, new.text_normalized, new.ref, new.id);
+    END
+    """,
+)
+
+# Seeded calendar events, unique on (hijri_month, hijri_day, event_name)
+ISLAMIC_EVENTS = (
+    (1, 1, "رأس السنة الهجرية", "بداية العام الهجري الجديد", 1),
+    (1, 10, "عاشوراء", "يوم عاشوراء", 1),
+    (3, 12, "المولد النبوي", "ذكرى مولد النبي محمد ﷺ", 1),
+    (7, 27, "ليلة الإسراء والمعراج", "ذكرى الإسراء والمعراج", 1),
+    (8, 15, "نصف شعبان", "ليلة النصف من شعبان", 0),
+    (9, 1, "أول رمضان", "بداية شهر رمضان المبارك", 1),
+    (9, 27, "ليلة القدر", "خير من ألف شهر", 1),
+    (10, 1, "عيد الفطر", "عيد الفطر المبارك", 1),
+    (12, 8, "يوم التروية", "أول أيام الحج", 1),
+    (12, 9, "يوم عرفة", "يوم عرفة المبارك", 1),
+    (12, 10, "عيد الأضحى", "عيد الأضحى المبارك", 1),
+)
+
+USER_SCHEMA = (
     # Favorites table for user-saved verses
-    cur.execute("""
+    """
     CREATE TABLE IF NOT EXISTS favorites (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         user_id TEXT,
@@ -38,10 +160,9 @@ def init_db():
         item_id TEXT,
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
     )
-    """)
-
+    """,
     # Scheduled azkar settings
-    cur.execute("""
+    """
     CREATE TABLE IF NOT EXISTS scheduled_azkar (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         guild_id TEXT,
@@ -50,20 +171,22 @@ def init_db():
         schedule_time TEXT,
         is_active INTEGER DEFAULT 1
     )
-    """)
-
+    """,
     # User settings for prayer times
-    cur.execute("""
+    """
     CREATE TABLE IF NOT EXISTS user_settings (
         user_id TEXT PRIMARY KEY,
         city TEXT DEFAULT 'Mecca',
         country TEXT DEFAULT 'Saudi Arabia',
         calculation_method INTEGER DEFAULT 2
     )
-    """)
+    """,
+    # Tracking tables below are rebuilt with INTEGER user_id and day-number
+    # keys by migration 0005 (db/migrations/0005_integer_tracking_keys.sql),
+    # qada_prayers by 0008
 
     # Prayer tracking table
-    cur.execute("""
+    """
     CREATE TABLE IF NOT EXISTS prayer_tracking (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         user_id TEXT,
@@ -73,10 +196,9 @@ def init_db():
         is_qada INTEGER DEFAULT 0,
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
     )
-    """)
-
+    """,
     # Qada prayers tracking
-    cur.execute("""
+    """
     CREATE TABLE IF NOT EXISTS qada_prayers (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         user_id TEXT,
@@ -85,10 +207,9 @@ def init_db():
         date_added TEXT,
         completed INTEGER DEFAULT 0
     )
-    """)
-
+    """,
     # Fasting tracking
-    cur.execute("""
+    """
     CREATE TABLE IF NOT EXISTS fasting_tracking (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         user_id TEXT,
@@ -96,10 +217,9 @@ def init_db():
         status TEXT,
         notes TEXT
     )
-    """)
-
+    """,
     # Quran reading tracking
-    cur.execute("""
+    """
     CREATE TABLE IF NOT EXISTS quran_reading (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         user_id TEXT,
@@ -107,10 +227,9 @@ def init_db():
         verses_read INTEGER,
         date_read TEXT
     )
-    """)
-
+    """,
     # Tasbeeh counter tracking
-    cur.execute("""
+    """
     CREATE TABLE IF NOT EXISTS tasbeeh_tracking (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         user_id TEXT,
@@ -118,10 +237,9 @@ def init_db():
         count INTEGER,
         date TEXT
     )
-    """)
-
+    """,
     # Daily hadith tracking (for daily hadith feature)
-    cur.execute("""
+    """
     CREATE TABLE IF NOT EXISTS daily_hadith_log (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         date TEXT UNIQUE,
@@ -129,10 +247,9 @@ def init_db():
         narrator TEXT,
         source TEXT
     )
-    """)
-
+    """,
     # User streaks tracking
-    cur.execute("""
+    """
     CREATE TABLE IF NOT EXISTS user_streaks (
         user_id TEXT PRIMARY KEY,
         prayer_streak INTEGER DEFAULT 0,
@@ -140,10 +257,9 @@ def init_db():
         quran_streak INTEGER DEFAULT 0,
         last_activity_date TEXT
     )
-    """)
-
+    """,
     # Interactive Tasbeeh sessions
-    cur.execute("""
+    """
     CREATE TABLE IF NOT EXISTS tasbeeh_sessions (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         user_id TEXT,
@@ -153,20 +269,18 @@ def init_db():
         session_date TEXT,
         completed INTEGER DEFAULT 0
     )
-    """)
-
+    """,
     # Ramadan daily tips log
-    cur.execute("""
+    """
     CREATE TABLE IF NOT EXISTS ramadan_daily_log (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         date TEXT UNIQUE,
         day_number INTEGER,
         tip_sent INTEGER DEFAULT 0
     )
-    """)
-
+    """,
     # Qibla direction history
-    cur.execute("""
+    """
     CREATE TABLE IF NOT EXISTS qibla_history (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         user_id TEXT,
@@ -176,22 +290,9 @@ def init_db():
         direction_degrees REAL,
         query_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
     )
-    """)
-
-    # Islamic calendar events
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS islamic_events (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        hijri_month INTEGER,
-        hijri_day INTEGER,
-        event_name TEXT,
-        event_description TEXT,
-        is_holiday INTEGER DEFAULT 0
-    )
-    """)
-
+    """,
     # Sunnah tracking
-    cur.execute("""
+    """
     CREATE TABLE IF NOT EXISTS sunnah_tracking (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         user_id TEXT,
@@ -199,48 +300,149 @@ def init_db():
         date TEXT,
         completed INTEGER DEFAULT 0
     )
-    """)
-
-    # Hajj and Umrah guides
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS hajj_umrah_guides (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        guide_type TEXT,
-        title TEXT,
-        content TEXT,
-        category TEXT
-    )
-    """)
-
+    """,
     # Reciters preferences
-    cur.execute("""
+    """
     CREATE TABLE IF NOT EXISTS user_reciter_prefs (
         user_id TEXT PRIMARY KEY,
         preferred_reciter TEXT DEFAULT 'ar.alafasy',
         language_preference TEXT DEFAULT 'ar'
     )
-    """)
-
-    # Populate Islamic events
-    islamic_events = [
-        (1, 1, "رأس السنة الهجرية", "بداية العام الهجري الجديد", 1),
-        (1, 10, "عاشوراء", "يوم عاشوراء", 1),
-        (3, 12, "المولد النبوي", "ذكرى مولد النبي محمد ﷺ", 1),
-        (7, 27, "ليلة الإسراء والمعراج", "ذكرى الإسراء والمعراج", 1),
-        (8, 15, "نصف شعبان", "ليلة النصف من شعبان", 0),
-        (9, 1, "أول رمضان", "بداية شهر رمضان المبارك", 1),
-        (9, 27, "ليلة القدر", "خير من ألف شهر", 1),
-        (10, 1, "عيد الفطر", "عيد الفطر المبارك", 1),
-        (12, 8, "يوم التروية", "أول أيام الحج", 1),
-        (12, 9, "يوم عرفة", "يوم عرفة المبارك", 1),
-        (12, 10, "عيد الأضحى", "عيد الأضحى المبارك", 1),
-    ]
-
-    for month, day, name, desc, is_holiday in islamic_events:
-        cur.execute("""
-            INSERT OR IGNORE INTO islamic_events (hijri_month, hijri_day, event_name, event_description, is_holiday)
+    """,
+)
+
+# One row per database; init_db skips all DDL and seeding while the stored
+# fingerprint matches the schema defined here
+SCHEMA_META = """
+CREATE TABLE IF NOT EXISTS schema_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+)
+"""
+
+def schema_fingerprint(*parts) -> str:
+    """Stable hash of schema statements, seed rows and migration names"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(repr(part).encode("utf-8"))
+    return digest.hexdigest()
+
+def content_fingerprint() -> str:
+    return schema_fingerprint(CONTENT_SCHEMA, AYAT_FTS_SCHEMA, ISLAMIC_EVENTS)
+
+def user_fingerprint() -> str:
+    migrations = [(version, name) for version, name, _ in discover_migrations()]
+    return schema_fingerprint(USER_SCHEMA, migrations)
+
+def _stored_fingerprint(conn):
+    try:
+        row = conn.execute("SELECT value FROM schema_meta WHERE key='fingerprint'").fetchone()
+    except sqlite3.OperationalError:
+        return None  # Bootstrapped before fingerprints existed
+    return row[0] if row else None
+
+def _store_fingerprint(conn, fingerprint):
+    conn.execute(SCHEMA_META)
+    conn.execute(
+        "INSERT OR REPLACE INTO schema_meta (key, value) VALUES ('fingerprint', ?)",
+        (fingerprint,)
+    )
+
+def init_content_db():
+    """Create the content tables and seed them, importing any legacy content from bot.db"""
+    from services.quran_concordance import build_concordance
+
+    fingerprint = content_fingerprint()
+    if os.path.exists(database.CONTENT_DB_PATH) and _stored_fingerprint(get_content_connection()) == fingerprint:
+        return
+
+    with content_writer() as conn:
+        for trigger in ("ayat_fts_insert", "ayat_fts_delete", "ayat_fts_update"):
+            conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        conn.execute("DROP TABLE IF EXISTS ayat_fts")
+        for statement in CONTENT_SCHEMA:
+            conn.execute(statement)
+        # Content databases from before normalization
+        if "text_normalized" not in {row[1] for row in conn.execute("PRAGMA table_info(ayat)")}:
+            conn.execute("ALTER TABLE ayat ADD COLUMN text_normalized TEXT")
+        # ... and before int8 embeddings
+        if "vector_int8" not in {row[1] for row in conn.execute("PRAGMA table_info(embeddings)")}:
+            conn.execute("ALTER TABLE embeddings ADD COLUMN vector_int8 BLOB")
+
+        _import_legacy_content(conn)
+        normalize_ayat(conn)
+        build_concordance(conn)
+        for statement in AYAT_FTS_SCHEMA:
+            conn.execute(statement)
+        conn.execute("INSERT INTO ayat_fts (ayat_fts) VALUES ('rebuild')")
+
+        # Older databases re-inserted every event on each start
+        conn.execute("""
+            DELETE FROM islamic_events WHERE id NOT IN (
+                SELECT MIN(id) FROM islamic_events GROUP BY hijri_month, hijri_day, event_name
+            )
+        """)
+        conn.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_islamic_events_date_name
+            ON islamic_events (hijri_month, hijri_day, event_name)
+        """)
+        conn.executemany("""
+            INSERT INTO islamic_events (hijri_month, hijri_day, event_name, event_description, is_holiday)
             VALUES (?, ?, ?, ?, ?)
-        """, (month, day, name, desc, is_holiday))
+            ON CONFLICT (hijri_month, hijri_day, event_name)
+            DO UPDATE SET event_description = excluded.event_description, is_holiday = excluded.is_holiday
+        """, ISLAMIC_EVENTS)
+
+        _store_fingerprint(conn, fingerprint)
 
+def normalize_ayat(conn) -> int:
+    """Fill text_normalized for ayat loaded without it, as one batch"""
+    from services.arabic_normalizer import normalize_many
+
+    rows = conn.execute("SELECT rowid, text FROM ayat WHERE text_normalized IS NULL").fetchall()
+    normalized = normalize_many(row["text"] for row in rows)
+    conn.executemany(
+        "UPDATE ayat SET text_normalized = ? WHERE rowid = ?",
+        zip(normalized, (row["rowid"] for row in rows))
+    )
+    return len(rows)
+
+def _import_legacy_content(conn):
+    """Copy content tables that older versions kept inside the user database"""
+    if not os.path.exists(database.DB_PATH):
+        return
+
+    conn.execute("ATTACH DATABASE ? AS legacy", (database.DB_PATH,))
+    legacy_tables = {row[0] for row in conn.execute("SELECT name FROM legacy.sqlite_master WHERE type='table'")}
+    for table in CONTENT_TABLES:
+        if table not in legacy_tables:
+            continue
+        if conn.execute(f"SELECT 1 FROM main.{table} LIMIT 1").fetchone():
+            continue
+        legacy_columns = {row[1] for row in conn.execute(f"PRAGMA legacy.table_info({table})")}
+        columns = ", ".join(
+            row[1] for row in conn.execute(f"PRAGMA main.table_info({table})") if row[1] in legacy_columns
+        )
+        conn.execute(f"INSERT INTO main.{table} ({columns}) SELECT {columns} FROM legacy.{table}")
     conn.commit()
-    conn.close()
\ No newline at end of file
+    conn.execute("DETACH DATABASE legacy")
+
+def init_db():
+    # Content first: migration 0006 drops the legacy copies from bot.db
+    init_content_db()
+
+    conn = get_connection()
+    fingerprint = user_fingerprint()
+    if _stored_fingerprint(conn) != fingerprint:
+        for statement in USER_SCHEMA:
+            conn.execute(statement)
+        conn.commit()
+
+        # Indexes and later schema changes live in db/migrations
+        run_migrations(conn)
+        _store_fingerprint(conn, fingerprint)
+        conn.commit()
+    conn.close()
+
+    # Shared tables on PostgreSQL when DATABASE_URL points there
+    get_storage().init_schema()
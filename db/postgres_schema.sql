@@ -0,0 +1,109 @@
+-- Shared user-state tables for the PostgreSQL storage backend (db/storage.py).
+-- Mirrors the SQLite layout after db/migrations so the same queries run on
+-- both: Discord IDs as BIGINT user_id, dates as INTEGER day numbers
+-- (days since 1970-01-01). Safe to re-run.
+
+CREATE TABLE IF NOT EXISTS favorites (
+    id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    user_id TEXT,
+    item_type TEXT,
+    item_id TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_favorites_user_item
+    ON favorites (user_id, item_type, item_id);
+CREATE INDEX IF NOT EXISTS idx_favorites_user_created
+    ON favorites (user_id, created_at);
+
+CREATE TABLE IF NOT EXISTS scheduled_azkar (
+    id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    guild_id TEXT,
+    channel_id TEXT,
+    schedule_type TEXT,
+    schedule_time TEXT,
+    is_active INTEGER DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS idx_scheduled_azkar_type_active
+    ON scheduled_azkar (schedule_type, is_active, channel_id);
+CREATE INDEX IF NOT EXISTS idx_scheduled_azkar_guild_channel
+    ON scheduled_azkar (guild_id, channel_id, schedule_type);
+
+CREATE TABLE IF NOT EXISTS qada_prayers (
+    id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    user_id BIGINT,
+    prayer_name TEXT,
+    count INTEGER DEFAULT 1,
+    day_added INTEGER,
+    completed INTEGER DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_qada_prayers_user_prayer
+    ON qada_prayers (user_id, prayer_name, completed, day_added);
+
+CREATE TABLE IF NOT EXISTS prayer_tracking (
+    id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    user_id BIGINT,
+    prayer_name TEXT,
+    status TEXT,
+    day INTEGER,
+    is_qada INTEGER DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_prayer_tracking_user_day
+    ON prayer_tracking (user_id, day, prayer_name, status);
+
+CREATE TABLE IF NOT EXISTS tasbeeh_tracking (
+    id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    user_id BIGINT,
+    dhikr TEXT,
+    count INTEGER,
+    day INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_tasbeeh_tracking_user_day
+    ON tasbeeh_tracking (user_id, day, dhikr, count);
+
+CREATE TABLE IF NOT EXISTS quran_reading (
+    id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    user_id BIGINT,
+    surah INTEGER,
+    verses_read INTEGER,
+    day INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_quran_reading_user_day
+    ON quran_reading (user_id, day, surah, verses_read);
+CREATE INDEX IF NOT EXISTS idx_quran_reading_user_surah
+    ON quran_reading (user_id, surah);
+
+CREATE TABLE IF NOT EXISTS fasting_tracking (
+    id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    user_id BIGINT,
+    day INTEGER,
+    status TEXT,
+    notes TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_fasting_tracking_user_day
+    ON fasting_tracking (user_id, day);
+
+CREATE TABLE IF NOT EXISTS prayer_daily (
+    user_id BIGINT NOT NULL,
+    day INTEGER NOT NULL,
+    prayer_name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, day, prayer_name, status)
+);
+
+CREATE TABLE IF NOT EXISTS tasbeeh_daily (
+    user_id BIGINT NOT NULL,
+    day INTEGER NOT NULL,
+    dhikr TEXT NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, day, dhikr)
+);
+
+CREATE TABLE IF NOT EXISTS quran_daily (
+    user_id BIGINT NOT NULL,
+    day INTEGER NOT NULL,
+    surah INTEGER NOT NULL,
+    verses INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, day, surah)
+);
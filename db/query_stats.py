@@ -0,0 +1,154 @@
+"""
+Query Statistics - per-statement timings for the SQLite connection pool
+
+Off by default. With DB_QUERY_STATS=1 (or enable_query_stats() before the
+first query) pooled connections time every statement, including the time
+spent fetching its rows, and group them by normalized SQL text. Statements
+slower than DB_SLOW_QUERY_MS are logged with their EXPLAIN QUERY PLAN.
+
+The aggregated table is served by web_server at /api/db/queries.
+"""
+
+import logging
+import math
+import os
+import re
+import threading
+from collections import deque
+from datetime import datetime
+from functools import lru_cache
+
+logger = logging.getLogger("db.slow_queries")
+
+SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "100"))
+
+# Recent timings kept per statement for the percentiles
+SAMPLES_PER_STATEMENT = 1024
+
+# Slow statements kept for the web endpoint (the log has all of them)
+SLOW_QUERY_LOG_SIZE = 50
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def normalize_sql(sql: str) -> str:
+    """Group key for a statement: literals become ?, IN lists and whitespace collapse"""
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _IN_LIST.sub("IN (...)", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+def _percentile(ordered: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+class StatementStats:
+    """Running totals for one normalized statement"""
+
+    __slots__ = ("count", "total", "max", "rows", "samples")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.samples = deque(maxlen=SAMPLES_PER_STATEMENT)
+
+
+class QueryStats:
+    """Thread-safe collector the instrumented cursors report to"""
+
+    def __init__(self, enabled: bool = False, slow_query_ms: float = SLOW_QUERY_MS):
+        self.enabled = enabled
+        self.slow_query_ms = slow_query_ms
+        self.slow_queries = deque(maxlen=SLOW_QUERY_LOG_SIZE)
+        self._statements = {}
+        self._lock = threading.Lock()
+
+    def record(self, sql: str, elapsed: float, rows: int, explain=None):
+        """Add one execution; `explain` returns the query plan, called only when slow"""
+        key = normalize_sql(sql)
+        with self._lock:
+            stats = self._statements.get(key)
+            if stats is None:
+                stats = self._statements[key] = StatementStats()
+            stats.count += 1
+            stats.total += elapsed
+            stats.rows += rows
+            stats.samples.append(elapsed)
+            if elapsed > stats.max:
+                stats.max = elapsed
+
+        elapsed_ms = elapsed * 1000
+        if elapsed_ms >= self.slow_query_ms:
+            plan = explain() if explain else None
+            self.slow_queries.append({
+                "sql": key,
+                "ms": round(elapsed_ms, 3),
+                "rows": rows,
+                "plan": plan,
+                "at": datetime.now().isoformat(),
+            })
+            logger.warning(f"Slow query ({elapsed_ms:.1f} ms, {rows} rows): {key}\n  plan: {plan}")
+
+    def snapshot(self, limit: int = None) -> list:
+        """Per-statement table, most total time first (times in milliseconds)"""
+        with self._lock:
+            items = [(key, s.count, s.total, s.max, s.rows, sorted(s.samples)) for key, s in self._statements.items()]
+
+        table = []
+        for key, count, total, longest, rows, ordered in items:
+            table.append({
+                "sql": key,
+                "count": count,
+                "total_ms": round(total * 1000, 3),
+                "mean_ms": round(total * 1000 / count, 3),
+                "p50_ms": round(_percentile(ordered, 50) * 1000, 3),
+                "p95_ms": round(_percentile(ordered, 95) * 1000, 3),
+                "p99_ms": round(_percentile(ordered, 99) * 1000, 3),
+                "max_ms": round(longest * 1000, 3),
+                "rows": rows,
+            })
+        table.sort(key=lambda row: row["total_ms"], reverse=True)
+        return table[:limit] if limit else table
+
+    def reset(self):
+        with self._lock:
+            self._statements = {}
+            self.slow_queries.clear()
+
+
+query_stats = QueryStats(enabled=os.getenv("DB_QUERY_STATS") == "1")
+
+
+def enable_query_stats(slow_query_ms: float = None):
+    """Instrument connections opened from now on (existing ones stay as they are)"""
+    if slow_query_ms is not None:
+        query_stats.slow_query_ms = slow_query_ms
+    query_stats.enabled = True
+
+
+def disable_query_stats():
+    """Stop instrumenting newly opened connections"""
+    query_stats.enabled = False
+
+
+def get_query_stats(limit: int = None) -> list:
+    """Aggregated per-statement timings"""
+    return query_stats.snapshot(limit)
+
+
+def get_slow_queries() -> list:
+    """Most recent slow statements with their query plans"""
+    return list(query_stats.slow_queries)
+
+
+def reset_query_stats():
+    """Clear all collected timings"""
+    query_stats.reset()
@@ -0,0 +1,62 @@
+"""
+Tracking Rollups - rebuild the per-day aggregate tables from raw events
+
+tracking_service keeps prayer_daily, tasbeeh_daily and quran_daily up to
+date on every write; this regenerates them from scratch after a manual
+data fix or if they are ever suspected to have drifted:
+
+    python -m db.rollups
+"""
+
+from db.storage import transaction
+
+REBUILD_STATEMENTS = (
+    "DELETE FROM prayer_daily",
+    """
+    INSERT INTO prayer_daily (user_id, day, prayer_name, status, count)
+    SELECT user_id, day, COALESCE(prayer_name, ''), COALESCE(status, ''), COUNT(*)
+    FROM prayer_tracking
+    WHERE user_id IS NOT NULL AND day IS NOT NULL
+    GROUP BY 1, 2, 3, 4
+    """,
+    "DELETE FROM tasbeeh_daily",
+    """
+    INSERT INTO tasbeeh_daily (user_id, day, dhikr, total)
+    SELECT user_id, day, COALESCE(dhikr, ''), COALESCE(SUM(count), 0)
+    FROM tasbeeh_tracking
+    WHERE user_id IS NOT NULL AND day IS NOT NULL
+    GROUP BY 1, 2, 3
+    """,
+    "DELETE FROM quran_daily",
+    """
+    INSERT INTO quran_daily (user_id, day, surah, verses)
+    SELECT user_id, day, COALESCE(surah, 0), COALESCE(SUM(verses_read), 0)
+    FROM quran_reading
+    WHERE user_id IS NOT NULL AND day IS NOT NULL
+    GROUP BY 1, 2, 3
+    """,
+)
+
+
+def rebuild_rollups() -> dict:
+    """Regenerate all daily rollups in one transaction, returns row counts"""
+    # Buffered events must be on disk before they can be re-aggregated
+    from services.tracking_service import flush_tracking_writes
+    flush_tracking_writes()
+
+    with transaction() as conn:
+        for sql in REBUILD_STATEMENTS:
+            conn.execute(sql)
+        return {
+            table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("prayer_daily", "tasbeeh_daily", "quran_daily")
+        }
+
+
+if __name__ == "__main__":
+    from db.models import init_db
+
+    init_db()
+    print("🔄 Rebuilding tracking rollups...")
+    for table, rows in rebuild_rollups().items():
+        print(f"   ✓ {table}: {rows} rows")
@@ -6,6 +6,10 @@ import threading
 import time
 from bot.discord_client import IslamicBot
 from db.models import init_db
+from db.database import close_all_connections
+from db.storage import close_storage
+from db.async_executor import shutdown_executor
+from services.tracking_service import shutdown_tracking_writes
 from web_server import run_web_server, update_bot_status
 
 # Configure logging
@@ -29,6 +33,10 @@ def signal_handler(sig, frame):
         bot.scheduled_azkar.stop()
     if bot and hasattr(bot, 'hourly_messages') and bot.hourly_messages:
         bot.hourly_messages.stop()
+    shutdown_executor()
+    shutdown_tracking_writes()
+    close_storage()
+    close_all_connections()
     update_bot_status("offline")
     sys.exit(0)
 
@@ -2,46 +2,52 @@
 Quick Data Loader - Sample Data for Testing
 """
 
-from db.database import get_connection
-from services.embeddings_service import model
-import pickle
+from db.database import content_writer
+from db.models import init_content_db
+from services import quran_coordinates as coordinates
+from services.arabic_normalizer import normalize_many
+from services.quran_concordance import build_concordance
+from services.embeddings_service import model, encode_vector
 
 def load_sample_quran():
     """Load sample Quran verses for testing"""
     print("📖 Loading sample Quran verses...")
     
     sample_verses = [
-        {"id": "1", "ref": "Al-Fatiha (1:1)", "text": "بِسْمِ اللَّهِ الرَّحْمَٰنِ الرَّحِيمِ"},
-        {"id": "2", "ref": "Al-Fatiha (1:2)", "text": "الْحَمْدُ لِلَّهِ رَبِّ الْعَالَمِينَ"},
-        {"id": "3", "ref": "Al-Baqarah (2:1)", "text": "الم"},
-        {"id": "4", "ref": "Al-Baqarah (2:2)", "text": "ذَٰلِكَ الْكِتَابُ لَا رَيْبَ ۛ فِيهِ ۛ هُدًى لِلْمُتَّقِينَ"},
-        {"id": "5", "ref": "Al-Baqarah (2:255)", "text": "اللَّهُ لَا إِلَٰهَ إِلَّا هُوَ الْحَيُّ الْقَيُّومُ ۚ لَا تَأْخُذُهُ سِنَةٌ وَلَا نَوْمٌ ۚ لَهُ مَا فِي السَّمَاوَاتِ وَمَا فِي الْأَرْضِ ۗ مَنْ ذَا الَّذِي يَشْفَعُ عِنْدَهُ إِلَّا بِإِذْنِهِ ۚ يَعْلَمُ مَا بَيْنَ أَيْدِيهِمْ وَمَا خَلْفَهُمْ ۖ وَلَا يُحِيطُونَ بِشَيْءٍ مِنْ عِلْمِهِ إِلَّا بِمَا شَاءَ ۚ وَسِعَ كُرْسِيُّهُ السَّمَاوَاتِ وَالْأَرْضَ ۖ وَلَا يَئُودُهُ حِفْظُهُمَا ۚ وَهُوَ الْعَلِيُّ الْعَظِيمُ"},
-        {"id": "6", "ref": "Al-Ikhlas (112:1)", "text": "قُلْ هُوَ اللَّهُ أَحَدٌ"},
-        {"id": "7", "ref": "Al-Ikhlas (112:2)", "text": "اللَّهُ الصَّمَدُ"},
-        {"id": "8", "ref": "Al-Ikhlas (112:3)", "text": "لَمْ يَلِدْ وَلَمْ يُولَدْ"},
-        {"id": "9", "ref": "Al-Ikhlas (112:4)", "text": "وَلَمْ يَكُنْ لَهُ كُفُوًا أَحَدٌ"},
-        {"id": "10", "ref": "Al-Falaq (113:1)", "text": "قُلْ أَعُوذُ بِرَبِّ الْفَلَقِ"},
+        {"surah": 1, "ayah": 1, "ref": "Al-Fatiha (1:1)", "text": "بِسْمِ اللَّهِ الرَّحْمَٰنِ الرَّحِيمِ"},
+        {"surah": 1, "ayah": 2, "ref": "Al-Fatiha (1:2)", "text": "الْحَمْدُ لِلَّهِ رَبِّ الْعَالَمِينَ"},
+        {"surah": 2, "ayah": 1, "ref": "Al-Baqarah (2:1)", "text": "الم"},
+        {"surah": 2, "ayah": 2, "ref": "Al-Baqarah (2:2)", "text": "ذَٰلِكَ الْكِتَابُ لَا رَيْبَ ۛ فِيهِ ۛ هُدًى لِلْمُتَّقِينَ"},
+        {"surah": 2, "ayah": 255, "ref": "Al-Baqarah (2:255)", "text": "اللَّهُ لَا إِلَٰهَ إِلَّا هُوَ الْحَيُّ الْقَيُّومُ ۚ لَا تَأْخُذُهُ سِنَةٌ وَلَا نَوْمٌ ۚ لَهُ مَا فِي السَّمَاوَاتِ وَمَا فِي الْأَرْضِ ۗ مَنْ ذَا الَّذِي يَشْفَعُ عِنْدَهُ إِلَّا بِإِذْنِهِ ۚ يَعْلَمُ مَا بَيْنَ أَيْدِيهِمْ وَمَا خَلْفَهُمْ ۖ وَلَا يُحِيطُونَ بِشَيْءٍ مِنْ عِلْمِهِ إِلَّا بِمَا شَاءَ ۚ وَسِعَ كُرْسِيُّهُ السَّمَاوَاتِ وَالْأَرْضَ ۖ وَلَا يَئُودُهُ حِفْظُهُمَا ۚ وَهُوَ الْعَلِيُّ الْعَظِيمُ"},
+        {"surah": 112, "ayah": 1, "ref": "Al-Ikhlas (112:1)", "text": "قُلْ هُوَ اللَّهُ أَحَدٌ"},
+        {"surah": 112, "ayah": 2, "ref": "Al-Ikhlas (112:2)", "text": "اللَّهُ الصَّمَدُ"},
+        {"surah": 112, "ayah": 3, "ref": "Al-Ikhlas (112:3)", "text": "لَمْ يَلِدْ وَلَمْ يُولَدْ"},
+        {"surah": 112, "ayah": 4, "ref": "Al-Ikhlas (112:4)", "text": "وَلَمْ يَكُنْ لَهُ كُفُوًا أَحَدٌ"},
+        {"surah": 113, "ayah": 1, "ref": "Al-Falaq (113:1)", "text": "قُلْ أَعُوذُ بِرَبِّ الْفَلَقِ"},
     ]
     
-    conn = get_connection()
-    cur = conn.cursor()
+    with content_writer() as conn:
+        cur = conn.cursor()
+        
+        normalized = normalize_many(verse["text"] for verse in sample_verses)
+        
+        for verse, text_normalized in zip(sample_verses, normalized):
+            # Ayat are keyed by their global number (1..6236)
+            ayah_id = str(coordinates.global_number(verse["surah"], verse["ayah"]))
+            cur.execute(
+                "INSERT OR IGNORE INTO ayat (id, ref, text, text_normalized) VALUES (?, ?, ?, ?)",
+                (ayah_id, verse["ref"], verse["text"], text_normalized)
+            )
+            # Store embedding using same connection
+            vec = model.encode(verse["text"])
+            blob = encode_vector(vec)
+            cur.execute(
+                "INSERT OR REPLACE INTO embeddings (ref_id, vector, text) VALUES (?, ?, ?)",
+                (ayah_id, blob, verse["text"])
+            )
+        
+        build_concordance(conn)
     
-    for verse in sample_verses:
-        # Insert ayah
-        cur.execute(
-            "INSERT OR IGNORE INTO ayat (id, ref, text) VALUES (?, ?, ?)",
-            (verse["id"], verse["ref"], verse["text"])
-        )
-        # Store embedding using same connection
-        vec = model.encode(verse["text"])
-        blob = pickle.dumps(vec)
-        cur.execute(
-            "INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?)",
-            (verse["id"], blob, verse["text"])
-        )
-    
-    conn.commit()
-    conn.close()
     print(f"   ✓ Loaded {len(sample_verses)} sample verses")
 
 def load_sample_azkar():
@@ -60,21 +66,18 @@ def load_sample_azkar():
         ("evening", "أَعُوذُ بِكَلِمَاتِ اللَّهِ التَّامَّاتِ"),
     ]
     
-    conn = get_connection()
-    cur = conn.cursor()
-    
-    for zikr_type, text in morning_azkar + evening_azkar:
-        cur.execute(
-            "INSERT OR IGNORE INTO azkar (type, text) VALUES (?, ?)",
-            (zikr_type, text)
-        )
+    with content_writer() as conn:
+        for zikr_type, text in morning_azkar + evening_azkar:
+            conn.execute(
+                "INSERT OR IGNORE INTO azkar (type, text) VALUES (?, ?)",
+                (zikr_type, text)
+            )
     
-    conn.commit()
-    conn.close()
     print(f"   ✓ Loaded {len(morning_azkar) + len(evening_azkar)} azkar")
 
 if __name__ == "__main__":
     print("🚀 Loading sample data...\n")
+    init_content_db()
     load_sample_quran()
     load_sample_azkar()
     print("\n✅ Sample data loaded successfully!")
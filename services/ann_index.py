@@ -0,0 +1,189 @@
+"""
+ANN Index - approximate nearest neighbours (IVF, optionally with PQ) in NumPy
+
+For corpora too large to score every row per query. Built offline from
+the semantic search vectors and saved next to them:
+
+    python -m services.ann_index [--pq SUBSPACES] [--nlist LISTS]
+
+IVF (inverted file): k-means splits the L2-normalized rows into `nlist`
+lists around coarse centroids. A query scores the centroids, scans only
+the `nprobe` closest lists and scores those rows exactly against the
+float32 matrix (which stays the memory-mapped sidecar, not a copy).
+
+PQ (product quantization, optional): each row's residual from its
+centroid is cut into `pq` subspaces and every piece replaced by the
+nearest of 256 codewords, so a row is `pq` uint8 codes. Scanning a list
+then costs a table lookup per code instead of a dot product over floats,
+and only the best `rerank` approximate hits are re-scored exactly.
+
+recall@k against brute force and latency per nprobe are measured by
+benchmarks/ann_index.py.
+"""
+
+import argparse
+import os
+
+import numpy as np
+
+ANN_INDEX_PATH = "data/embeddings.ivf.npz"
+
+# Lists scanned per query, and approximate PQ hits re-scored exactly
+NPROBE = 8
+RERANK = 100
+
+# k-means settings: Lloyd iterations, rows sampled for training
+KMEANS_ITERATIONS = 12
+TRAIN_SIZE = 50_000
+PQ_CODEWORDS = 256
+SEED = 20240101
+
+# Rows scored per block when assigning to centroids (bounds the temporaries)
+_BLOCK = 8192
+
+
+def _nearest(data: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Index of the closest centroid (L2) for every row of data"""
+    squared = np.einsum("ij,ij->i", centroids, centroids)
+    labels = np.empty(len(data), dtype=np.int64)
+    for first in range(0, len(data), _BLOCK):
+        block = np.asarray(data[first:first + _BLOCK], dtype=np.float32)
+        labels[first:first + _BLOCK] = np.argmin(squared - 2 * block @ centroids.T, axis=1)
+    return labels
+
+
+def kmeans(data: np.ndarray, k: int, iterations: int = KMEANS_ITERATIONS, seed: int = SEED) -> np.ndarray:
+    """(k, dim) float32 centroids from Lloyd's algorithm on at most TRAIN_SIZE rows"""
+    rng = np.random.default_rng(seed)
+    if len(data) > TRAIN_SIZE:
+        data = data[np.sort(rng.choice(len(data), TRAIN_SIZE, replace=False))]
+    data = np.asarray(data, dtype=np.float32)
+    k = min(k, len(data))
+    centroids = data[rng.choice(len(data), k, replace=False)].copy()
+    for _ in range(iterations):
+        labels = _nearest(data, centroids)
+        counts = np.bincount(labels, minlength=k)
+        order = np.argsort(labels, kind="stable")
+        filled = np.flatnonzero(counts)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[filled]
+        centroids[filled] = np.add.reduceat(data[order], starts, axis=0) / counts[filled, None]
+        # Empty clusters restart from random rows
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            centroids[empty] = data[rng.choice(len(data), len(empty), replace=False)]
+    return centroids
+
+
+class IVFIndex:
+    """Inverted lists over a row matrix, optionally product-quantized"""
+
+    def __init__(self, ids, centroids, offsets, order, codebooks=None, codes=None):
+        self.ids = ids
+        self.centroids = centroids
+        # Rows of list c are order[offsets[c]:offsets[c + 1]]
+        self.offsets = offsets
+        self.order = order
+        # codebooks: (pq, 256, dim // pq); codes: (rows, pq) uint8 in `order`
+        self.codebooks = codebooks
+        self.codes = codes
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    @property
+    def pq(self) -> int:
+        return 0 if self.codebooks is None else len(self.codebooks)
+
+    @classmethod
+    def build(cls, matrix: np.ndarray, ids, nlist: int = None, pq: int = 0, seed: int = SEED):
+        """Cluster L2-normalized rows into nlist lists (default ~sqrt(rows)); pq subspaces if pq > 0"""
+        rows, dimensions = matrix.shape
+        nlist = nlist or max(1, int(np.sqrt(rows)))
+        centroids = kmeans(matrix, nlist, seed=seed)
+        labels = _nearest(matrix, centroids)
+        order = np.argsort(labels, kind="stable")
+        offsets = np.concatenate(([0], np.cumsum(np.bincount(labels, minlength=len(centroids)))))
+
+        codebooks = codes = None
+        if pq:
+            if dimensions % pq:
+                raise ValueError(f"{dimensions} dimensions do not split into {pq} subspaces")
+            width = dimensions // pq
+            codebooks = np.empty((pq, min(PQ_CODEWORDS, rows), width), dtype=np.float32)
+            codes = np.empty((rows, pq), dtype=np.uint8)
+            owners = labels[order]
+            for m in range(pq):
+                columns = slice(m * width, (m + 1) * width)
+                piece = np.asarray(matrix[:, columns], dtype=np.float32)[order] - centroids[owners, columns]
+                codebooks[m] = kmeans(piece, PQ_CODEWORDS, seed=seed + m + 1)
+                codes[:, m] = _nearest(piece, codebooks[m])
+        return cls(np.asarray(ids), centroids, offsets, order, codebooks, codes)
+
+    def search(self, matrix: np.ndarray, query: np.ndarray, k: int = 5,
+               nprobe: int = NPROBE, rerank: int = RERANK) -> list:
+        """(row, score) of the best k rows among the nprobe closest lists, best first
+
+        `query` is L2-normalized and `matrix` the rows the index was built
+        from; final scores are always exact inner products.
+        """
+        coarse = self.centroids @ query
+        nprobe = min(nprobe, self.nlist)
+        probed = np.argpartition(-coarse, nprobe - 1)[:nprobe]
+        spans = [np.arange(self.offsets[cell], self.offsets[cell + 1]) for cell in probed]
+        positions = np.concatenate(spans)
+        if not len(positions):
+            return []
+
+        if self.codes is not None:
+            # Approximate scores: centroid part plus per-subspace table lookups
+            width = len(query) // self.pq
+            table = np.einsum("mcw,mw->mc", self.codebooks, query.reshape(self.pq, width))
+            approximate = np.repeat(coarse[probed], [len(s) for s in spans])
+            approximate += table[np.arange(self.pq), self.codes[positions]].sum(axis=1)
+            keep = min(max(rerank, k), len(positions))
+            positions = positions[np.argpartition(-approximate, keep - 1)[:keep]]
+
+        rows = np.sort(self.order[positions])
+        scores = np.asarray(matrix[rows], dtype=np.float32) @ query
+        k = min(k, len(rows))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(rows[i]), float(scores[i])) for i in top]
+
+    def save(self, path: str = None):
+        """Write the index to an .npz file (temp file + rename)"""
+        path = path or ANN_INDEX_PATH
+        arrays = {"ids": self.ids, "centroids": self.centroids, "offsets": self.offsets, "order": self.order}
+        if self.codes is not None:
+            arrays.update(codebooks=self.codebooks, codes=self.codes)
+        with open(path + ".tmp", "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(path + ".tmp", path)
+
+    @classmethod
+    def load(cls, path: str = None):
+        with np.load(path or ANN_INDEX_PATH, allow_pickle=False) as data:
+            return cls(
+                data["ids"], data["centroids"], data["offsets"], data["order"],
+                data["codebooks"] if "codebooks" in data else None,
+                data["codes"] if "codes" in data else None,
+            )
+
+
+if __name__ == "__main__":
+    import time
+
+    from services.semantic_search import load_vectors
+
+    parser = argparse.ArgumentParser(description="Build the IVF(+PQ) index over the semantic search vectors")
+    parser.add_argument("--nlist", type=int, default=None, help="inverted lists (default: sqrt of the rows)")
+    parser.add_argument("--pq", type=int, default=0, help="PQ subspaces, 0 for exact IVF lists")
+    args = parser.parse_args()
+
+    vectors = load_vectors()
+    print(f"🧭 Building IVF index over {len(vectors)} vectors...")
+    started = time.perf_counter()
+    index = IVFIndex.build(vectors.matrix, vectors.ids, args.nlist, args.pq)
+    index.save()
+    print(f"   ✓ {index.nlist} lists, pq={index.pq}, {time.perf_counter() - started:.1f}s -> {ANN_INDEX_PATH}")
@@ -0,0 +1,59 @@
+"""
+Arabic Normalizer - one canonical spelling for stored text and queries
+
+The stored Uthmani text is fully vocalized while users type bare letters,
+so both sides are reduced to the same form before they are compared:
+
+    tashkeel, Quranic annotation and waqf marks, tatweel   removed
+    ء on the line (Uthmani ءامنوا, typed آمنوا)              removed
+    أ إ آ ٱ                                                 ا
+    ؤ / ئ                                                   و / ي
+    ة                                                       ه
+    ى (and Persian ی)                                       ي
+
+Everything is one str.translate table built at import, so normalizing is
+a single C-level pass; normalize_many() does a whole column in one call.
+"""
+
+# Harakat, tanween, shadda, sukun, hamza above/below and their relatives
+_DIACRITICS = [*range(0x064B, 0x0660), 0x0670]
+
+# Honorific signs, small high letters, waqf marks, rub el hizb, sajdah
+_QURANIC_MARKS = [*range(0x0610, 0x061B), *range(0x06D6, 0x06EE), *range(0x08D3, 0x0900)]
+
+_TATWEEL = [0x0640]
+
+_HAMZA = [0x0621]
+
+_LETTERS = {
+    "أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا", "ٲ": "ا", "ٳ": "ا",
+    "ؤ": "و",
+    "ئ": "ي",
+    "ة": "ه",
+    "ى": "ي", "ی": "ي",
+    "ک": "ك",
+}
+
+_TABLE = str.maketrans({
+    **dict.fromkeys(_DIACRITICS + _QURANIC_MARKS + _TATWEEL + _HAMZA),
+    **{ord(k): v for k, v in _LETTERS.items()},
+})
+
+# Separates texts in normalize_many(); none of the tables touch it
+_SEPARATOR = "\n"
+
+
+def normalize(text: str) -> str:
+    """Canonical form of Arabic text, with whitespace collapsed"""
+    if not text:
+        return ""
+    return " ".join(text.translate(_TABLE).split())
+
+
+def normalize_many(texts) -> list:
+    """normalize() for a batch: one translate over the joined texts"""
+    texts = [(text or "").replace(_SEPARATOR, " ") for text in texts]
+    if not texts:
+        return []
+    joined = _SEPARATOR.join(texts).translate(_TABLE)
+    return [" ".join(line.split()) for line in joined.split(_SEPARATOR)]
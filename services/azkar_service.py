@@ -1,8 +1,8 @@
-from db.database import get_connection
+from db.database import get_content_connection
 import random
 
 def get_zikr(time):
-    conn = get_connection()
+    conn = get_content_connection()
     cur = conn.cursor()
     cur.execute("SELECT text FROM azkar WHERE type=?", (time,))
     rows = cur.fetchall()
@@ -4,7 +4,9 @@ Complete Quran Service - Full Mushaf with all 6236 verses
 
 import requests
 import json
-from db.database import get_connection
+from services import quran_coordinates as coordinates
+from services import quran_search
+from services.quran_corpus import get_corpus
 
 # Complete Quran structure with surah information
 QURAN_STRUCTURE = {
@@ -129,22 +131,15 @@ def get_surah_info_complete(surah_number):
     return QURAN_STRUCTURE.get(surah_number, None)
 
 def get_ayah_text(surah_number, ayah_number):
-    """Get specific ayah text from database"""
+    """Get specific ayah text from the in-memory corpus"""
     try:
-        conn = get_connection()
-        cur = conn.cursor()
+        corpus = get_corpus()
+        ayah = corpus.ayah(corpus.global_number(surah_number, ayah_number))
         
-        # Calculate global ayah number
-        ayah_id = calculate_global_ayah_number(surah_number, ayah_number)
-        
-        cur.execute("SELECT text, ref FROM ayat WHERE id=?", (str(ayah_id),))
-        row = cur.fetchone()
-        conn.close()
-        
-        if row:
+        if ayah:
             return {
-                "text": row['text'],
-                "ref": row['ref'],
+                "text": ayah['text'],
+                "ref": ayah['ref'],
                 "surah": surah_number,
                 "ayah": ayah_number
             }
@@ -162,24 +157,16 @@ def get_surah_text(surah_number, start_ayah=1, end_ayah=None):
         
         if end_ayah is None or end_ayah > surah_info['verses']:
             end_ayah = surah_info['verses']
+        start_ayah = max(start_ayah, 1)
         
-        conn = get_connection()
-        cur = conn.cursor()
-        
-        # Get all ayahs in range
-        ayahs = []
-        for ayah_num in range(start_ayah, end_ayah + 1):
-            ayah_id = calculate_global_ayah_number(surah_number, ayah_num)
-            cur.execute("SELECT text, ref FROM ayat WHERE id=?", (str(ayah_id),))
-            row = cur.fetchone()
-            if row:
-                ayahs.append({
-                    "number": ayah_num,
-                    "text": row['text'],
-                    "ref": row['ref']
-                })
-        
-        conn.close()
+        # One contiguous slice of the corpus, no per-verse queries
+        corpus = get_corpus()
+        first = corpus.global_number(surah_number, start_ayah)
+        last = corpus.global_number(surah_number, end_ayah)
+        ayahs = [
+            {"number": ayah['ayah'], "text": ayah['text'], "ref": ayah['ref']}
+            for ayah in corpus.ayahs(first, last)
+        ] if first and last else []
         
         return {
             "surah_name": surah_info['name'],
@@ -196,47 +183,85 @@ def get_surah_text(surah_number, start_ayah=1, end_ayah=None):
 
 def calculate_global_ayah_number(surah_number, ayah_number):
     """Calculate global ayah number from surah and ayah"""
-    global_ayah = 0
-    for surah in range(1, surah_number):
-        global_ayah += QURAN_STRUCTURE[surah]['verses']
-    global_ayah += ayah_number
-    return global_ayah
+    return coordinates.global_number(surah_number, ayah_number)
+
+def locate_global_ayah(global_number):
+    """(surah, ayah) for a global ayah number"""
+    return coordinates.locate(global_number)
+
+def get_ayah_position(surah_number, ayah_number):
+    """Where an ayah sits in the mushaf: global number, juz, hizb, page and ruku (None if out of range)"""
+    surah_info = QURAN_STRUCTURE.get(surah_number)
+    if not surah_info or not 1 <= ayah_number <= surah_info['verses']:
+        return None
+    number = coordinates.global_number(surah_number, ayah_number)
+    quarter = coordinates.unit_of(coordinates.HIZB_QUARTER_START, number)
+    return {
+        "global": number,
+        "juz": coordinates.unit_of(coordinates.JUZ_START, number),
+        "hizb": (quarter - 1) // 4 + 1,
+        "hizb_quarter": quarter,
+        "page": coordinates.unit_of(coordinates.PAGE_START, number),
+        "ruku": coordinates.unit_of(coordinates.RUKU_START, number)
+    }
+
+def _unit_info(starts, unit):
+    first, last = coordinates.unit_range(starts, unit)
+    return {
+        "first_global": first,
+        "last_global": last,
+        "start": coordinates.locate(first),
+        "end": coordinates.locate(last)
+    }
+
+def get_juz_info(juz_number):
+    """Ayah range of a juz (1-30)"""
+    if not 1 <= juz_number <= len(coordinates.JUZ_START):
+        return None
+    return {"juz": juz_number, **_unit_info(coordinates.JUZ_START, juz_number)}
 
 def get_page_info(page_number):
-    """Get information about a Quran page (Mushaf page)"""
-    if not 1 <= page_number <= 604:
+    """Get information about a Quran page (Madani Mushaf page)"""
+    if not 1 <= page_number <= len(coordinates.PAGE_START):
         return None
     
-    # Approximate mapping (simplified)
-    # In a real implementation, you'd have a complete page-to-ayah mapping
+    info = _unit_info(coordinates.PAGE_START, page_number)
     return {
         "page": page_number,
-        "juz": ((page_number - 1) // 20) + 1,
+        "juz": coordinates.unit_of(coordinates.JUZ_START, info["first_global"]),
+        **info,
         "note": "صفحة {} من 604".format(page_number)
     }
 
-def search_in_quran(query):
-    """Search for text in Quran"""
+def _with_text(info):
+    if info:
+        corpus = get_corpus()
+        info["ayahs"] = corpus.ayahs(info["first_global"], info["last_global"])
+    return info
+
+def get_juz_text(juz_number):
+    """Juz range plus the text of its ayahs"""
     try:
-        conn = get_connection()
-        cur = conn.cursor()
-        
-        cur.execute("SELECT id, text, ref FROM ayat WHERE text LIKE ? LIMIT 10", (f"%{query}%",))
-        rows = cur.fetchall()
-        conn.close()
-        
-        results = []
-        for row in rows:
-            results.append({
-                "id": row['id'],
-                "text": row['text'],
-                "ref": row['ref']
-            })
-        
-        return results
+        return _with_text(get_juz_info(juz_number))
+    except Exception as e:
+        print(f"Error getting juz text: {e}")
+        return None
+
+def get_page_text(page_number):
+    """Page range plus the text of its ayahs"""
+    try:
+        return _with_text(get_page_info(page_number))
+    except Exception as e:
+        print(f"Error getting page text: {e}")
+        return None
+
+def search_in_quran(query, after=None, limit=quran_search.PAGE_SIZE, mode="text"):
+    """Search for text in Quran, one page at a time (see services.quran_search)"""
+    try:
+        return quran_search.search_page(query, after, limit, mode)
     except Exception as e:
         print(f"Error searching Quran: {e}")
-        return []
+        return {"results": [], "total": 0, "next": None}
 
 def get_quran_stats():
     """Get Quran statistics"""
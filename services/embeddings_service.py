@@ -2,13 +2,36 @@
 Mock embeddings service for testing without heavy ML dependencies
 """
 
+import os
 import pickle
-from db.database import get_connection
+import sys
+import time
+
+import numpy as np
+
+from db.database import content_connection, content_writer
+
+# embeddings.vector holds raw little-endian float32, read with np.frombuffer
+VECTOR_DTYPE = np.dtype("<f4")
+
+# Sidecar written by export_embeddings() and memory-mapped by semantic_search:
+# L2-normalized rows, ids in the matching .ids.npy
+EMBEDDINGS_PATH = "data/embeddings.npy"
+
+# Names the vectors in embedding_progress; change it with the model so a
+# new model re-embeds everything instead of resuming the old one's run
+MODEL_NAME = "mock-md5-384"
+
+# Texts per model call, and verses per transaction/checkpoint
+BATCH_SIZE = 64
+CHUNK_SIZE = 1024
 
 # Mock model
 class MockModel:
-    def encode(self, text):
-        """Return a simple hash-based vector instead of ML embedding"""
+    def encode(self, text, batch_size=BATCH_SIZE):
+        """Return a simple hash-based vector instead of ML embedding (a list of them for a list of texts)"""
+        if not isinstance(text, str):
+            return [self.encode(t) for t in text]
         # Create a simple vector based on text hash
         import hashlib
         hash_val = int(hashlib.md5(text.encode()).hexdigest(), 16)
@@ -18,20 +41,199 @@ class MockModel:
 
 model = MockModel()
 
-def store_embedding(ref_id, text):
-    """Store text with mock embedding"""
+def encode_vector(vector) -> bytes:
+    """BLOB for embeddings.vector: raw little-endian float32"""
+    return np.asarray(vector, dtype=VECTOR_DTYPE).tobytes()
+
+def decode_vector(blob) -> np.ndarray:
+    """Read-only float32 view of an embeddings.vector BLOB"""
+    return np.frombuffer(blob, dtype=VECTOR_DTYPE)
+
+def store_embedding(ref_id, text, conn=None):
+    """Store text with mock embedding (pass the loader's content connection to batch writes)"""
     try:
-        vec = model.encode(text)
-        blob = pickle.dumps(vec)
-        
-        conn = get_connection()
-        cur = conn.cursor()
-        cur.execute(
-            "INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?)",
-            (ref_id, blob, text)
-        )
-        conn.commit()
-        conn.close()
+        blob = encode_vector(model.encode(text))
+
+        if conn is None:
+            with content_writer() as writer:
+                writer.execute(
+                    "INSERT OR REPLACE INTO embeddings (ref_id, vector, text) VALUES (?, ?, ?)",
+                    (ref_id, blob, text)
+                )
+        else:
+            conn.execute(
+                "INSERT OR REPLACE INTO embeddings (ref_id, vector, text) VALUES (?, ?, ?)",
+                (ref_id, blob, text)
+            )
         print(f"✓ Stored embedding for {ref_id}")
     except Exception as e:
         print(f"Error storing embedding: {e}")
+
+def encode_texts(texts, batch_size=BATCH_SIZE) -> np.ndarray:
+    """(len(texts), dim) float32 vectors, one model call per batch_size texts"""
+    texts = list(texts)
+    batches = [
+        np.asarray(model.encode(texts[i:i + batch_size], batch_size=batch_size), dtype=VECTOR_DTYPE)
+        for i in range(0, len(texts), batch_size)
+    ]
+    return np.vstack(batches) if batches else np.empty((0, 0), dtype=VECTOR_DTYPE)
+
+def generate_embeddings(batch_size=BATCH_SIZE, chunk_size=CHUNK_SIZE, model_name=MODEL_NAME, report=print) -> dict:
+    """Embed every ayah not yet covered by the model's checkpoint; returns counts and verses/second
+
+    Each chunk is committed with the last global ayah it covers in
+    embedding_progress, so an interrupted run resumes after that commit.
+    """
+    with content_writer() as conn:
+        row = conn.execute("SELECT last_ayah FROM embedding_progress WHERE model = ?", (model_name,)).fetchone()
+        resume_after = row[0] if row else 0
+        pending = sorted(
+            (int(ayah_id), text)
+            for ayah_id, text in conn.execute("SELECT id, text FROM ayat")
+            if str(ayah_id).isdigit() and int(ayah_id) > resume_after
+        )
+        if resume_after and pending:
+            report(f"   ↻ Resuming after ayah {resume_after}, {len(pending)} verses left")
+
+        started = time.perf_counter()
+        done = 0
+        for first in range(0, len(pending), chunk_size):
+            chunk = pending[first:first + chunk_size]
+            vectors = encode_texts((text for _, text in chunk), batch_size)
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (ref_id, vector, text) VALUES (?, ?, ?)",
+                [(str(number), vector.tobytes(), text) for (number, text), vector in zip(chunk, vectors)]
+            )
+            conn.execute("""
+                INSERT INTO embedding_progress (model, last_ayah, updated_at) VALUES (?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT (model) DO UPDATE SET last_ayah = excluded.last_ayah, updated_at = excluded.updated_at
+            """, (model_name, chunk[-1][0]))
+            conn.commit()
+
+            done += len(chunk)
+            elapsed = time.perf_counter() - started
+            report(f"   … {done}/{len(pending)} verses, {done / elapsed:.0f} verses/s")
+
+    elapsed = time.perf_counter() - started
+    return {
+        "embedded": done,
+        "resumed_after": resume_after,
+        "seconds": elapsed,
+        "rate": done / elapsed if done else 0.0,
+    }
+
+def _pickled_vector(blob):
+    """The list in a legacy pickled BLOB, or None for a float32 one"""
+    # Pickles start with the PROTO opcode and end with STOP
+    if not blob or blob[:1] != b"\x80" or blob[-1:] != b".":
+        return None
+    try:
+        vector = pickle.loads(blob)
+    except Exception:
+        return None
+    return vector if isinstance(vector, (list, tuple)) else None
+
+def convert_pickled_embeddings(conn) -> int:
+    """Rewrite pickled embeddings.vector rows as float32 BLOBs; returns the number converted
+
+    Only meant for rows this service wrote itself: unpickling runs code
+    from the BLOB, which is why the format was replaced.
+    """
+    converted = []
+    for ref_id, blob in conn.execute("SELECT ref_id, vector FROM embeddings").fetchall():
+        vector = _pickled_vector(blob)
+        if vector is not None:
+            converted.append((encode_vector(vector), ref_id))
+    conn.executemany("UPDATE embeddings SET vector = ? WHERE ref_id = ?", converted)
+    return len(converted)
+
+def quantize(matrix: np.ndarray):
+    """(int8 codes, float32 scale, float32 offset) with per-dimension 8-bit ranges"""
+    # vector ~= (code + 128) * scale + offset
+    offset = matrix.min(axis=0).astype(np.float32)
+    scale = ((matrix.max(axis=0) - offset) / 255).astype(np.float32)
+    scale[scale == 0] = 1
+    codes = np.clip(np.rint((matrix - offset) / scale), 0, 255) - 128
+    return codes.astype(np.int8), scale, offset
+
+def dequantize(codes: np.ndarray, scale: np.ndarray, offset: np.ndarray) -> np.ndarray:
+    return (codes.astype(np.float32) + 128) * scale + offset
+
+def quantize_embeddings(conn, model_name=MODEL_NAME) -> int:
+    """Fill embeddings.vector_int8 and the model's embedding_scales from the float32 vectors"""
+    rows = [
+        (ref_id, blob)
+        for ref_id, blob in conn.execute("SELECT ref_id, vector FROM embeddings WHERE vector IS NOT NULL").fetchall()
+        if _pickled_vector(blob) is None
+    ]
+    if not rows:
+        return 0
+    width = len(rows[0][1])
+    rows = [(ref_id, blob) for ref_id, blob in rows if len(blob) == width]
+    matrix = np.frombuffer(b"".join(blob for _, blob in rows), dtype=VECTOR_DTYPE).reshape(len(rows), -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    codes, scale, offset = quantize(matrix / norms)
+
+    conn.execute("UPDATE embeddings SET vector_int8 = NULL")
+    conn.executemany(
+        "UPDATE embeddings SET vector_int8 = ? WHERE ref_id = ?",
+        [(code.tobytes(), ref_id) for (ref_id, _), code in zip(rows, codes)]
+    )
+    conn.execute(
+        "INSERT OR REPLACE INTO embedding_scales (model, scale, offset) VALUES (?, ?, ?)",
+        (model_name, scale.astype(VECTOR_DTYPE).tobytes(), offset.astype(VECTOR_DTYPE).tobytes())
+    )
+    return len(rows)
+
+def sidecar_paths(path=None):
+    """(matrix, ids) .npy paths of the embeddings sidecar"""
+    path = path or EMBEDDINGS_PATH
+    return path, path[:-len(".npy")] + ".ids.npy"
+
+def export_embeddings(path=None) -> int:
+    """Write every float32 embedding, L2-normalized, to the .npy sidecar; returns the row count"""
+    matrix_path, ids_path = sidecar_paths(path)
+    with content_connection() as conn:
+        rows = conn.execute("SELECT ref_id, vector FROM embeddings WHERE vector IS NOT NULL ORDER BY ref_id").fetchall()
+    rows = [(ref_id, blob) for ref_id, blob in rows if _pickled_vector(blob) is None]
+    if not rows:
+        return 0
+
+    width = len(rows[0][1])
+    rows = [(ref_id, blob) for ref_id, blob in rows if len(blob) == width]
+    matrix = np.frombuffer(b"".join(blob for _, blob in rows), dtype=VECTOR_DTYPE).reshape(len(rows), -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    ids = np.array([str(ref_id) for ref_id, _ in rows])
+
+    # Written beside the target and renamed, so readers never map a partial file
+    for target, array in ((ids_path, ids), (matrix_path, matrix / norms)):
+        with open(target + ".tmp", "wb") as f:
+            np.save(f, array)
+        os.replace(target + ".tmp", target)
+    return len(rows)
+
+if __name__ == "__main__":
+    # embed: run/resume generate_embeddings(); convert: pickled rows -> float32;
+    # export: write the .npy sidecar; quantize: fill embeddings.vector_int8
+    from db.models import init_content_db
+
+    if len(sys.argv) != 2 or sys.argv[1] not in ("embed", "convert", "export", "quantize"):
+        print("Usage: python -m services.embeddings_service embed|convert|export|quantize")
+        sys.exit(1)
+    init_content_db()
+    if sys.argv[1] == "embed":
+        stats = generate_embeddings()
+        print(f"✓ Embedded {stats['embedded']} verses at {stats['rate']:.0f} verses/s")
+    elif sys.argv[1] == "convert":
+        with content_writer() as conn:
+            count = convert_pickled_embeddings(conn)
+        print(f"✓ Converted {count} pickled embeddings to float32")
+    elif sys.argv[1] == "quantize":
+        with content_writer() as conn:
+            count = quantize_embeddings(conn)
+        print(f"✓ Quantized {count} embeddings to int8")
+    else:
+        count = export_embeddings()
+        print(f"✓ Exported {count} embeddings to {EMBEDDINGS_PATH}")
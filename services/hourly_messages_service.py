@@ -12,7 +12,8 @@ from services.quran_service import get_random_ayah
 from services.azkar_service import get_zikr
 from services.hadith_service import get_random_hadith
 from services.islamic_knowledge_service import get_dua
-from db.database import get_connection
+from db.storage import transaction
+from db.async_executor import run_read, run_write
 
 logger = logging.getLogger(__name__)
 
@@ -38,7 +39,7 @@ class HourlyMessagesService:
     async def send_hourly_message(self):
         """Send random Islamic message to all configured channels"""
         try:
-            channels = self._get_hourly_message_channels()
+            channels = await run_read(get_hourly_message_channels)
             
             if not channels:
                 logger.info("No channels configured for hourly messages")
@@ -122,7 +123,7 @@ class HourlyMessagesService:
                 return embed
             
             elif message_type == "ayah":
-                ayah_data = get_random_ayah()
+                ayah_data = await run_write(get_random_ayah)
                 
                 embed = discord.Embed(
                     title=f"📖 {ayah_data['ref']}",
@@ -139,63 +140,62 @@ class HourlyMessagesService:
             logger.error(f"Error generating message: {e}")
             return None
     
-    def _get_hourly_message_channels(self) -> list:
-        """Get list of channel IDs configured for hourly messages"""
-        try:
-            conn = get_connection()
-            cur = conn.cursor()
-            cur.execute(
-                "SELECT channel_id FROM scheduled_azkar WHERE schedule_type='hourly_messages' AND is_active=1"
-            )
-            rows = cur.fetchall()
-            conn.close()
-            return [row['channel_id'] for row in rows]
-        except Exception as e:
-            logger.error(f"Error getting hourly message channels: {e}")
-            return []
-    
     def stop(self):
         """Stop the scheduler"""
         if self.scheduler.running:
             self.scheduler.shutdown()
             logger.info("Hourly messages scheduler stopped")
 
-async def setup_hourly_messages_command(bot, interaction: discord.Interaction):
-    """Command to configure hourly messages"""
+def get_hourly_message_channels() -> list:
+    """Get list of channel IDs configured for hourly messages"""
     try:
-        guild_id = str(interaction.guild_id)
-        channel_id = str(interaction.channel_id)
-        
-        conn = get_connection()
-        cur = conn.cursor()
-        
+        with transaction() as conn:
+            rows = conn.execute(
+                "SELECT channel_id FROM scheduled_azkar WHERE schedule_type='hourly_messages' AND is_active=1"
+            ).fetchall()
+        return [row['channel_id'] for row in rows]
+    except Exception as e:
+        logger.error(f"Error getting hourly message channels: {e}")
+        return []
+
+def toggle_hourly_messages(guild_id: str, channel_id: str) -> bool:
+    """Toggle hourly messages for a channel, returns True when it is now enabled"""
+    with transaction() as conn:
         # Check if already configured
-        cur.execute(
+        existing = conn.execute(
             "SELECT id FROM scheduled_azkar WHERE guild_id=? AND channel_id=? AND schedule_type='hourly_messages'",
             (guild_id, channel_id)
-        )
+        ).fetchone()
         
-        if cur.fetchone():
+        if existing:
             # Toggle off
-            cur.execute(
+            conn.execute(
                 "DELETE FROM scheduled_azkar WHERE guild_id=? AND channel_id=? AND schedule_type='hourly_messages'",
                 (guild_id, channel_id)
             )
-            conn.commit()
-            conn.close()
+            return False
+        
+        # Add new schedule
+        conn.execute(
+            "INSERT INTO scheduled_azkar (guild_id, channel_id, schedule_type, schedule_time, is_active) VALUES (?, ?, 'hourly_messages', '00:00', 1)",
+            (guild_id, channel_id)
+        )
+        return True
+
+async def setup_hourly_messages_command(bot, interaction: discord.Interaction):
+    """Command to configure hourly messages"""
+    try:
+        guild_id = str(interaction.guild_id)
+        channel_id = str(interaction.channel_id)
+        
+        enabled = await run_write(toggle_hourly_messages, guild_id, channel_id)
+        
+        if not enabled:
             await interaction.response.send_message(
                 "✅ تم إلغاء الرسائل الساعية في هذه القناة.",
                 ephemeral=True
             )
         else:
-            # Add new schedule
-            cur.execute(
-                "INSERT INTO scheduled_azkar (guild_id, channel_id, schedule_type, schedule_time, is_active) VALUES (?, ?, 'hourly_messages', '00:00', 1)",
-                (guild_id, channel_id)
-            )
-            conn.commit()
-            conn.close()
-            
             await interaction.response.send_message(
                 "✅ تم تفعيل الرسائل الساعية في هذه القناة!\n\n"
                 "سيتم إرسال رسالة عشوائية كل ساعة:\n"
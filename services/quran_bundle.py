@@ -0,0 +1,194 @@
+"""
+Quran Bundle - the whole corpus in one binary file, built offline and mmapped
+
+data_loader.py downloads the mushaf into the content database; building a
+bundle from it once means a deploy only has to ship data/quran.bundle.
+At startup the file is memory-mapped and the corpus buffers become views
+into it: no network, no SQLite, no per-ayah objects, and the OS pages in
+only the parts that are actually read.
+
+Layout (little-endian, sections 8-byte aligned):
+
+    header     magic, format version, section count, ayah count,
+               sha256 of everything after the section table
+    sections   (name, offset, length) for each section below
+    textoff    uint32[total + 1]   byte offsets of each ayah in `text`
+    text       UTF-8 verse texts back to back
+    refoff     uint32[total + 1]   byte offsets of each ref in `refs`
+    refs       UTF-8 refs back to back
+    surahs     uint32[115]         0-based global index of each surah's start
+    surahof    uint8[total]        surah of every global ayah
+    ayahof     uint16[total]       ayah number within its surah
+
+Juz/hizb/page/ruku boundaries and surah names are not stored: they are
+constants in quran_coordinates and complete_quran_service, already in
+memory without touching the network or SQLite.
+
+Opening checks the header and section bounds only; verify() hashes the
+payload and is run by the build step, since hashing at startup would
+fault in every page.
+
+    python -m services.quran_bundle          # build from data/content.db
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+BUNDLE_PATH = "data/quran.bundle"
+
+MAGIC = b"QURANBDL"
+FORMAT_VERSION = 2
+
+_HEADER = struct.Struct("<8sHHI32s")
+_SECTION = struct.Struct("<8sII")
+_ALIGN = 8
+
+# Section name -> array typecode of its items
+SECTION_TYPES = {
+    "textoff": "I", "text": "B", "refoff": "I", "refs": "B",
+    "surahs": "I", "surahof": "B", "ayahof": "H",
+}
+
+
+def _typed(view: memoryview, typecode: str):
+    """Zero-copy typed view of little-endian data (a swapped copy on big-endian hosts)"""
+    if typecode == "B":
+        return view
+    if sys.byteorder == "little":
+        return view.cast(typecode)
+    values = array(typecode, view)
+    values.byteswap()
+    return values
+
+
+def build_bundle(corpus, path: str = None) -> dict:
+    """Write a corpus (services.quran_corpus.QuranCorpus) to a bundle file"""
+    path = path or BUNDLE_PATH
+    total = corpus.total
+
+    def packed(typecode, values):
+        values = array(typecode, values)
+        if sys.byteorder != "little":
+            values.byteswap()
+        return values.tobytes()
+
+    sections = {
+        "textoff": packed("I", corpus._offsets),
+        "text": bytes(corpus._text),
+        "refoff": packed("I", corpus._ref_offsets),
+        "refs": bytes(corpus._refs),
+        "surahs": packed("I", corpus.surah_start),
+        "surahof": packed("B", corpus.surah_of),
+        "ayahof": packed("H", corpus.ayah_of),
+    }
+
+    table_end = _HEADER.size + _SECTION.size * len(sections)
+    payload = bytearray()
+    entries = []
+    for name, data in sections.items():
+        payload.extend(b"\0" * (-(table_end + len(payload)) % _ALIGN))
+        entries.append(_SECTION.pack(name.encode("ascii"), table_end + len(payload), len(data)))
+        payload.extend(data)
+
+    digest = hashlib.sha256(payload).digest()
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, len(sections), total, digest)
+
+    # Written next to the target and renamed, so a running bot never maps half a file
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(b"".join(entries))
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+    return {"path": path, "bytes": table_end + len(payload), "ayat": len(corpus), "sha256": digest.hex()}
+
+
+class QuranBundle:
+    """Read-only mapping of a bundle file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buf = memoryview(self._mmap)
+
+        if len(self._buf) < _HEADER.size:
+            raise ValueError(f"{path}: truncated header")
+        magic, version, count, self.total, self.sha256 = _HEADER.unpack_from(self._buf)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a Quran bundle")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{path}: format version {version}, expected {FORMAT_VERSION}")
+
+        self._payload_start = _HEADER.size + _SECTION.size * count
+        self._sections = {}
+        for i in range(count):
+            name, offset, length = _SECTION.unpack_from(self._buf, _HEADER.size + i * _SECTION.size)
+            if offset < self._payload_start or offset + length > len(self._buf):
+                raise ValueError(f"{path}: section {name!r} out of bounds")
+            self._sections[name.rstrip(b"\0").decode("ascii")] = (offset, length)
+
+        missing = SECTION_TYPES.keys() - self._sections.keys()
+        if missing:
+            raise ValueError(f"{path}: missing sections {sorted(missing)}")
+
+    def section(self, name: str):
+        """Typed zero-copy view of one section"""
+        offset, length = self._sections[name]
+        return _typed(self._buf[offset:offset + length], SECTION_TYPES[name])
+
+    def verify(self) -> bool:
+        """Whether the payload still matches the checksum in the header"""
+        return hashlib.sha256(self._buf[self._payload_start:]).digest() == self.sha256
+
+    def corpus(self):
+        from services.quran_corpus import QuranCorpus
+
+        return QuranCorpus(
+            self.section("text"), self.section("textoff"),
+            self.section("refs"), self.section("refoff"),
+            self.section("surahs"), self.section("surahof"), self.section("ayahof"),
+        )
+
+
+def bundle_stamp(path: str = None):
+    """Identity of the bundle on disk (None when there is none), to notice rebuilds"""
+    try:
+        st = os.stat(path or BUNDLE_PATH)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def open_bundle(path: str = None):
+    """The bundle if one was built and is readable, else None"""
+    path = path or BUNDLE_PATH
+    if not os.path.exists(path):
+        return None
+    try:
+        return QuranBundle(path)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring Quran bundle: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    from db.models import init_content_db
+    from services.quran_corpus import read_content_corpus
+
+    init_content_db()
+    print("📦 Building Quran bundle...")
+    corpus = read_content_corpus()
+    if not len(corpus):
+        print("   ✗ No ayat in the content database, run data_loader.py first")
+        sys.exit(1)
+    info = build_bundle(corpus)
+    if not QuranBundle(info["path"]).verify():
+        print("   ✗ Checksum mismatch after writing")
+        sys.exit(1)
+    print(f"   ✓ {info['ayat']} ayat, {info['bytes'] / 1024:.0f} KiB -> {info['path']}")
@@ -0,0 +1,154 @@
+"""
+Quran Concordance - where every word of the Quran occurs
+
+For each normalized word (see services/arabic_normalizer) the concordance
+table stores its occurrence and ayah counts and a postings BLOB listing
+every (global ayah, word position) in mushaf order. Positions are 1-based
+indexes into the ayah's normalized words. Postings are delta-varint
+encoded, two LEB128 varints per occurrence:
+
+    ayah delta    0 when the occurrence is in the same ayah as the previous
+    position      the position, or its delta from the previous one in the same ayah
+
+so the ~80k occurrences of the whole Quran take a few hundred KB. The table
+is built from ayat.text_normalized by init_content_db and the loaders, and
+answers word lookups, exact phrase matches and frequency breakdowns without
+scanning the text.
+"""
+
+from collections import Counter
+from functools import lru_cache
+
+from db.database import content_connection, content_generation
+from services import quran_coordinates as coordinates
+from services.arabic_normalizer import normalize
+
+# Decoded postings kept in memory (the commonest word decodes to ~2.7k pairs)
+POSTINGS_CACHE_SIZE = 512
+
+
+def _write_varint(out: bytearray, n: int):
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def encode_postings(postings) -> bytes:
+    """Delta-varint bytes for (ayah, position) pairs sorted in mushaf order"""
+    out = bytearray()
+    last_ayah = last_position = 0
+    for ayah, position in postings:
+        if ayah == last_ayah:
+            _write_varint(out, 0)
+            _write_varint(out, position - last_position)
+        else:
+            _write_varint(out, ayah - last_ayah)
+            _write_varint(out, position)
+        last_ayah, last_position = ayah, position
+    return bytes(out)
+
+
+def decode_postings(blob: bytes) -> list:
+    """(ayah, position) pairs from encode_postings() bytes"""
+    values = []
+    n = shift = 0
+    for byte in blob:
+        n |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            values.append(n)
+            n = shift = 0
+
+    postings = []
+    ayah = position = 0
+    it = iter(values)
+    for ayah_delta, value in zip(it, it):
+        if ayah_delta:
+            ayah += ayah_delta
+            position = value
+        else:
+            position += value
+        postings.append((ayah, position))
+    return postings
+
+
+def build_concordance(conn) -> int:
+    """Rebuild the concordance table from ayat.text_normalized; returns the number of words"""
+    index = {}
+    rows = conn.execute("SELECT id, text_normalized FROM ayat WHERE text_normalized IS NOT NULL").fetchall()
+    for ayah, text in sorted((int(row[0]), row[1]) for row in rows if str(row[0]).isdigit()):
+        for position, word in enumerate(text.split(), 1):
+            index.setdefault(word, []).append((ayah, position))
+
+    conn.execute("DELETE FROM concordance")
+    conn.executemany(
+        "INSERT INTO concordance (word, occurrences, ayat, postings) VALUES (?, ?, ?, ?)",
+        (
+            (word, len(postings), len({ayah for ayah, _ in postings}), encode_postings(postings))
+            for word, postings in index.items()
+        )
+    )
+    return len(index)
+
+
+@lru_cache(maxsize=POSTINGS_CACHE_SIZE)
+def _postings(word: str, generation) -> tuple:
+    with content_connection() as conn:
+        row = conn.execute("SELECT postings FROM concordance WHERE word = ?", (word,)).fetchone()
+    return tuple(decode_postings(row[0])) if row else ()
+
+
+def occurrences(word: str) -> tuple:
+    """(ayah, position) of every occurrence of a word, in mushaf order"""
+    word = normalize(word)
+    return _postings(word, content_generation()) if word else ()
+
+
+def phrase_occurrences(phrase: str) -> list:
+    """(ayah, position of the first word) of every exact occurrence of a phrase"""
+    words = normalize(phrase).split()
+    if not words:
+        return []
+    generation = content_generation()
+    lists = [_postings(word, generation) for word in words]
+    if not all(lists):
+        return []
+    if len(lists) == 1:
+        return list(lists[0])
+
+    # Walk the rarest word's postings and check the others at their offsets
+    rarest = min(range(len(words)), key=lambda i: len(lists[i]))
+    others = [(i - rarest, set(postings)) for i, postings in enumerate(lists) if i != rarest]
+    return [
+        (ayah, position - rarest)
+        for ayah, position in lists[rarest]
+        if all((ayah, position + offset) in found for offset, found in others)
+    ]
+
+
+def matching_ayat(query: str, phrase: bool = True) -> list:
+    """Global numbers of the ayat containing the phrase (or, with phrase=False, every word)"""
+    if phrase:
+        return sorted({ayah for ayah, _ in phrase_occurrences(query)})
+
+    ayat = None
+    for word in normalize(query).split():
+        found = {ayah for ayah, _ in occurrences(word)}
+        ayat = found if ayat is None else ayat & found
+    return sorted(ayat or ())
+
+
+def word_stats(word: str) -> dict:
+    """Frequency of a word or phrase: totals and the count in each surah, most first"""
+    hits = phrase_occurrences(word)
+    by_surah = Counter(coordinates.locate(ayah)[0] for ayah, _ in hits)
+    return {
+        "word": normalize(word),
+        "occurrences": len(hits),
+        "ayat": len({ayah for ayah, _ in hits}),
+        "surahs": len(by_surah),
+        "by_surah": by_surah.most_common(),
+        "first": hits[0] if hits else None,
+    }
@@ -0,0 +1,173 @@
+"""
+Quran Corpus - every ayah in one UTF-8 buffer, loaded once per process
+
+The ayat table is read a single time into a compact layout:
+
+    text      all verse texts back to back, indexed by global ayah number
+    offsets   array('I') with offsets[g - 1]:offsets[g] the bytes of ayah g
+    surah_of  / ayah_of   surah and ayah number of every global ayah
+    surah_start           global index of each surah's first ayah
+
+Lookups are O(1) and ranges are zero-copy memoryview slices of the buffer,
+so /mushaf and the hourly ayah never read the content database. Verses
+missing from the table (sample data) are empty slices and read as None.
+
+When data/quran.bundle exists (services/quran_bundle.py) the same buffers
+are views into the memory-mapped file instead, so startup reads nothing
+and the OS pages text in as it is used.
+"""
+
+import threading
+from array import array
+from itertools import accumulate
+
+from db.database import content_connection, content_generation
+from services.quran_bundle import bundle_stamp, open_bundle
+
+TOTAL_AYAHS = 6236
+
+
+class QuranCorpus:
+    """Read-only, thread-safe view of all ayat"""
+
+    def __init__(self, text, offsets, refs, ref_offsets, surah_start, surah_of, ayah_of):
+        """Buffers as laid out above; arrays or memoryviews (e.g. over a mapped bundle)"""
+        self._text = memoryview(text)
+        self._offsets = offsets
+        self._refs = memoryview(refs)
+        self._ref_offsets = ref_offsets
+        # surah_start[s - 1] is the 0-based global index of surah s's first ayah
+        self.surah_start = surah_start
+        self.surah_of = surah_of
+        self.ayah_of = ayah_of
+        self.loaded = sum(1 for n in range(len(surah_of)) if offsets[n + 1] > offsets[n])
+        self._numbers = None
+
+    @classmethod
+    def from_rows(cls, rows, verse_counts):
+        """rows: (global ayah number, ref, text); verse_counts: ayah count of surahs 1..114"""
+        surah_start = array("I", accumulate(verse_counts, initial=0))
+        surah_of = array("B")
+        ayah_of = array("H")
+        for surah, count in enumerate(verse_counts, start=1):
+            surah_of.extend([surah] * count)
+            ayah_of.extend(range(1, count + 1))
+
+        total = surah_start[-1]
+        texts = [b""] * total
+        refs = [b""] * total
+        for number, ref, text in rows:
+            if 1 <= number <= total and text:
+                texts[number - 1] = text.encode("utf-8")
+                refs[number - 1] = (ref or "").encode("utf-8")
+
+        return cls(
+            b"".join(texts), array("I", accumulate(map(len, texts), initial=0)),
+            b"".join(refs), array("I", accumulate(map(len, refs), initial=0)),
+            surah_start, surah_of, ayah_of,
+        )
+
+    def __len__(self):
+        return self.loaded
+
+    @property
+    def total(self) -> int:
+        return len(self.surah_of)
+
+    def global_number(self, surah: int, ayah: int) -> int:
+        """1-based global ayah number (0 when out of range)"""
+        if not 1 <= surah < len(self.surah_start):
+            return 0
+        first, end = self.surah_start[surah - 1], self.surah_start[surah]
+        if not 1 <= ayah <= end - first:
+            return 0
+        return first + ayah
+
+    def locate(self, number: int):
+        """(surah, ayah) for a global ayah number"""
+        return self.surah_of[number - 1], self.ayah_of[number - 1]
+
+    def text_slice(self, number: int) -> memoryview:
+        """Zero-copy UTF-8 bytes of one ayah (empty if not loaded)"""
+        return self._text[self._offsets[number - 1]:self._offsets[number]]
+
+    def span(self, first: int, last: int) -> memoryview:
+        """Zero-copy UTF-8 bytes of ayat first..last (inclusive), back to back"""
+        return self._text[self._offsets[first - 1]:self._offsets[last]]
+
+    def has(self, number: int) -> bool:
+        return 1 <= number <= self.total and self._offsets[number] > self._offsets[number - 1]
+
+    def text(self, number: int):
+        """Text of a global ayah, None if not loaded"""
+        if not self.has(number):
+            return None
+        return str(self.text_slice(number), "utf-8")
+
+    def ref(self, number: int) -> str:
+        return str(self._refs[self._ref_offsets[number - 1]:self._ref_offsets[number]], "utf-8")
+
+    def ayah(self, number: int):
+        """{'number', 'text', 'ref', 'surah', 'ayah'} for a global ayah, None if not loaded"""
+        text = self.text(number)
+        if text is None:
+            return None
+        surah, ayah = self.locate(number)
+        return {"number": number, "text": text, "ref": self.ref(number), "surah": surah, "ayah": ayah}
+
+    def ayahs(self, first: int, last: int) -> list:
+        """Loaded ayat in the global range first..last (inclusive)"""
+        first, last = max(first, 1), min(last, self.total)
+        return [a for a in map(self.ayah, range(first, last + 1)) if a is not None]
+
+    def numbers(self) -> list:
+        """Global numbers of every loaded ayah"""
+        if self._numbers is None:
+            offsets = self._offsets
+            self._numbers = tuple(n for n in range(1, self.total + 1) if offsets[n] > offsets[n - 1])
+        return list(self._numbers)
+
+
+_corpus = None
+_corpus_generation = None
+# bundle_stamp() of the mapped bundle, None when _corpus came from the database
+_corpus_bundle = None
+_corpus_lock = threading.Lock()
+
+
+def read_content_corpus() -> QuranCorpus:
+    """Build a corpus from the ayat table of the content database"""
+    from services.complete_quran_service import QURAN_STRUCTURE
+
+    with content_connection() as conn:
+        rows = [
+            (int(row["id"]), row["ref"], row["text"])
+            for row in conn.execute("SELECT id, ref, text FROM ayat")
+            if str(row["id"]).isdigit()
+        ]
+    verse_counts = [QURAN_STRUCTURE[surah]["verses"] for surah in range(1, 115)]
+    return QuranCorpus.from_rows(rows, verse_counts)
+
+
+def load_corpus():
+    """(corpus, bundle stamp): the mapped Quran bundle if one was built, else (database corpus, None)"""
+    stamp = bundle_stamp()
+    bundle = open_bundle() if stamp is not None else None
+    if bundle is not None:
+        return bundle.corpus(), stamp
+    return read_content_corpus(), None
+
+
+def get_corpus() -> QuranCorpus:
+    """The process-wide corpus, reloaded only when the content database or bundle changes"""
+    global _corpus, _corpus_generation, _corpus_bundle
+    generation = content_generation()
+    if _corpus is None or _corpus_generation != generation:
+        with _corpus_lock:
+            if _corpus is None or _corpus_generation != generation:
+                # The bundle is stat()ed only here, not on every lookup; a
+                # mapped bundle that was not rebuilt stays valid
+                if _corpus is None or _corpus_bundle is None or bundle_stamp() != _corpus_bundle:
+                    _corpus, _corpus_bundle = load_corpus()
+                _corpus_generation = generation
+    return _corpus
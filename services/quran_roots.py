@@ -0,0 +1,175 @@
+"""
+Quran Roots - which ayat contain words of a given triliteral root
+
+Built offline from the Quranic Arabic Corpus morphology file
+(quranic-corpus-morphology-0.4.txt, corpus.quran.com), which is not
+shipped with the bot:
+
+    python -m services.quran_roots path/to/quranic-corpus-morphology-0.4.txt
+
+For every root the quran_roots table keeps its occurrence count, the set of
+ayat it occurs in as a bitset (bit n set for global ayah n, ~780 bytes) and
+the (global ayah, word number) postings in the concordance's delta-varint
+encoding. Word numbers are the corpus's, which count the words of the
+Uthmani text without the standalone waqf marks.
+
+Bitsets are Python ints at query time, so combining roots is one & or |
+over 100 machine words, and paging walks set bits from a cursor:
+
+    كتب            one root (letters may be spaced: ك ت ب)
+    كتب قرا        both roots in the same ayah (also: كتب & قرا)
+    كتب | قرا      either root
+"""
+
+import sys
+from functools import lru_cache
+
+from db.database import content_connection, content_generation, content_writer
+from services import quran_coordinates as coordinates
+from services.quran_concordance import decode_postings, encode_postings
+
+# Decoded root bitsets and postings kept in memory
+ROOT_CACHE_SIZE = 256
+
+# Buckwalter transliteration of the letters that occur in roots
+BUCKWALTER = {
+    "'": "ء", "|": "آ", ">": "أ", "&": "ؤ", "<": "إ", "}": "ئ", "A": "ا",
+    "b": "ب", "p": "ة", "t": "ت", "v": "ث", "j": "ج", "H": "ح", "x": "خ",
+    "d": "د", "*": "ذ", "r": "ر", "z": "ز", "s": "س", "$": "ش", "S": "ص",
+    "D": "ض", "T": "ط", "Z": "ظ", "E": "ع", "g": "غ", "f": "ف", "q": "ق",
+    "k": "ك", "l": "ل", "m": "م", "n": "ن", "h": "ه", "w": "و", "Y": "ى",
+    "y": "ي",
+}
+
+# Roots are compared with every hamza/alef form as ء and ى as ي, so that
+# أمن, ءمن and امن all name the same root
+_ROOT_TABLE = str.maketrans({
+    **dict.fromkeys([*range(0x064B, 0x0660), 0x0670, 0x0640, ord(" ")]),
+    **dict.fromkeys(map(ord, "آأؤإئا"), "ء"),
+    ord("ى"): "ي",
+})
+
+
+def root_key(text: str) -> str:
+    """Canonical spelling of a root typed with or without spaces and hamza forms"""
+    return text.translate(_ROOT_TABLE)
+
+
+def parse_morphology(path: str) -> dict:
+    """root -> sorted (global ayah, word number) pairs from a morphology file"""
+    index = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.startswith("("):
+                continue
+            location, _form, _tag, features = line.rstrip("\n").split("\t")
+            root = next((part[5:] for part in features.split("|") if part.startswith("ROOT:")), None)
+            if root is None:
+                continue
+            surah, ayah, word, _segment = map(int, location.strip("()").split(":"))
+            key = root_key("".join(BUCKWALTER[letter] for letter in root))
+            index.setdefault(key, set()).add((coordinates.global_number(surah, ayah), word))
+    return {root: sorted(pairs) for root, pairs in index.items()}
+
+
+def bitset(numbers) -> int:
+    bits = 0
+    for number in numbers:
+        bits |= 1 << number
+    return bits
+
+
+def build_root_index(conn, path: str) -> int:
+    """Replace the quran_roots table with the roots of a morphology file"""
+    index = parse_morphology(path)
+    conn.execute("DELETE FROM quran_roots")
+    conn.executemany(
+        "INSERT INTO quran_roots (root, occurrences, ayat, postings) VALUES (?, ?, ?, ?)",
+        (
+            (
+                root, len(pairs),
+                bitset(ayah for ayah, _ in pairs).to_bytes(coordinates.TOTAL_AYAHS // 8 + 1, "little"),
+                encode_postings(pairs),
+            )
+            for root, pairs in index.items()
+        )
+    )
+    return len(index)
+
+
+@lru_cache(maxsize=ROOT_CACHE_SIZE)
+def _root_bits(root: str, generation) -> int:
+    with content_connection() as conn:
+        row = conn.execute("SELECT ayat FROM quran_roots WHERE root = ?", (root,)).fetchone()
+    return int.from_bytes(row[0], "little") if row else 0
+
+
+@lru_cache(maxsize=ROOT_CACHE_SIZE)
+def _root_words(root: str, generation) -> dict:
+    with content_connection() as conn:
+        row = conn.execute("SELECT postings FROM quran_roots WHERE root = ?", (root,)).fetchone()
+    words = {}
+    for ayah, word in decode_postings(row[0]) if row else ():
+        words.setdefault(ayah, set()).add(word)
+    return words
+
+
+def parse_query(query: str) -> list:
+    """OR of AND groups of root keys: 'كتب قرا | علم' -> [['كتب', 'قرا'], ['علم']]"""
+    groups = []
+    for group in query.split("|"):
+        roots = []
+        for term in group.split("&"):
+            parts = term.split()
+            # ك ت ب is one spaced-out root, كتب قرا two roots
+            roots += [root_key(term)] if parts and all(len(p) == 1 for p in parts) else map(root_key, parts)
+        if roots:
+            groups.append(roots)
+    return groups
+
+
+def matching_bits(query: str) -> int:
+    """Bitset of the ayat matching a root query"""
+    generation = content_generation()
+    bits = 0
+    for group in parse_query(query):
+        found = -1
+        for root in group:
+            found &= _root_bits(root, generation)
+        bits |= found
+    return bits
+
+
+def iter_bits(bits: int, after: int = 0):
+    """Set bit numbers greater than `after`, ascending"""
+    bits >>= after + 1
+    number = after + 1
+    while bits:
+        low = (bits & -bits).bit_length() - 1
+        number += low
+        yield number
+        bits >>= low + 1
+        number += 1
+
+
+def word_numbers(query: str, ayah: int) -> set:
+    """Word numbers in an ayah that carry any root of the query"""
+    generation = content_generation()
+    return {
+        word
+        for group in parse_query(query) for root in group
+        for word in _root_words(root, generation).get(ayah, ())
+    }
+
+
+if __name__ == "__main__":
+    from db.models import init_content_db
+
+    if len(sys.argv) != 2:
+        print("Usage: python -m services.quran_roots path/to/quranic-corpus-morphology-0.4.txt")
+        sys.exit(1)
+    init_content_db()
+    print("🌱 Building root index...")
+    with content_writer() as conn:
+        count = build_root_index(conn, sys.argv[1])
+    print(f"   ✓ Indexed {count} roots")
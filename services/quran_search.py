@@ -0,0 +1,226 @@
+"""
+Quran Search - ranked full-text search over the ayat_fts index
+
+Matches are ordered by BM25 (FTS5's `rank`, lower is better) with the
+rowid as tie-breaker, and pages are fetched by keyset: each page returns
+the (rank, rowid) of its last hit as `next`, and the following page
+starts strictly after it.
+
+Scoring is the expensive part (every hit of a common word like الله is
+scored before the best can be known), so the ranked hit list of a query
+is computed once and kept in an LRU cache until the content database
+changes. A page is then a binary search for the cursor plus a rowid
+lookup of its ayat; snippets are cut and highlighted here rather than
+with FTS5's snippet(), which would re-run the full-text query per row.
+
+The exact word and phrase modes come from services/quran_concordance and
+the root mode from services/quran_roots instead, in mushaf order, with the
+last global ayah number as cursor.
+"""
+
+import string
+from array import array
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from itertools import islice
+
+from db.database import content_connection, content_generation
+from services import quran_concordance, quran_roots, quran_spelling
+from services.arabic_normalizer import normalize
+from services.quran_corpus import get_corpus
+
+PAGE_SIZE = 5
+
+# text: every word as a word prefix, best BM25 rank first
+# words: every word exactly (concordance), in mushaf order
+# phrase: the words consecutively (concordance), in mushaf order
+# root: words of the given triliteral roots (quran_roots), in mushaf order
+SEARCH_MODES = ("text", "words", "phrase", "root")
+
+# Ranked hit lists kept for paging (a few KB each, ~100 KB for the commonest words)
+RANKING_CACHE_SIZE = 128
+
+# Markers around matched words in snippets (Discord bold)
+HIGHLIGHT = ("**", "**")
+SNIPPET_WORDS = 24
+
+# Stripped from the ends of a word before matching it for highlighting
+_PUNCTUATION = string.punctuation + "«»…،؛؟"
+
+
+def match_expression(query: str) -> str:
+    """FTS5 query for free user text: every word must appear, as a word prefix
+
+    Words are normalized like ayat.text_normalized, then quoted so
+    characters FTS5 treats as syntax (quotes, hyphens, parentheses,
+    AND/OR/NOT) are searched for literally.
+    """
+    return " ".join('"' + word.replace('"', '""') + '"*' for word in normalize(query).split())
+
+
+@lru_cache(maxsize=RANKING_CACHE_SIZE)
+def _ranking(match: str, generation):
+    """(ranks, rowids) of every hit, best first"""
+    ranks, rowids = array("d"), array("q")
+    with content_connection() as conn:
+        for rank, rowid in conn.execute(
+            "SELECT rank, rowid FROM ayat_fts WHERE ayat_fts MATCH ? ORDER BY rank, rowid", (match,)
+        ):
+            ranks.append(rank)
+            rowids.append(rowid)
+    return ranks, rowids
+
+
+def _start_after(ranks, rowids, after) -> int:
+    """Index of the first hit ordered after the (rank, rowid) cursor"""
+    rank, rowid = after
+    lo, hi = bisect_left(ranks, rank), bisect_right(ranks, rank)
+    return bisect_right(rowids, rowid, lo, hi) if lo < hi else lo
+
+
+def snippet(text: str, words, size: int = SNIPPET_WORDS, positions=None) -> str:
+    """Up to `size` words of text around the first match, matched words highlighted
+
+    `words` are normalized query words; the text keeps its tashkeel. With
+    `positions` (1-based word numbers, not counting standalone waqf marks)
+    those words are highlighted instead.
+    """
+    tokens = text.split()
+    if positions is None:
+        hits = [
+            i for i, token in enumerate(tokens)
+            if normalize(token).strip(_PUNCTUATION).startswith(words)
+        ]
+    else:
+        hits, number = [], 0
+        for i, token in enumerate(tokens):
+            if normalize(token):
+                number += 1
+                if number in positions:
+                    hits.append(i)
+    first = max(0, min(hits[0] - size // 4, len(tokens) - size)) if hits else 0
+    marked = set(hits)
+    shown = [
+        f"{HIGHLIGHT[0]}{token}{HIGHLIGHT[1]}" if i in marked else token
+        for i, token in enumerate(tokens[first:first + size], first)
+    ]
+    return ("… " if first else "") + " ".join(shown) + (" …" if first + size < len(tokens) else "")
+
+
+def search_page(query: str, after=None, limit: int = PAGE_SIZE, mode: str = "text", autocorrect: bool = True) -> dict:
+    """One page of matches for a search mode (see SEARCH_MODES):
+
+        {"results": [{"id", "ref", "text", "snippet", "rank"}, ...],
+         "total": number of matching ayat,
+         "next": cursor for the following page, None on the last page}
+
+    A first page with no matches is retried with the best spelling
+    correction (services/quran_spelling); the page then also has
+    "corrected" (the query that was searched) and "suggestions".
+    """
+    page = _search_page(query, after, limit, mode)
+    if page["total"] or after is not None or not autocorrect or mode == "root":
+        return page
+
+    suggestions = quran_spelling.suggest_queries(query)
+    if not suggestions:
+        return page
+    page = _search_page(suggestions[0], None, limit, mode)
+    page["corrected"] = suggestions[0]
+    page["suggestions"] = suggestions
+    return page
+
+
+def _search_page(query: str, after, limit: int, mode: str) -> dict:
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"Unknown search mode: {mode}")
+    if mode == "text":
+        return _ranked_page(query, after, limit)
+    if mode == "root":
+        return _root_page(query, after, limit)
+    return _concordance_page(query, after, limit, phrase=mode == "phrase")
+
+
+def _root_page(query: str, after, limit: int) -> dict:
+    """Ayat with words of the queried roots in mushaf order; the cursor is the last global ayah number"""
+    bits = quran_roots.matching_bits(query)
+    page = list(islice(quran_roots.iter_bits(bits, after or 0), limit + 1))
+
+    corpus = get_corpus()
+    results = []
+    for number in page[:limit]:
+        text = corpus.text(number)
+        if text is not None:
+            results.append({
+                "id": str(number), "ref": corpus.ref(number), "text": text,
+                "snippet": snippet(text, (), positions=quran_roots.word_numbers(query, number)),
+                "rank": None,
+            })
+    return {
+        "results": results,
+        "total": bits.bit_count(),
+        "next": page[limit - 1] if len(page) > limit else None,
+    }
+
+
+def _concordance_page(query: str, after, limit: int, phrase: bool) -> dict:
+    """Exact matches from the concordance in mushaf order; the cursor is the last global ayah number"""
+    ayat = quran_concordance.matching_ayat(query, phrase)
+    start = bisect_right(ayat, after) if after else 0
+    page = ayat[start:start + limit]
+
+    corpus = get_corpus()
+    words = tuple(normalize(query).split())
+    results = []
+    for number in page:
+        text = corpus.text(number)
+        if text is not None:
+            results.append({
+                "id": str(number), "ref": corpus.ref(number), "text": text,
+                "snippet": snippet(text, words), "rank": None,
+            })
+    end = start + len(page)
+    return {
+        "results": results,
+        "total": len(ayat),
+        "next": ayat[end - 1] if page and end < len(ayat) else None,
+    }
+
+
+def _ranked_page(query: str, after, limit: int) -> dict:
+    """BM25-ranked prefix matches from ayat_fts"""
+    match = match_expression(query)
+    if not match:
+        return {"results": [], "total": 0, "next": None}
+
+    ranks, rowids = _ranking(match, content_generation())
+    start = _start_after(ranks, rowids, after) if after else 0
+    page = rowids[start:start + limit]
+
+    rows = {}
+    if page:
+        with content_connection() as conn:
+            rows = {
+                row["rowid"]: row for row in conn.execute(
+                    f"SELECT rowid, id, ref, text FROM ayat WHERE rowid IN ({', '.join('?' * len(page))})",
+                    tuple(page),
+                )
+            }
+
+    words = tuple(normalize(query).split())
+    results = [
+        {
+            "id": rows[rowid]["id"],
+            "ref": rows[rowid]["ref"],
+            "text": rows[rowid]["text"],
+            "snippet": snippet(rows[rowid]["text"], words),
+            "rank": ranks[start + i],
+        }
+        for i, rowid in enumerate(page) if rowid in rows
+    ]
+    end = start + len(page)
+    return {
+        "results": results,
+        "total": len(rowids),
+        "next": (ranks[end - 1], rowids[end - 1]) if page and end < len(rowids) else None,
+    }
@@ -1,22 +1,48 @@
 import random
-from db.database import get_connection
+from db.database import connection
+from services.quran_corpus import get_corpus
 
-def get_random_ayah():
-    conn = get_connection()
-    cur = conn.cursor()
+# Rotation scope shared by callers that don't pass their own (hourly messages)
+GLOBAL_SCOPE = "global"
 
-    cur.execute("SELECT * FROM ayat WHERE used=0")
-    rows = cur.fetchall()
+def channel_scope(channel_id) -> str:
+    """Rotation scope giving a channel its own no-repeat cycle"""
+    return f"channel:{channel_id}"
 
-    if not rows:
-        cur.execute("UPDATE ayat SET used=0")
-        conn.commit()
-        cur.execute("SELECT * FROM ayat")
-        rows = cur.fetchall()
+def _pack(numbers) -> bytes:
+    return b"".join(number.to_bytes(2, "little") for number in numbers)
 
-    ayah = random.choice(rows)
-    cur.execute("UPDATE ayat SET used=1 WHERE id=?", (ayah["id"],))
-    conn.commit()
-    conn.close()
+def next_ayah_number(scope: str = GLOBAL_SCOPE) -> int:
+    """Next ayah in the scope's shuffled cycle; every loaded ayah comes up once per cycle"""
+    corpus = get_corpus()
+    if not len(corpus):
+        raise IndexError("No ayat loaded")
 
-    return dict(ayah)
\ No newline at end of file
+    with connection() as conn:
+        row = conn.execute("""
+            SELECT cursor, length(permutation) / 2 AS size,
+                   substr(permutation, cursor * 2 + 1, 2) AS entry,
+                   substr(permutation, -2) AS last_entry
+            FROM ayah_rotation WHERE scope = ?
+        """, (scope,)).fetchone()
+
+        if row is not None and row["cursor"] < row["size"] == len(corpus):
+            conn.execute("UPDATE ayah_rotation SET cursor = cursor + 1 WHERE scope = ?", (scope,))
+            return int.from_bytes(row["entry"], "little")
+
+        # Cycle finished (or content changed): start a fresh permutation
+        permutation = random.sample(corpus.numbers(), len(corpus))
+        if row is not None and len(permutation) > 1 and permutation[0] == int.from_bytes(row["last_entry"], "little"):
+            # Don't repeat the previous cycle's last ayah back to back
+            permutation[0], permutation[-1] = permutation[-1], permutation[0]
+        conn.execute("""
+            INSERT INTO ayah_rotation (scope, permutation, cursor, cycle) VALUES (?, ?, 1, 1)
+            ON CONFLICT (scope) DO UPDATE SET
+                permutation = excluded.permutation, cursor = 1, cycle = ayah_rotation.cycle + 1
+        """, (scope, _pack(permutation)))
+        return permutation[0]
+
+def get_random_ayah(scope: str = GLOBAL_SCOPE):
+    corpus = get_corpus()
+    number = next_ayah_number(scope)
+    return {"id": str(number), "ref": corpus.ref(number), "text": corpus.text(number)}
@@ -0,0 +1,162 @@
+"""
+Quran Similar - near-duplicate ayat (mutashabihat) via MinHash LSH
+
+Built offline from ayat.text_normalized into the similar_ayat table:
+
+    python -m services.quran_similar
+
+Every ayah becomes the set of its word SHINGLE_SIZE-grams (an ayah shorter
+than that is one shingle of all its words). NumPy computes a MinHash
+signature of NUM_HASHES minimums per ayah, using multiply-shift hashes
+over the CRC32 of each shingle, so the fraction of equal signature slots
+estimates the Jaccard similarity of two ayat.
+
+Signatures are cut into BANDS bands of ROWS slots; ayat that agree on a
+whole band share a bucket, which happens with probability 1 - (1 - J^r)^b.
+Only pairs sharing a bucket are compared, with their exact Jaccard, and
+those of at least MIN_SIMILARITY are stored in both directions. That is a
+few thousand pairs instead of the ~19M of all pairs of the 6236 ayat; see
+benchmarks/similar_ayat.py for the recall against brute force.
+
+At query time similar_ayat() is one primary key range read.
+"""
+
+import zlib
+
+import numpy as np
+
+from db.database import content_connection, content_writer
+from services import quran_coordinates as coordinates
+
+SHINGLE_SIZE = 2
+NUM_HASHES = 128
+BANDS = 32
+ROWS = NUM_HASHES // BANDS
+MIN_SIMILARITY = 0.5
+
+# Fixed so rebuilds give the same graph
+SEED = 20240101
+
+# Signature slots hashed per NumPy pass (bounds the temporary arrays)
+_CHUNK = 16
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set:
+    """Word size-grams of a normalized ayah"""
+    words = text.split()
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def jaccard(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    common = len(a & b)
+    return common / (len(a) + len(b) - common)
+
+
+def read_shingles(conn) -> dict:
+    """global ayah number -> shingle set, for every normalized ayah"""
+    rows = conn.execute("SELECT id, text_normalized FROM ayat WHERE text_normalized IS NOT NULL").fetchall()
+    sets = {int(row[0]): shingles(row[1]) for row in rows if str(row[0]).isdigit()}
+    return {number: found for number, found in sorted(sets.items()) if found}
+
+
+def minhash_signatures(sets: list, num_hashes: int = NUM_HASHES, seed: int = SEED) -> np.ndarray:
+    """(len(sets), num_hashes) uint32 MinHash signatures of non-empty shingle sets"""
+    ids = np.fromiter(
+        (zlib.crc32(s.encode("utf-8")) for found in sets for s in found), dtype=np.uint64
+    )
+    # Each set's hashes are a contiguous run of ids
+    starts = np.cumsum([0] + [len(found) for found in sets[:-1]])
+
+    rng = np.random.default_rng(seed)
+    # Multiply-shift: (a * x + b) mod 2^64, top 32 bits; odd a
+    a = rng.integers(0, 2**63, size=num_hashes, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    b = rng.integers(0, 2**63, size=num_hashes, dtype=np.uint64)
+
+    signatures = np.empty((len(sets), num_hashes), dtype=np.uint32)
+    for first in range(0, num_hashes, _CHUNK):
+        last = min(first + _CHUNK, num_hashes)
+        hashed = (ids[:, None] * a[None, first:last] + b[None, first:last]) >> np.uint64(32)
+        signatures[:, first:last] = np.minimum.reduceat(hashed, starts, axis=0)
+    return signatures
+
+
+def candidate_pairs(signatures: np.ndarray, bands: int = BANDS) -> set:
+    """(i, j) row pairs, i < j, that share at least one LSH band bucket"""
+    rows = signatures.shape[1] // bands
+    pairs = set()
+    for band in range(bands):
+        block = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+        keys = block.view(np.dtype((np.void, block.dtype.itemsize * rows))).ravel()
+        order = np.argsort(keys, kind="stable")
+        ordered = keys[order]
+        # Bucket boundaries: where the sorted key changes
+        edges = np.flatnonzero(ordered[1:] != ordered[:-1]) + 1
+        for bucket in np.split(order, edges):
+            if len(bucket) > 1:
+                members = sorted(bucket.tolist())
+                pairs.update(
+                    (members[x], members[y])
+                    for x in range(len(members)) for y in range(x + 1, len(members))
+                )
+    return pairs
+
+
+def similar_pairs(sets: dict, min_similarity: float = MIN_SIMILARITY) -> list:
+    """(ayah, other, jaccard) for LSH candidates at least min_similarity alike, ayah < other"""
+    numbers = list(sets)
+    shingle_sets = [sets[n] for n in numbers]
+    pairs = []
+    for i, j in candidate_pairs(minhash_signatures(shingle_sets)):
+        score = jaccard(shingle_sets[i], shingle_sets[j])
+        if score >= min_similarity:
+            pairs.append((numbers[i], numbers[j], score))
+    return sorted(pairs)
+
+
+def build_similar_index(conn) -> int:
+    """Replace the similar_ayat table from ayat.text_normalized; returns the number of pairs"""
+    pairs = similar_pairs(read_shingles(conn))
+    conn.execute("DELETE FROM similar_ayat")
+    conn.executemany(
+        "INSERT INTO similar_ayat (ayah, similar, score) VALUES (?, ?, ?)",
+        [edge for a, b, score in pairs for edge in ((a, b, score), (b, a, score))]
+    )
+    return len(pairs)
+
+
+def similar_ayat(surah: int, ayah: int, limit: int = 10) -> list:
+    """Ayat most alike surah:ayah, best first: [{"surah", "ayah", "number", "score", "ref", "text"}]"""
+    number = coordinates.global_number(surah, ayah)
+    with content_connection() as conn:
+        rows = conn.execute(
+            """
+            SELECT s.similar, s.score, a.ref, a.text
+            FROM similar_ayat s LEFT JOIN ayat a ON a.id = CAST(s.similar AS TEXT)
+            WHERE s.ayah = ?
+            ORDER BY s.score DESC, s.similar
+            LIMIT ?
+            """,
+            (number, limit)
+        ).fetchall()
+    results = []
+    for other, score, ref, text in rows:
+        other_surah, other_ayah = coordinates.locate(other)
+        results.append({
+            "surah": other_surah, "ayah": other_ayah, "number": other,
+            "score": score, "ref": ref, "text": text,
+        })
+    return results
+
+
+if __name__ == "__main__":
+    from db.models import init_content_db
+
+    init_content_db()
+    print("🔁 Building similar-ayat graph...")
+    with content_writer() as conn:
+        count = build_similar_index(conn)
+    print(f"   ✓ Stored {count} similar pairs")
@@ -0,0 +1,209 @@
+"""
+Quran Spelling - "did you mean" corrections over the Quran's vocabulary
+
+A symmetric-delete (SymSpell) index: every vocabulary word is stored
+under each non-empty string obtainable by deleting up to
+MAX_EDIT_DISTANCE characters from it. A misspelled word generates its own deletes and
+looks them up, which finds every word within that edit distance with a
+few hundred dict probes instead of comparing against all ~14.5k words.
+Candidates are then checked with a real (Damerau) edit distance and
+ranked by distance, then by how often the word occurs in the Quran.
+The distance allowed grows with the word (see max_distance_for), so
+short words are only ever matched exactly, and non-Arabic words are
+never corrected.
+
+Only the first PREFIX_LENGTH characters of a word generate deletes,
+which keeps the index to ~80k keys (~12 MB) at a small cost in recall
+for errors at the very end of long words, where the distance check on
+the full word still applies.
+
+The vocabulary is the concordance (normalized words and their counts),
+so queries are normalized first. The index is built on first use and
+kept until the content database changes.
+"""
+
+import re
+import threading
+
+from db.database import content_connection, content_generation
+from services.arabic_normalizer import normalize
+
+MAX_EDIT_DISTANCE = 2
+PREFIX_LENGTH = 6
+
+# Words this long or shorter allow no edits, up to the next limit one edit
+EXACT_LENGTH = 3
+ONE_EDIT_LENGTH = 6
+
+_ARABIC_WORD = re.compile(r"[\u0600-\u06FF]+")
+
+# Alternatives offered for a misspelled word
+SUGGESTIONS = 3
+
+
+def max_distance_for(word: str, max_distance: int = MAX_EDIT_DISTANCE) -> int:
+    """Edits allowed when correcting word: 0 up to 3 letters, 1 up to 6, else max_distance"""
+    if len(word) <= EXACT_LENGTH:
+        return 0
+    if len(word) <= ONE_EDIT_LENGTH:
+        return min(1, max_distance)
+    return max_distance
+
+
+def is_arabic(word: str) -> bool:
+    return _ARABIC_WORD.fullmatch(word) is not None
+
+
+def _deletes(word: str, max_distance: int) -> set:
+    """word and every non-empty string made by deleting up to max_distance characters"""
+    found = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        found |= frontier
+    found.discard("")
+    return found
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """Optimal string alignment distance, or max_distance + 1 once it is exceeded
+
+    Only the diagonal band |i - j| <= max_distance is computed; cells
+    outside it can never lead back under the limit.
+    """
+    limit = max_distance + 1
+    if abs(len(a) - len(b)) > max_distance:
+        return limit
+    width = len(b)
+    previous2 = None
+    previous = [j if j <= max_distance else limit for j in range(width + 1)]
+    for i in range(1, len(a) + 1):
+        ca = a[i - 1]
+        current = [limit] * (width + 1)
+        if i <= max_distance:
+            current[0] = i
+        row_min = current[0]
+        for j in range(max(1, i - max_distance), min(width, i + max_distance) + 1):
+            cb = b[j - 1]
+            value = previous[j - 1] + (ca != cb)
+            if previous[j] + 1 < value:
+                value = previous[j] + 1
+            if current[j - 1] + 1 < value:
+                value = current[j - 1] + 1
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb and previous2[j - 2] + 1 < value:
+                value = previous2[j - 2] + 1
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > max_distance:
+            return limit
+        previous2, previous = previous, current
+    return min(previous[-1], limit)
+
+
+class SpellingIndex:
+    """Symmetric-delete lookup over a {word: count} vocabulary"""
+
+    def __init__(self, vocabulary: dict, max_distance: int = MAX_EDIT_DISTANCE, prefix_length: int = PREFIX_LENGTH):
+        self.vocabulary = vocabulary
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self._words = list(vocabulary)
+        # delete -> word index, or a list of them when several words share it
+        self._deletes = {}
+        for i, word in enumerate(self._words):
+            for key in _deletes(word[:prefix_length], max_distance):
+                entry = self._deletes.get(key)
+                if entry is None:
+                    self._deletes[key] = i
+                elif type(entry) is int:
+                    self._deletes[key] = [entry, i]
+                else:
+                    entry.append(i)
+
+    def __contains__(self, word):
+        return word in self.vocabulary
+
+    def suggest(self, word: str, limit: int = SUGGESTIONS) -> list:
+        """(word, distance, count) of the closest vocabulary words, best first ([] for non-Arabic words)"""
+        if word in self.vocabulary:
+            return [(word, 0, self.vocabulary[word])]
+        max_distance = max_distance_for(word, self.max_distance)
+        if not max_distance or not is_arabic(word):
+            return []
+
+        candidates = set()
+        for key in _deletes(word[:self.prefix_length], max_distance):
+            entry = self._deletes.get(key)
+            if entry is not None:
+                candidates.update((entry,) if type(entry) is int else entry)
+
+        scored = []
+        for i in candidates:
+            candidate = self._words[i]
+            distance = edit_distance(word, candidate, max_distance)
+            if distance <= max_distance:
+                scored.append((candidate, distance, self.vocabulary[candidate]))
+        scored.sort(key=lambda s: (s[1], -s[2]))
+        return scored[:limit]
+
+    def corrections(self, query: str, limit: int = SUGGESTIONS) -> list:
+        """Corrected versions of a normalized query, best first ([] if nothing to fix)"""
+        words = query.split()
+        options = []
+        for word in words:
+            found = self.suggest(word, limit)
+            options.append([s[0] for s in found] or [word])
+
+        best = [choices[0] for choices in options]
+        if best == words:
+            return []
+        queries = [" ".join(best)]
+        # Alternatives for the first word that was changed
+        first = next(i for i, word in enumerate(words) if best[i] != word)
+        for alternative in options[first][1:]:
+            queries.append(" ".join(best[:first] + [alternative] + best[first + 1:]))
+        return queries
+
+
+_index = None
+_index_generation = None
+_index_lock = threading.Lock()
+
+
+def load_spelling_index() -> SpellingIndex:
+    with content_connection() as conn:
+        vocabulary = dict(conn.execute("SELECT word, occurrences FROM concordance"))
+    return SpellingIndex(vocabulary)
+
+
+def get_spelling_index() -> SpellingIndex:
+    """The process-wide index, rebuilt only when the content database changes"""
+    global _index, _index_generation
+    generation = content_generation()
+    if _index is None or _index_generation != generation:
+        with _index_lock:
+            if _index is None or _index_generation != generation:
+                _index = load_spelling_index()
+                _index_generation = generation
+    return _index
+
+
+def suggest_queries(query: str, limit: int = SUGGESTIONS) -> list:
+    """'Did you mean' queries for user text, best first ([] when every word is known)"""
+    return get_spelling_index().corrections(normalize(query), limit)
+
+
+def autocorrect_query(query: str):
+    """The query with unambiguous typos fixed, or None when nothing is safe to change
+
+    Only Arabic words missing from the vocabulary with exactly one
+    candidate in reach are replaced; everything else is kept as typed.
+    """
+    index = get_spelling_index()
+    words = normalize(query).split()
+    fixed = []
+    for word in words:
+        found = index.suggest(word, 2) if word not in index else []
+        fixed.append(found[0][0] if len(found) == 1 else word)
+    return " ".join(fixed) if fixed != words else None
@@ -0,0 +1,71 @@
+"""
+Async Repository - awaitable data access for the Discord command handlers
+
+Wraps the blocking service queries so handlers can `await` them without
+stalling the event loop: reads run on the reader pool, anything that
+writes goes through the single writer thread (see db.async_executor).
+"""
+
+import functools
+
+from db.async_executor import run_read, run_write
+from services import (
+    complete_quran_service, favorites_service, hourly_messages_service, quran_concordance, quran_service,
+    quran_similar, quran_spelling, scheduled_azkar_service, tracking_service,
+)
+from services import semantic_search as semantic_search_service
+
+
+def _reader(fn):
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        return await run_read(fn, *args, **kwargs)
+    return wrapper
+
+
+def _writer(fn):
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        return await run_write(fn, *args, **kwargs)
+    return wrapper
+
+
+# Tracking
+track_prayer = _writer(tracking_service.track_prayer)
+get_prayer_stats = _reader(tracking_service.get_prayer_stats)
+track_qada_prayers = _writer(tracking_service.track_qada_prayers)
+get_qada_count = _reader(tracking_service.get_qada_count)
+mark_qada_completed = _writer(tracking_service.mark_qada_completed)
+track_fasting = _writer(tracking_service.track_fasting)
+get_fasting_stats = _reader(tracking_service.get_fasting_stats)
+track_quran_reading = _writer(tracking_service.track_quran_reading)
+get_quran_reading_stats = _reader(tracking_service.get_quran_reading_stats)
+get_khatm_progress = _reader(tracking_service.get_khatm_progress)
+track_tasbeeh = _writer(tracking_service.track_tasbeeh)
+get_tasbeeh_stats = _reader(tracking_service.get_tasbeeh_stats)
+
+# Favorites
+add_favorite = _writer(favorites_service.add_favorite)
+remove_favorite = _writer(favorites_service.remove_favorite)
+get_user_favorites = _reader(favorites_service.get_user_favorites)
+is_favorite = _reader(favorites_service.is_favorite)
+
+# Quran (get_random_ayah advances a rotation cursor, so it is a write)
+get_random_ayah = _writer(quran_service.get_random_ayah)
+get_ayah_text = _reader(complete_quran_service.get_ayah_text)
+get_surah_text = _reader(complete_quran_service.get_surah_text)
+get_juz_text = _reader(complete_quran_service.get_juz_text)
+get_page_text = _reader(complete_quran_service.get_page_text)
+search_in_quran = _reader(complete_quran_service.search_in_quran)
+get_word_stats = _reader(quran_concordance.word_stats)
+suggest_queries = _reader(quran_spelling.suggest_queries)
+autocorrect_query = _reader(quran_spelling.autocorrect_query)
+get_similar_ayat = _reader(quran_similar.similar_ayat)
+semantic_search = _reader(semantic_search_service.semantic_search)
+
+# Scheduling
+get_scheduled_channels = _reader(scheduled_azkar_service.get_scheduled_channels)
+get_active_schedules = _reader(scheduled_azkar_service.get_active_schedules)
+toggle_scheduled_azkar = _writer(scheduled_azkar_service.toggle_scheduled_azkar)
+get_hourly_message_channels = _reader(hourly_messages_service.get_hourly_message_channels)
+toggle_hourly_messages = _writer(hourly_messages_service.toggle_hourly_messages)
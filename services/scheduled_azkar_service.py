@@ -8,7 +8,8 @@ from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 from datetime import datetime
 from services.azkar_service import get_zikr
-from db.database import get_connection
+from db.storage import transaction
+from db.async_executor import run_read, run_write
 
 logger = logging.getLogger(__name__)
 
@@ -49,7 +50,7 @@ class ScheduledAzkarService:
     async def _send_azkar_to_channels(self, azkar_type: str, title: str):
         """Send azkar to all configured channels"""
         try:
-            channels = self._get_scheduled_channels(azkar_type)
+            channels = await run_read(get_scheduled_channels, azkar_type)
             
             if not channels:
                 logger.info(f"No channels configured for {azkar_type} azkar")
@@ -81,67 +82,77 @@ class ScheduledAzkarService:
         except Exception as e:
             logger.error(f"Error sending {azkar_type} azkar: {e}", exc_info=True)
     
-    def _get_scheduled_channels(self, schedule_type: str) -> list:
-        """Get list of channel IDs configured for scheduled azkar"""
-        try:
-            conn = get_connection()
-            cur = conn.cursor()
-            cur.execute(
-                "SELECT channel_id FROM scheduled_azkar WHERE schedule_type=? AND is_active=1",
-                (schedule_type,)
-            )
-            rows = cur.fetchall()
-            conn.close()
-            return [row['channel_id'] for row in rows]
-        except Exception as e:
-            logger.error(f"Error getting scheduled channels: {e}")
-            return []
-    
     def stop(self):
         """Stop the scheduler"""
         if self.scheduler.running:
             self.scheduler.shutdown()
             logger.info("Azkar scheduler stopped")
 
-async def setup_schedule_azkar_command(bot, interaction: discord.Interaction, schedule_type: str = None):
-    """Command to configure scheduled azkar"""
+def get_scheduled_channels(schedule_type: str) -> list:
+    """Get list of channel IDs configured for scheduled azkar"""
     try:
-        guild_id = str(interaction.guild_id)
-        channel_id = str(interaction.channel_id)
-        
-        conn = get_connection()
-        cur = conn.cursor()
-        
+        with transaction() as conn:
+            rows = conn.execute(
+                "SELECT channel_id FROM scheduled_azkar WHERE schedule_type=? AND is_active=1",
+                (schedule_type,)
+            ).fetchall()
+        return [row['channel_id'] for row in rows]
+    except Exception as e:
+        logger.error(f"Error getting scheduled channels: {e}")
+        return []
+
+def get_active_schedules() -> list:
+    """Get all active channel subscriptions (azkar and hourly messages)"""
+    try:
+        with transaction() as conn:
+            rows = conn.execute(
+                "SELECT guild_id, channel_id, schedule_type FROM scheduled_azkar WHERE is_active=1"
+            ).fetchall()
+        return [dict(row) for row in rows]
+    except Exception as e:
+        logger.error(f"Error getting active schedules: {e}")
+        return []
+
+def toggle_scheduled_azkar(guild_id: str, channel_id: str, schedule_type: str) -> bool:
+    """Toggle scheduled azkar for a channel, returns True when it is now enabled"""
+    with transaction() as conn:
         # Check if already configured
-        cur.execute(
+        existing = conn.execute(
             "SELECT id FROM scheduled_azkar WHERE guild_id=? AND channel_id=? AND schedule_type=?",
             (guild_id, channel_id, schedule_type)
-        )
+        ).fetchone()
         
-        if cur.fetchone():
+        if existing:
             # Toggle off
-            cur.execute(
+            conn.execute(
                 "UPDATE scheduled_azkar SET is_active=0 WHERE guild_id=? AND channel_id=? AND schedule_type=?",
                 (guild_id, channel_id, schedule_type)
             )
-            conn.commit()
-            conn.close()
-            
+            return False
+        
+        # Add new schedule
+        schedule_time = "06:00" if schedule_type == "morning" else "18:00"
+        conn.execute(
+            "INSERT INTO scheduled_azkar (guild_id, channel_id, schedule_type, schedule_time, is_active) VALUES (?, ?, ?, ?, 1)",
+            (guild_id, channel_id, schedule_type, schedule_time)
+        )
+        return True
+
+async def setup_schedule_azkar_command(bot, interaction: discord.Interaction, schedule_type: str = None):
+    """Command to configure scheduled azkar"""
+    try:
+        guild_id = str(interaction.guild_id)
+        channel_id = str(interaction.channel_id)
+        
+        enabled = await run_write(toggle_scheduled_azkar, guild_id, channel_id, schedule_type)
+        
+        if not enabled:
             time_name = "الصباحية" if schedule_type == "morning" else "المسائية"
             await interaction.response.send_message(
                 f"✅ تم إلغاء أذكار {time_name} في هذه القناة.",
                 ephemeral=True
             )
         else:
-            # Add new schedule
-            schedule_time = "06:00" if schedule_type == "morning" else "18:00"
-            cur.execute(
-                "INSERT INTO scheduled_azkar (guild_id, channel_id, schedule_type, schedule_time, is_active) VALUES (?, ?, ?, ?, 1)",
-                (guild_id, channel_id, schedule_type, schedule_time)
-            )
-            conn.commit()
-            conn.close()
-            
             time_name = "الصباحية (6:00 صباحاً)" if schedule_type == "morning" else "المسائية (6:00 مساءً)"
             await interaction.response.send_message(
                 f"✅ تم تفعيل أذكار {time_name} في هذه القناة!",
@@ -1,51 +1,282 @@
 """
-Mock semantic search for testing without heavy ML dependencies
+Semantic Search - nearest ayat to a query in embedding space
 """
 
-import sqlite3
-from db.database import get_connection
+import os
+import threading
+from collections import Counter
 
-def semantic_search(query, limit=5):
-    """
-    Simple keyword-based search as fallback when ML model not available
+import numpy as np
+
+from db.database import content_connection, content_generation
+from services import ann_index, embeddings_service
+from services.embeddings_service import VECTOR_DTYPE, decode_vector, model
+
+# float32: normalized vectors in memory (or mapped); int8: QuantizedIndex
+EMBEDDINGS_MODE = os.getenv("EMBEDDINGS_MODE", "float32")
+
+# int8 first-pass candidates re-scored against the float vectors
+INT8_RERANK = 50
+
+# Rows upcast per block when scoring int8 codes: small enough that the
+# float32 copy stays in cache, so the pass is not slower than float32's
+_BLOCK = 512
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indexes of the k highest scores, best first"""
+    k = min(k, len(scores))
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+class VectorIndex:
+    """L2-normalized float32 rows with their ayah ids, refs and texts
+
+    One matrix-vector product scores every row; only the top k are sorted.
     """
-    try:
-        conn = get_connection()
-        cur = conn.cursor()
-        
-        # Simple keyword search in the text
-        keywords = query.lower().split()
-        
-        cur.execute("SELECT text FROM embeddings LIMIT 100")
-        rows = cur.fetchall()
-        conn.close()
-        
-        if not rows:
+
+    def __init__(self, ids, refs, texts, vectors, normalized: bool = False):
+        self.ids = ids
+        self.refs = refs
+        self.texts = texts
+        # Optional ann_index.IVFIndex over the same rows
+        self.ann = None
+        if normalized:
+            # Used as is (e.g. a read-only memory map)
+            self.matrix = vectors
+            return
+        matrix = np.ascontiguousarray(vectors, dtype=np.float32)
+        if matrix.ndim != 2:
+            matrix = matrix.reshape(len(ids), -1) if len(ids) else matrix.reshape(0, 0)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        self.matrix = matrix / norms
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def dimensions(self) -> int:
+        return self.matrix.shape[1]
+
+    def search(self, vector, k: int = 5, exact: bool = False, nprobe: int = ann_index.NPROBE) -> list:
+        """(row, cosine similarity) of the k rows closest to vector, best first
+
+        Uses the attached ANN index unless exact is set.
+        """
+        query = np.asarray(vector, dtype=np.float32).ravel()
+        norm = np.linalg.norm(query)
+        if not len(self) or norm == 0 or query.shape[0] != self.dimensions:
+            return []
+        if self.ann is not None and not exact:
+            return self.ann.search(self.matrix, query / norm, k, nprobe)
+        scores = self.matrix @ (query / norm)
+        return [(int(row), float(scores[row])) for row in _top_k(scores, k)]
+
+    @property
+    def memory_bytes(self) -> int:
+        """Bytes of vectors held in memory (0 for a memory map)"""
+        return 0 if isinstance(self.matrix, np.memmap) else self.matrix.nbytes
+
+
+class QuantizedIndex:
+    """int8 codes in memory; the best candidates are re-scored with float vectors from disk"""
+
+    def __init__(self, ids, refs, texts, codes, scale, offset, read_rows):
+        self.ids = ids
+        self.refs = refs
+        self.texts = texts
+        self.codes = codes
+        self.scale = scale
+        self.offset = offset
+        # read_rows(row indexes) -> their L2-normalized float32 vectors
+        self.read_rows = read_rows
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def dimensions(self) -> int:
+        return self.codes.shape[1]
+
+    @property
+    def memory_bytes(self) -> int:
+        return self.codes.nbytes + self.scale.nbytes + self.offset.nbytes
+
+    def approximate_scores(self, query: np.ndarray) -> np.ndarray:
+        """query . dequantized row for every row, up to a constant shared by all rows"""
+        # (code + 128) * scale + offset: the offset and +128 terms add the same amount to every row
+        weights = (query * self.scale).astype(np.float32)
+        scores = np.empty(len(self.codes), dtype=np.float32)
+        buffer = np.empty((min(_BLOCK, len(self.codes)), self.dimensions), dtype=np.float32)
+        for first in range(0, len(self.codes), _BLOCK):
+            block = self.codes[first:first + _BLOCK]
+            upcast = buffer[:len(block)]
+            upcast[...] = block
+            np.dot(upcast, weights, out=scores[first:first + len(block)])
+        return scores
+
+    def search(self, vector, k: int = 5, rerank: int = INT8_RERANK) -> list:
+        """(row, cosine similarity) of the k best rows among the top `rerank` int8 scores, best first"""
+        query = np.asarray(vector, dtype=np.float32).ravel()
+        norm = np.linalg.norm(query)
+        if not len(self) or norm == 0 or query.shape[0] != self.dimensions:
             return []
-        
-        # Simple scoring based on keyword matches
-        scored = []
-        for row in rows:
-            text = row['text']
-            score = sum(1 for kw in keywords if kw in text.lower())
-            if score > 0:
-                scored.append((score, text))
-        
-        # Sort by score
-        scored.sort(reverse=True)
-        return [text for _, text in scored[:limit]]
-        
+        query = query / norm
+        candidates = np.sort(_top_k(self.approximate_scores(query), max(k, rerank)))
+        exact = self.read_rows(candidates) @ query
+        return [(int(candidates[i]), float(exact[i])) for i in _top_k(exact, k)]
+
+
+def _read_sidecar(ids, conn):
+    """The memory-mapped sidecar matrix if it still matches the embeddings table, else None"""
+    matrix_path, ids_path = embeddings_service.sidecar_paths()
+    if not ids or not (os.path.exists(matrix_path) and os.path.exists(ids_path)):
+        return None
+    try:
+        if np.load(ids_path).tolist() != ids:
+            print(f"Ignoring stale {matrix_path}: re-run the embeddings export")
+            return None
+        matrix = np.load(matrix_path, mmap_mode="r")
+        first = decode_vector(conn.execute("SELECT vector FROM embeddings WHERE ref_id = ?", (ids[0],)).fetchone()[0])
+        if matrix.shape[0] != len(ids) or not np.allclose(matrix[0], first / (np.linalg.norm(first) or 1), atol=1e-6):
+            print(f"Ignoring stale {matrix_path}: re-run the embeddings export")
+            return None
+        return matrix
+    except Exception as e:
+        print(f"Error reading {matrix_path}: {e}")
+        return None
+
+
+def _attach_ann(index: VectorIndex) -> VectorIndex:
+    """Attach the saved IVF index if it was built over exactly these rows"""
+    if not len(index) or not os.path.exists(ann_index.ANN_INDEX_PATH):
+        return index
+    try:
+        ann = ann_index.IVFIndex.load()
+        if ann.ids.tolist() == list(index.ids) and ann.centroids.shape[1] == index.dimensions:
+            index.ann = ann
+        else:
+            print(f"Ignoring stale {ann_index.ANN_INDEX_PATH}: rebuild with `python -m services.ann_index`")
+    except Exception as e:
+        print(f"Error reading {ann_index.ANN_INDEX_PATH}: {e}")
+    return index
+
+
+def load_vector_index():
+    """VectorIndex, or QuantizedIndex when EMBEDDINGS_MODE is int8 and the codes exist"""
+    if EMBEDDINGS_MODE == "int8":
+        index = load_quantized()
+        if index is not None:
+            return index
+        print("No int8 embeddings (python -m services.embeddings_service quantize), using float32")
+    return _attach_ann(load_vectors())
+
+
+def _mapped_rows(matrix):
+    """read_rows() for QuantizedIndex that pages rows in from the sidecar"""
+    def read_rows(positions):
+        return np.asarray(matrix[positions], dtype=np.float32)
+    return read_rows
+
+
+def _database_rows(ids):
+    """read_rows() for QuantizedIndex that fetches the float32 BLOBs by id"""
+    def read_rows(positions):
+        wanted = [ids[i] for i in positions]
+        with content_connection() as conn:
+            found = dict(conn.execute(
+                f"SELECT ref_id, vector FROM embeddings WHERE ref_id IN ({', '.join('?' * len(wanted))})",
+                wanted
+            ))
+        matrix = np.vstack([decode_vector(found[ref_id]) for ref_id in wanted])
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        return matrix / norms
+    return read_rows
+
+
+def load_quantized():
+    """QuantizedIndex over embeddings.vector_int8, or None before quantize_embeddings() has run"""
+    with content_connection() as conn:
+        scales = conn.execute(
+            "SELECT scale, offset FROM embedding_scales WHERE model = ?", (embeddings_service.MODEL_NAME,)
+        ).fetchone()
+        rows = conn.execute("""
+            SELECT e.ref_id, a.ref, e.text, e.vector_int8 FROM embeddings e
+            LEFT JOIN ayat a ON a.id = e.ref_id
+            WHERE e.vector_int8 IS NOT NULL ORDER BY e.ref_id
+        """).fetchall()
+        if scales is None or not rows:
+            return None
+        ids = [str(row[0]) for row in rows]
+        mapped = _read_sidecar(ids, conn)
+
+    codes = np.frombuffer(b"".join(row[3] for row in rows), dtype=np.int8).reshape(len(rows), -1)
+    read_rows = _mapped_rows(mapped) if mapped is not None else _database_rows(ids)
+    return QuantizedIndex(
+        ids, [row[1] or row[0] for row in rows], [row[2] for row in rows],
+        codes, decode_vector(scales[0]), decode_vector(scales[1]), read_rows,
+    )
+
+
+def load_vectors() -> VectorIndex:
+    """The stored vectors alone, without an ANN index"""
+    with content_connection() as conn:
+        rows = conn.execute("""
+            SELECT e.ref_id, a.ref, e.text FROM embeddings e
+            LEFT JOIN ayat a ON a.id = e.ref_id
+            WHERE e.vector IS NOT NULL ORDER BY e.ref_id
+        """).fetchall()
+        ids = [str(row[0]) for row in rows]
+        matrix = _read_sidecar(ids, conn)
+        if matrix is not None:
+            return VectorIndex(ids, [row[1] or row[0] for row in rows], [row[2] for row in rows], matrix, normalized=True)
+
+        blobs = conn.execute("SELECT vector FROM embeddings WHERE vector IS NOT NULL ORDER BY ref_id").fetchall()
+
+    # Vectors all have the commonest size; pickled rows from before the
+    # float32 format are skipped until they are converted
+    width = Counter(len(blob) for blob, in blobs).most_common(1)[0][0] if blobs else 0
+    keep = [i for i, (blob,) in enumerate(blobs) if len(blob) == width and width % VECTOR_DTYPE.itemsize == 0]
+    if len(keep) < len(blobs):
+        print(f"Skipping {len(blobs) - len(keep)} embeddings: run `python -m services.embeddings_service convert`")
+    if keep:
+        matrix = np.frombuffer(b"".join(blobs[i][0] for i in keep), dtype=VECTOR_DTYPE).reshape(len(keep), -1)
+    else:
+        # Nothing embedded yet: an empty index with the model's width
+        matrix = np.empty((0, len(model.encode(""))), dtype=VECTOR_DTYPE)
+    return VectorIndex(
+        [ids[i] for i in keep], [rows[i][1] or rows[i][0] for i in keep], [rows[i][2] for i in keep], matrix,
+    )
+
+
+_index = None
+_index_generation = None
+_index_lock = threading.Lock()
+
+
+def get_vector_index() -> VectorIndex:
+    """The process-wide index, rebuilt only when the content database changes"""
+    global _index, _index_generation
+    generation = content_generation()
+    if _index is None or _index_generation != generation:
+        with _index_lock:
+            if _index is None or _index_generation != generation:
+                _index = load_vector_index()
+                _index_generation = generation
+    return _index
+
+
+def semantic_search(query, limit=5):
+    """The ayat closest to the query: [{"id", "ref", "text", "score"}], best first"""
+    try:
+        index = get_vector_index()
+        return [
+            {"id": index.ids[row], "ref": index.refs[row], "text": index.texts[row], "score": score}
+            for row, score in index.search(model.encode(query), limit)
+        ]
     except Exception as e:
         print(f"Search error: {e}")
         return []
-
-# Mock model for compatibility
-try:
-    from services.embeddings_service import model
-except ImportError:
-    # Create mock model
-    class MockModel:
-        def encode(self, text):
-            return [0.0] * 384  # Return dummy vector
-    
-    model = MockModel()
@@ -2,25 +2,168 @@
 Personal Tracking Service - Track prayers, fasting, Quran reading, etc.
 """
 
-import sqlite3
-from datetime import datetime, timedelta
-from db.database import get_connection
+import atexit
+import threading
+from datetime import date as date_cls, datetime
+from db.storage import transaction
+
+# Tracking tables key users by their integer Discord ID and days by an
+# integer day number (days since 1970-01-01), see migration 0005
+EPOCH = date_cls(1970, 1, 1)
+
+def day_number(day: date_cls = None) -> int:
+    """Day number for a date (today by default)"""
+    return ((day or date_cls.today()) - EPOCH).days
+
+def parse_day(value: str) -> int:
+    """Day number for a 'YYYY-MM-DD' string"""
+    return day_number(date_cls.fromisoformat(value))
+
+# Group commit: buffered inserts are flushed every FLUSH_INTERVAL_MS or as
+# soon as FLUSH_MAX_ROWS events are waiting, whichever comes first. Past
+# FLUSH_BUFFER_LIMIT waiting events (flusher stalled) add() flushes inline.
+FLUSH_INTERVAL_MS = 250
+FLUSH_MAX_ROWS = 200
+FLUSH_BUFFER_LIMIT = 10_000
+
+class WriteBehindBuffer:
+    """Collects tracking inserts in memory and commits them in one transaction"""
+    
+    def __init__(self, interval_ms: int = FLUSH_INTERVAL_MS, max_rows: int = FLUSH_MAX_ROWS,
+                 limit: int = FLUSH_BUFFER_LIMIT):
+        self.interval = interval_ms / 1000
+        self.max_rows = max_rows
+        self.limit = limit
+        self._events = []         # (user_id, statements) in arrival order
+        self._users = set()       # users with events in _events
+        self._inflight = set()    # users whose events are being committed
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._closed = False
+    
+    def add(self, user_id: str, *statements):
+        """Queue (sql, params) statements for one event; they commit together on the next flush"""
+        if self._closed:
+            # After shutdown there is no flusher left, write straight through
+            self._write_event(statements)
+            return
+        
+        with self._lock:
+            self._events.append((user_id, statements))
+            self._users.add(user_id)
+            waiting = len(self._events)
+        
+        if waiting >= self.limit:
+            self.flush()
+            return
+        self._ensure_flusher()
+        if waiting >= self.max_rows:
+            self._wakeup.set()
+    
+    def flush(self) -> int:
+        """Commit everything buffered so far, returns the number of events written
+        
+        If the group commit fails, each event is retried in its own
+        transaction and the ones that still fail are logged and dropped,
+        so one bad row cannot hold back everyone else's writes.
+        """
+        with self._flush_lock:
+            with self._lock:
+                events, self._events = self._events, []
+                self._inflight, self._users = self._users, set()
+            
+            if not events:
+                return 0
+            
+            try:
+                # Same statement for every event -> one executemany each
+                batches = {}
+                for _, statements in events:
+                    for sql, params in statements:
+                        batches.setdefault(sql, []).append(params)
+                try:
+                    with transaction() as conn:
+                        for sql, rows in batches.items():
+                            conn.executemany(sql, rows)
+                    return len(events)
+                except Exception as e:
+                    print(f"Error flushing tracking writes, retrying {len(events)} events one by one: {e}")
+                
+                written = 0
+                for user_id, statements in events:
+                    try:
+                        self._write_event(statements)
+                        written += 1
+                    except Exception as e:
+                        print(f"Dropping tracking write for user {user_id}: {e}")
+                return written
+            finally:
+                with self._lock:
+                    self._inflight = set()
+    
+    def _write_event(self, statements):
+        with transaction() as conn:
+            for sql, params in statements:
+                conn.execute(sql, params)
+    
+    def flush_for(self, user_id: str):
+        """Make a user's buffered writes visible before reading their stats"""
+        with self._lock:
+            waiting = user_id in self._users or user_id in self._inflight
+        if waiting:
+            self.flush()
+    
+    def close(self):
+        """Stop the flusher thread and commit whatever is left"""
+        self._closed = True
+        self._wakeup.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join()
+        self.flush()
+    
+    def _ensure_flusher(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="tracking-flush", daemon=True)
+                self._thread.start()
+    
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            self.flush()
+
+_write_buffer = WriteBehindBuffer()
+
+def flush_tracking_writes() -> int:
+    """Force buffered tracking writes to disk"""
+    return _write_buffer.flush()
+
+def shutdown_tracking_writes():
+    """Flush buffered tracking writes and stop the background flusher"""
+    _write_buffer.close()
+
+atexit.register(shutdown_tracking_writes)
 
 def track_prayer(user_id: str, prayer_name: str, status: str = "completed", is_qada: bool = False):
     """Track daily prayers"""
     try:
-        conn = get_connection()
-        cur = conn.cursor()
-        
-        today = datetime.now().strftime("%Y-%m-%d")
+        user_id = int(user_id)
+        today = day_number()
         
-        cur.execute("""
-            INSERT INTO prayer_tracking (user_id, prayer_name, status, date, is_qada)
+        _write_buffer.add(user_id, ("""
+            INSERT INTO prayer_tracking (user_id, prayer_name, status, day, is_qada)
             VALUES (?, ?, ?, ?, ?)
-        """, (user_id, prayer_name, status, today, 1 if is_qada else 0))
-        
-        conn.commit()
-        conn.close()
+        """, (user_id, prayer_name, status, today, 1 if is_qada else 0)), ("""
+            INSERT INTO prayer_daily (user_id, day, prayer_name, status, count)
+            VALUES (?, ?, ?, ?, 1)
+            ON CONFLICT (user_id, day, prayer_name, status) DO UPDATE SET count = prayer_daily.count + 1
+        """, (user_id, today, prayer_name, status)))
         return True
     except Exception as e:
         print(f"Error tracking prayer: {e}")
@@ -29,20 +172,17 @@ def track_prayer(user_id: str, prayer_name: str, status: str = "completed", is_q
 def get_prayer_stats(user_id: str, days: int = 7):
     """Get prayer statistics for user"""
     try:
-        conn = get_connection()
-        cur = conn.cursor()
-        
-        start_date = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
-        
-        cur.execute("""
-            SELECT prayer_name, status, COUNT(*) as count
-            FROM prayer_tracking
-            WHERE user_id = ? AND date >= ?
-            GROUP BY prayer_name, status
-        """, (user_id, start_date))
-        
-        rows = cur.fetchall()
-        conn.close()
+        user_id = int(user_id)
+        start_day = day_number() - days
+        
+        _write_buffer.flush_for(user_id)
+        with transaction() as conn:
+            rows = conn.execute("""
+                SELECT prayer_name, status, SUM(count) as count
+                FROM prayer_daily
+                WHERE user_id = ? AND day >= ?
+                GROUP BY prayer_name, status
+            """, (user_id, start_day)).fetchall()
         
         stats = {}
         for row in rows:
@@ -60,18 +200,11 @@ def get_prayer_stats(user_id: str, days: int = 7):
 def track_qada_prayers(user_id: str, prayer_name: str, count: int = 1):
     """Track Qada (makeup) prayers"""
     try:
-        conn = get_connection()
-        cur = conn.cursor()
-        
-        today = datetime.now().strftime("%Y-%m-%d")
-        
-        cur.execute("""
-            INSERT INTO qada_prayers (user_id, prayer_name, count, date_added)
-            VALUES (?, ?, ?, ?)
-        """, (user_id, prayer_name, count, today))
-        
-        conn.commit()
-        conn.close()
+        with transaction() as conn:
+            conn.execute("""
+                INSERT INTO qada_prayers (user_id, prayer_name, count, day_added)
+                VALUES (?, ?, ?, ?)
+            """, (int(user_id), prayer_name, count, day_number()))
         return True
     except Exception as e:
         print(f"Error tracking qada: {e}")
@@ -80,18 +213,13 @@ def track_qada_prayers(user_id: str, prayer_name: str, count: int = 1):
 def get_qada_count(user_id: str):
     """Get remaining Qada prayers"""
     try:
-        conn = get_connection()
-        cur = conn.cursor()
-        
-        cur.execute("""
-            SELECT prayer_name, SUM(count) as total
-            FROM qada_prayers
-            WHERE user_id = ? AND completed = 0
-            GROUP BY prayer_name
-        """, (user_id,))
-        
-        rows = cur.fetchall()
-        conn.close()
+        with transaction() as conn:
+            rows = conn.execute("""
+                SELECT prayer_name, SUM(count) as total
+                FROM qada_prayers
+                WHERE user_id = ? AND completed = 0
+                GROUP BY prayer_name
+            """, (int(user_id),)).fetchall()
         
         return {row['prayer_name']: row['total'] for row in rows}
     except Exception as e:
@@ -101,37 +229,30 @@ def get_qada_count(user_id: str):
 def mark_qada_completed(user_id: str, prayer_name: str):
     """Mark one Qada prayer as completed"""
     try:
-        conn = get_connection()
-        cur = conn.cursor()
-        
-        # Get oldest incomplete qada prayer
-        cur.execute("""
-            SELECT id, count FROM qada_prayers
-            WHERE user_id = ? AND prayer_name = ? AND completed = 0
-            ORDER BY date_added ASC LIMIT 1
-        """, (user_id, prayer_name))
-        
-        row = cur.fetchone()
-        if row:
+        with transaction() as conn:
+            # Get oldest incomplete qada prayer
+            row = conn.execute("""
+                SELECT id, count FROM qada_prayers
+                WHERE user_id = ? AND prayer_name = ? AND completed = 0
+                ORDER BY day_added ASC, id ASC LIMIT 1
+            """, (int(user_id), prayer_name)).fetchone()
+            
+            if not row:
+                return False
+            
             if row['count'] > 1:
                 # Decrement count
-                cur.execute("""
+                conn.execute("""
                     UPDATE qada_prayers SET count = count - 1
                     WHERE id = ?
                 """, (row['id'],))
             else:
                 # Mark as completed
-                cur.execute("""
+                conn.execute("""
                     UPDATE qada_prayers SET completed = 1
                     WHERE id = ?
                 """, (row['id'],))
-            
-            conn.commit()
-            conn.close()
-            return True
-        
-        conn.close()
-        return False
+        return True
     except Exception as e:
         print(f"Error marking qada complete: {e}")
         return False
@@ -139,19 +260,14 @@ def mark_qada_completed(user_id: str, prayer_name: str):
 def track_fasting(user_id: str, date: str = None, status: str = "fasted"):
     """Track fasting days"""
     try:
-        conn = get_connection()
-        cur = conn.cursor()
+        user_id = int(user_id)
+        day = parse_day(date) if date else day_number()
         
-        if not date:
-            date = datetime.now().strftime("%Y-%m-%d")
-        
-        cur.execute("""
-            INSERT OR REPLACE INTO fasting_tracking (user_id, date, status)
+        _write_buffer.add(user_id, ("""
+            INSERT INTO fasting_tracking (user_id, day, status)
             VALUES (?, ?, ?)
-        """, (user_id, date, status))
-        
-        conn.commit()
-        conn.close()
+            ON CONFLICT (user_id, day) DO UPDATE SET status = excluded.status
+        """, (user_id, day, status)))
         return True
     except Exception as e:
         print(f"Error tracking fasting: {e}")
@@ -160,21 +276,18 @@ def track_fasting(user_id: str, date: str = None, status: str = "fasted"):
 def get_fasting_stats(user_id: str, year: int = None):
     """Get fasting statistics"""
     try:
-        conn = get_connection()
-        cur = conn.cursor()
-        
+        user_id = int(user_id)
         if not year:
             year = datetime.now().year
         
-        cur.execute("""
-            SELECT status, COUNT(*) as count
-            FROM fasting_tracking
-            WHERE user_id = ? AND strftime('%Y', date) = ?
-            GROUP BY status
-        """, (user_id, str(year)))
-        
-        rows = cur.fetchall()
-        conn.close()
+        _write_buffer.flush_for(user_id)
+        with transaction() as conn:
+            rows = conn.execute("""
+                SELECT status, COUNT(*) as count
+                FROM fasting_tracking
+                WHERE user_id = ? AND day >= ? AND day < ?
+                GROUP BY status
+            """, (user_id, day_number(date_cls(year, 1, 1)), day_number(date_cls(year + 1, 1, 1)))).fetchall()
         
         return {row['status']: row['count'] for row in rows}
     except Exception as e:
@@ -184,18 +297,17 @@ def get_fasting_stats(user_id: str, year: int = None):
 def track_quran_reading(user_id: str, surah: int, verses_read: int):
     """Track Quran reading progress"""
     try:
-        conn = get_connection()
-        cur = conn.cursor()
-        
-        today = datetime.now().strftime("%Y-%m-%d")
+        user_id = int(user_id)
+        today = day_number()
         
-        cur.execute("""
-            INSERT INTO quran_reading (user_id, surah, verses_read, date_read)
+        _write_buffer.add(user_id, ("""
+            INSERT INTO quran_reading (user_id, surah, verses_read, day)
             VALUES (?, ?, ?, ?)
-        """, (user_id, surah, verses_read, today))
-        
-        conn.commit()
-        conn.close()
+        """, (user_id, surah, verses_read, today)), ("""
+            INSERT INTO quran_daily (user_id, day, surah, verses)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (user_id, day, surah) DO UPDATE SET verses = quran_daily.verses + excluded.verses
+        """, (user_id, today, surah, verses_read)))
         return True
     except Exception as e:
         print(f"Error tracking Quran reading: {e}")
@@ -204,21 +316,18 @@ def track_quran_reading(user_id: str, surah: int, verses_read: int):
 def get_quran_reading_stats(user_id: str, days: int = 30):
     """Get Quran reading statistics"""
     try:
-        conn = get_connection()
-        cur = conn.cursor()
-        
-        start_date = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
-        
-        cur.execute("""
-            SELECT SUM(verses_read) as total_verses,
-                   COUNT(DISTINCT surah) as surahs_read,
-                   COUNT(DISTINCT date_read) as days_read
-            FROM quran_reading
-            WHERE user_id = ? AND date_read >= ?
-        """, (user_id, start_date))
-        
-        row = cur.fetchone()
-        conn.close()
+        user_id = int(user_id)
+        start_day = day_number() - days
+        
+        _write_buffer.flush_for(user_id)
+        with transaction() as conn:
+            row = conn.execute("""
+                SELECT SUM(verses) as total_verses,
+                       COUNT(DISTINCT surah) as surahs_read,
+                       COUNT(DISTINCT day) as days_read
+                FROM quran_daily
+                WHERE user_id = ? AND day >= ?
+            """, (user_id, start_day)).fetchone()
         
         return {
             "total_verses": row['total_verses'] or 0,
@@ -232,18 +341,15 @@ def get_quran_reading_stats(user_id: str, days: int = 30):
 def get_khatm_progress(user_id: str):
     """Get progress toward completing the Quran"""
     try:
-        conn = get_connection()
-        cur = conn.cursor()
-        
-        cur.execute("""
-            SELECT surah, MAX(ayah) as last_ayah
-            FROM quran_reading
-            WHERE user_id = ?
-            GROUP BY surah
-        """, (user_id,))
-        
-        rows = cur.fetchall()
-        conn.close()
+        user_id = int(user_id)
+        _write_buffer.flush_for(user_id)
+        with transaction() as conn:
+            rows = conn.execute("""
+                SELECT surah, MAX(ayah) as last_ayah
+                FROM quran_reading
+                WHERE user_id = ?
+                GROUP BY surah
+            """, (user_id,)).fetchall()
         
         # Surah verse counts (simplified)
         surah_verses = {
@@ -270,18 +376,17 @@ def get_khatm_progress(user_id: str):
 def track_tasbeeh(user_id: str, dhikr: str, count: int):
     """Track tasbeeh count"""
     try:
-        conn = get_connection()
-        cur = conn.cursor()
+        user_id = int(user_id)
+        today = day_number()
         
-        today = datetime.now().strftime("%Y-%m-%d")
-        
-        cur.execute("""
-            INSERT INTO tasbeeh_tracking (user_id, dhikr, count, date)
+        _write_buffer.add(user_id, ("""
+            INSERT INTO tasbeeh_tracking (user_id, dhikr, count, day)
             VALUES (?, ?, ?, ?)
-        """, (user_id, dhikr, count, today))
-        
-        conn.commit()
-        conn.close()
+        """, (user_id, dhikr, count, today)), ("""
+            INSERT INTO tasbeeh_daily (user_id, day, dhikr, total)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (user_id, day, dhikr) DO UPDATE SET total = tasbeeh_daily.total + excluded.total
+        """, (user_id, today, dhikr, count)))
         return True
     except Exception as e:
         print(f"Error tracking tasbeeh: {e}")
@@ -290,20 +395,17 @@ def track_tasbeeh(user_id: str, dhikr: str, count: int):
 def get_tasbeeh_stats(user_id: str, days: int = 7):
     """Get tasbeeh statistics"""
     try:
-        conn = get_connection()
-        cur = conn.cursor()
-        
-        start_date = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
-        
-        cur.execute("""
-            SELECT dhikr, SUM(count) as total
-            FROM tasbeeh_tracking
-            WHERE user_id = ? AND date >= ?
-            GROUP BY dhikr
-        """, (user_id, start_date))
-        
-        rows = cur.fetchall()
-        conn.close()
+        user_id = int(user_id)
+        start_day = day_number() - days
+        
+        _write_buffer.flush_for(user_id)
+        with transaction() as conn:
+            rows = conn.execute("""
+                SELECT dhikr, SUM(total) as total
+                FROM tasbeeh_daily
+                WHERE user_id = ? AND day >= ?
+                GROUP BY dhikr
+            """, (user_id, start_day)).fetchall()
         
         return {row['dhikr']: row['total'] for row in rows}
     except Exception as e:
@@ -0,0 +1,25 @@
+import os
+import sys
+
+import pytest
+
+# Tests import the bot's top-level packages (db, services) directly
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db.database as database
+import services.ann_index as ann_index
+import services.embeddings_service as embeddings_service
+import services.quran_bundle as quran_bundle
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    """Point the connection pools at fresh user and content database files (and no bundle, embeddings sidecar or ANN index)"""
+    database.close_all_connections()
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "bot.db"))
+    monkeypatch.setattr(database, "CONTENT_DB_PATH", str(tmp_path / "content.db"))
+    monkeypatch.setattr(quran_bundle, "BUNDLE_PATH", str(tmp_path / "quran.bundle"))
+    monkeypatch.setattr(embeddings_service, "EMBEDDINGS_PATH", str(tmp_path / "embeddings.npy"))
+    monkeypatch.setattr(ann_index, "ANN_INDEX_PATH", str(tmp_path / "embeddings.ivf.npz"))
+    yield database.get_connection()
+    database.close_all_connections()
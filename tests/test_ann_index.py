@@ -0,0 +1,70 @@
+import numpy as np
+
+from db.database import content_writer
+from db.models import init_db
+from services import ann_index, semantic_search
+from services.embeddings_service import generate_embeddings, model
+
+
+def clustered(rows=3000, dim=32, topics=40, seed=3):
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(topics, dim))
+    matrix = (centres[rng.integers(0, topics, rows)] + rng.normal(scale=0.5, size=(rows, dim))).astype(np.float32)
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+def exact_top(matrix, query, k):
+    return list(np.argsort(-(matrix @ query))[:k])
+
+
+def test_ivf_and_pq_recall(tmp_path):
+    matrix = clustered()
+    queries = matrix[:50]
+    ids = np.arange(len(matrix)).astype(str)
+
+    flat = ann_index.IVFIndex.build(matrix, ids, nlist=30)
+    assert flat.offsets[-1] == len(matrix) and sorted(flat.order) == list(range(len(matrix)))
+    # Probing every list is exhaustive
+    q = queries[0]
+    assert [row for row, _ in flat.search(matrix, q, 10, nprobe=30)] == exact_top(matrix, q, 10)
+
+    quantized = ann_index.IVFIndex.build(matrix, ids, nlist=30, pq=8)
+    assert quantized.codes.shape == (len(matrix), 8) and quantized.codes.dtype == np.uint8
+    for index in (flat, quantized):
+        hits = [
+            len({row for row, _ in index.search(matrix, q, 10, nprobe=4)} & set(exact_top(matrix, q, 10)))
+            for q in queries
+        ]
+        assert np.mean(hits) / 10 >= 0.9
+
+    # Scores are exact even when PQ picked the candidates
+    row, score = quantized.search(matrix, q, 1, nprobe=4)[0]
+    assert abs(score - float(matrix[row] @ q)) < 1e-5
+
+    path = str(tmp_path / "index.npz")
+    quantized.save(path)
+    loaded = ann_index.IVFIndex.load(path)
+    assert loaded.pq == 8 and loaded.ids.tolist() == ids.tolist()
+    assert loaded.search(matrix, q, 5) == quantized.search(matrix, q, 5)
+
+
+def test_semantic_search_uses_matching_ann_index(temp_db):
+    init_db()
+    with content_writer() as conn:
+        conn.executemany("INSERT INTO ayat (id, ref, text) VALUES (?, ?, ?)", [
+            (str(n), f"ref {n}", f"نص رقم {n}") for n in range(1, 41)
+        ])
+    generate_embeddings(report=lambda message: None)
+
+    vectors = semantic_search.load_vectors()
+    ann_index.IVFIndex.build(vectors.matrix, vectors.ids, nlist=4).save()
+    index = semantic_search.load_vector_index()
+    assert index.ann is not None and index.ann.nlist == 4
+    query = model.encode("نص رقم 12")
+    assert index.search(query, 1)[0][0] == index.search(query, 1, exact=True)[0][0] == index.ids.index("12")
+
+    # Rows added after the build make the saved index stale
+    with content_writer() as conn:
+        conn.execute("INSERT INTO ayat (id, ref, text) VALUES ('41', 'ref 41', 'نص جديد')")
+    generate_embeddings(report=lambda message: None)
+    assert semantic_search.load_vector_index().ann is None
@@ -0,0 +1,13 @@
+from services.arabic_normalizer import normalize, normalize_many
+
+
+def test_uthmani_text_reduces_to_what_users_type():
+    assert normalize("بِسْمِ ٱللَّهِ ٱلرَّحْمَٰنِ ٱلرَّحِيمِ") == "بسم الله الرحمن الرحيم"
+    assert normalize("ذَٰلِكَ ٱلْكِتَٰبُ لَا رَيْبَ ۛ فِيهِ ۛ هُدًى لِّلْمُتَّقِينَ") == "ذلك الكتب لا ريب فيه هدي للمتقين"
+    assert normalize("إِنَّ أُولَـٰئِكَ آمَنُوا مُؤْمِنَةٌ") == "ان اوليك امنوا مومنه"
+    assert normalize("") == ""
+
+
+def test_batch_matches_single():
+    texts = ["قُلْ هُوَ ٱللَّهُ أَحَدٌ", None, "line\nbreak ۞ عَلَىٰ"]
+    assert normalize_many(texts) == [normalize(text) for text in texts]
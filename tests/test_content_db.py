@@ -0,0 +1,38 @@
+import sqlite3
+
+import pytest
+
+import db.database as database
+from db.models import init_db
+from services.quran_service import get_random_ayah
+
+
+def test_legacy_content_moves_out_of_user_db(temp_db):
+    # A bot.db from before the split, with content and posted-ayah flags
+    temp_db.execute("CREATE TABLE ayat (id TEXT PRIMARY KEY, ref TEXT, text TEXT, used INTEGER DEFAULT 0)")
+    temp_db.execute("CREATE TABLE azkar (id INTEGER PRIMARY KEY AUTOINCREMENT, type TEXT, text TEXT)")
+    temp_db.executemany("INSERT INTO ayat VALUES (?, ?, ?, ?)", [("1", "1:1", "a", 1), ("2", "1:2", "b", 0)])
+    temp_db.execute("INSERT INTO azkar (type, text) VALUES ('morning', 'z')")
+    temp_db.commit()
+
+    init_db()
+
+    user_tables = {row[0] for row in temp_db.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    assert not user_tables & {"ayat", "azkar", "embeddings", "islamic_events", "hajj_umrah_guides"}
+    assert "used_ayat" not in user_tables and "ayah_rotation" in user_tables
+
+    content = database.get_content_connection()
+    assert [tuple(row) for row in content.execute("SELECT id, ref, text FROM ayat ORDER BY id")] == [
+        ("1", "1:1", "a"), ("2", "1:2", "b")
+    ]
+    assert content.execute("SELECT text FROM azkar").fetchone()[0] == "z"
+
+    assert {get_random_ayah()["id"] for _ in range(2)} == {"1", "2"}
+
+
+def test_content_connection_is_read_only(temp_db):
+    init_db()
+
+    with pytest.raises(sqlite3.OperationalError):
+        database.get_content_connection().execute("INSERT INTO azkar (type, text) VALUES ('morning', 'x')")
+    assert database.get_content_connection().execute("PRAGMA journal_mode").fetchone()[0] == "delete"
@@ -0,0 +1,144 @@
+import shutil
+
+import pytest
+
+import db.database
+import db.models
+from db.migrate import discover_migrations, get_schema_version, run_migrations
+from db.models import init_db
+from services.tracking_service import parse_day
+
+
+def query_plan(conn, sql, params):
+    rows = conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+    return " | ".join(row["detail"] for row in rows)
+
+
+def test_init_db_applies_all_migrations(temp_db):
+    init_db()
+
+    latest = discover_migrations()[-1][0]
+    assert get_schema_version(temp_db) == latest
+    # Re-running is a no-op
+    assert run_migrations(temp_db) == []
+
+
+def test_migration_versions_are_unique_and_ordered():
+    versions = [version for version, _, _ in discover_migrations()]
+    assert versions == sorted(set(versions))
+
+
+# (query as issued by the services, params, index usage expected in the plan)
+INDEXED_QUERIES = [
+    ("""SELECT prayer_name, status, SUM(count) as count FROM prayer_daily
+        WHERE user_id = ? AND day >= ? GROUP BY prayer_name, status""",
+     (1, 20000), "prayer_daily USING PRIMARY KEY (user_id=? AND day>?)"),
+    ("""SELECT dhikr, SUM(total) as total FROM tasbeeh_daily
+        WHERE user_id = ? AND day >= ? GROUP BY dhikr""",
+     (1, 20000), "tasbeeh_daily USING PRIMARY KEY (user_id=? AND day>?)"),
+    ("""SELECT SUM(verses), COUNT(DISTINCT surah), COUNT(DISTINCT day) FROM quran_daily
+        WHERE user_id = ? AND day >= ?""",
+     (1, 20000), "quran_daily USING PRIMARY KEY (user_id=? AND day>?)"),
+    ("""SELECT status, COUNT(*) as count FROM fasting_tracking
+        WHERE user_id = ? AND day >= ? AND day < ? GROUP BY status""",
+     (1, 20454, 20819), "INDEX idx_fasting_tracking_user_day (user_id=? AND day>? AND day<?)"),
+    ("""SELECT id, count FROM qada_prayers
+        WHERE user_id = ? AND prayer_name = ? AND completed = 0 ORDER BY day_added ASC LIMIT 1""",
+     (1, "fajr"), "INDEX idx_qada_prayers_user_prayer"),
+    ("SELECT id FROM favorites WHERE user_id=? AND item_type=? AND item_id=?",
+     ("1", "ayah", "255"), "INDEX idx_favorites_user_item"),
+    ("SELECT item_type, item_id, created_at FROM favorites WHERE user_id=? ORDER BY created_at DESC",
+     ("1",), "INDEX idx_favorites_user_created"),
+    ("SELECT channel_id FROM scheduled_azkar WHERE schedule_type=? AND is_active=1",
+     ("morning",), "INDEX idx_scheduled_azkar_type_active"),
+    ("SELECT id FROM scheduled_azkar WHERE guild_id=? AND channel_id=? AND schedule_type=?",
+     ("1", "2", "morning"), "INDEX idx_scheduled_azkar_guild_channel"),
+]
+
+
+def test_hot_queries_use_indexes(temp_db):
+    init_db()
+
+    for sql, params, index in INDEXED_QUERIES:
+        plan = query_plan(temp_db, sql, params)
+        assert index in plan, f"{index} not used: {plan}"
+        assert "USE TEMP B-TREE FOR ORDER BY" not in plan, plan
+
+
+def test_integer_key_migration_converts_text_layout(temp_db, tmp_path, monkeypatch):
+    # Build the schema as it was before migration 0005
+    old_dir = tmp_path / "old_migrations"
+    old_dir.mkdir()
+    for version, _, path in discover_migrations():
+        if version < 5:
+            shutil.copy(path, old_dir)
+    monkeypatch.setattr(db.models, "run_migrations", lambda conn: run_migrations(conn, str(old_dir)))
+    init_db()
+
+    temp_db.executemany(
+        "INSERT INTO prayer_tracking (user_id, prayer_name, status, date) VALUES (?, ?, ?, ?)",
+        [("1459564811183591686", "fajr", "completed", "2026-03-01")] * 2,
+    )
+    temp_db.executemany(
+        "INSERT INTO fasting_tracking (user_id, date, status) VALUES (?, ?, ?)",
+        [("7", "2026-03-01", "fasted"), ("7", "2026-03-01", "missed"), ("7", "2025-12-31", "fasted")],
+    )
+    temp_db.execute(
+        "INSERT INTO prayer_daily (user_id, date, prayer_name, status, count) VALUES (?, ?, ?, ?, ?)",
+        ("1459564811183591686", "2026-03-01", "fajr", "completed", 2),
+    )
+    temp_db.execute(
+        "INSERT INTO qada_prayers (user_id, prayer_name, count, date_added) VALUES (?, ?, ?, ?)",
+        ("7", "asr", 2, "2026-03-01"),
+    )
+    temp_db.commit()
+
+    assert run_migrations(temp_db) == [v for v, _, _ in discover_migrations() if v >= 5]
+
+    day = parse_day("2026-03-01")
+    assert [tuple(r) for r in temp_db.execute("SELECT user_id, day FROM prayer_tracking")] == [
+        (1459564811183591686, day), (1459564811183591686, day)
+    ]
+    assert tuple(temp_db.execute("SELECT user_id, day, count FROM prayer_daily").fetchone()) == (1459564811183591686, day, 2)
+    assert tuple(temp_db.execute("SELECT user_id, day_added, count FROM qada_prayers").fetchone()) == (7, day, 2)
+    # One status per user per day, the latest one wins
+    assert sorted(tuple(r) for r in temp_db.execute("SELECT day, status FROM fasting_tracking")) == [
+        (parse_day("2025-12-31"), "fasted"), (day, "missed")
+    ]
+
+
+def test_init_db_fast_path_skips_bootstrap_when_fingerprint_matches(temp_db, monkeypatch):
+    init_db()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("bootstrap ran again")
+    monkeypatch.setattr(db.models, "run_migrations", fail)
+    monkeypatch.setattr(db.models, "content_writer", fail)
+    init_db()
+
+    # A schema change (here a new migration) invalidates the fingerprint
+    monkeypatch.setattr(db.models, "discover_migrations", lambda: discover_migrations() + [(9999, "next", "")])
+    with pytest.raises(AssertionError):
+        init_db()
+
+
+def test_islamic_events_are_deduplicated_and_seeded_once(temp_db, monkeypatch):
+    # Older bot.db files gained a copy of every event on each restart
+    temp_db.execute("""
+        CREATE TABLE islamic_events (id INTEGER PRIMARY KEY AUTOINCREMENT, hijri_month INTEGER,
+        hijri_day INTEGER, event_name TEXT, event_description TEXT, is_holiday INTEGER DEFAULT 0)
+    """)
+    temp_db.executemany(
+        "INSERT INTO islamic_events (hijri_month, hijri_day, event_name, event_description, is_holiday) "
+        "VALUES (?, ?, ?, ?, ?)",
+        list(db.models.ISLAMIC_EVENTS) * 3,
+    )
+    temp_db.commit()
+
+    init_db()
+    # Seeding again (as after a schema change) must not add rows
+    monkeypatch.setattr(db.models, "content_fingerprint", lambda: "changed")
+    init_db()
+
+    content = db.database.get_content_connection()
+    assert content.execute("SELECT COUNT(*) FROM islamic_events").fetchone()[0] == len(db.models.ISLAMIC_EVENTS)
@@ -0,0 +1,38 @@
+import db.database as database
+from db import query_stats
+from db.models import init_db
+from services import favorites_service
+
+
+def test_normalize_sql_groups_literals_and_whitespace():
+    assert query_stats.normalize_sql("SELECT *  FROM t\n WHERE a = 'x''y' AND b IN (?, ?,?) LIMIT 10") == \
+        "SELECT * FROM t WHERE a = ? AND b IN (...) LIMIT ?"
+
+
+def test_statements_are_timed_and_grouped(temp_db, monkeypatch):
+    monkeypatch.setattr(query_stats.query_stats, "enabled", True)
+    monkeypatch.setattr(query_stats.query_stats, "slow_query_ms", 0)
+    query_stats.reset_query_stats()
+    database.close_all_connections()
+    init_db()
+
+    for item_id in ("1", "2", "3"):
+        favorites_service.add_favorite("7", "ayah", item_id)
+    assert len(favorites_service.get_user_favorites("7")) == 3
+    conn = database.get_connection()
+    assert len(list(conn.execute("SELECT item_id FROM favorites WHERE user_id = '7'"))) == 3
+
+    stats = {row["sql"]: row for row in query_stats.get_query_stats()}
+    insert = stats["INSERT INTO favorites (user_id, item_type, item_id) VALUES (?, ?, ?)"]
+    assert insert["count"] == 3 and insert["rows"] == 3
+    select = stats["SELECT item_type, item_id, created_at FROM favorites WHERE user_id=? ORDER BY created_at DESC"]
+    assert select["count"] == 1 and select["rows"] == 3
+    assert select["p50_ms"] <= select["p95_ms"] <= select["p99_ms"] <= select["max_ms"]
+    assert stats["SELECT item_id FROM favorites WHERE user_id = ?"]["rows"] == 3
+
+    # Threshold 0 makes everything slow; plans come from EXPLAIN QUERY PLAN
+    slow = [q for q in query_stats.get_slow_queries() if q["sql"] == select["sql"]]
+    assert "idx_favorites_user_created" in slow[0]["plan"]
+
+    query_stats.reset_query_stats()
+    database.close_all_connections()
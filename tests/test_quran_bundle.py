@@ -0,0 +1,51 @@
+import pytest
+
+from db.database import content_writer
+from db.models import init_db
+from services import complete_quran_service, quran_bundle, quran_corpus
+from services.quran_corpus import get_corpus, read_content_corpus
+
+
+def test_bundle_round_trip_and_mapped_corpus(temp_db, monkeypatch):
+    init_db()
+    with content_writer() as conn:
+        conn.executemany("INSERT INTO ayat (id, ref, text) VALUES (?, ?, ?)",
+                         [(str(6221 + n), f"112:{n}", f"ikhlas {n} ﷽") for n in range(1, 5)])
+
+    info = quran_bundle.build_bundle(read_content_corpus())
+    bundle = quran_bundle.QuranBundle(info["path"])
+    assert bundle.verify() and bundle.total == 6236
+    assert tuple(bundle.section("surahs"))[111:113] == (6221, 6225)
+
+    # Once built, the bundle serves the text even after the table changes
+    with content_writer() as conn:
+        conn.execute("DELETE FROM ayat")
+    corpus = get_corpus()
+    assert len(corpus) == 4 and corpus.locate(6222) == (112, 1)
+    assert complete_quran_service.get_ayah_text(112, 4)["text"] == "ikhlas 4 ﷽"
+    assert bytes(corpus.span(6222, 6223)).decode() == "ikhlas 1 ﷽ikhlas 2 ﷽"
+
+    # Lookups do not stat the bundle; a content change keeps the unchanged mapping
+    with monkeypatch.context() as patched:
+        patched.setattr(quran_corpus, "bundle_stamp", lambda: pytest.fail("stat on lookup"))
+        assert get_corpus() is corpus
+    with content_writer() as conn:
+        conn.execute("INSERT INTO ayat (id, ref, text) VALUES ('1', '1:1', 'fatiha 1')")
+    assert get_corpus() is corpus
+
+
+def test_corrupt_bundle_is_detected(temp_db):
+    init_db()
+    path = quran_bundle.build_bundle(read_content_corpus())["path"]
+    with open(path, "r+b") as f:
+        f.seek(-1, 2)
+        last = f.read(1)
+        f.seek(-1, 2)
+        f.write(bytes([last[0] ^ 0xFF]))
+    assert not quran_bundle.QuranBundle(path).verify()
+
+    with open(path, "r+b") as f:
+        f.write(b"NOTABNDL")
+    with pytest.raises(ValueError):
+        quran_bundle.QuranBundle(path)
+    assert quran_bundle.open_bundle(path) is None
@@ -0,0 +1,41 @@
+from db.database import content_writer
+from db.models import init_db, normalize_ayat
+from services import quran_concordance, quran_search
+from services.quran_concordance import build_concordance
+
+
+def test_postings_round_trip():
+    postings = [(1, 1), (1, 3), (1, 200), (7, 2), (6236, 1), (6236, 40)]
+    blob = quran_concordance.encode_postings(postings)
+    assert quran_concordance.decode_postings(blob) == postings
+    # Deltas are small: only the position step of 197 and the ayah step of 6229 take two bytes
+    assert len(blob) == 2 * len(postings) + 2
+
+
+def test_word_phrase_and_frequency_queries(temp_db):
+    init_db()
+    with content_writer() as conn:
+        conn.executemany("INSERT INTO ayat (id, ref, text) VALUES (?, ?, ?)", [
+            ("1", "1:1", "بِسْمِ ٱللَّهِ ٱلرَّحْمَٰنِ ٱلرَّحِيمِ"),
+            ("3", "1:3", "ٱلرَّحْمَٰنِ ٱلرَّحِيمِ"),
+            ("30", "2:23", "ٱلرَّحِيمِ ٱلرَّحْمَٰنِ"),
+            ("6222", "112:1", "قُلْ هُوَ ٱللَّهُ أَحَدٌ"),
+        ])
+        normalize_ayat(conn)
+        build_concordance(conn)
+
+    assert quran_concordance.occurrences("الرحمن") == ((1, 3), (3, 1), (30, 2))
+    assert quran_concordance.phrase_occurrences("الرحمن الرحيم") == [(1, 3), (3, 1)]
+    assert quran_concordance.matching_ayat("الرحيم الرحمن", phrase=False) == [1, 3, 30]
+    assert quran_concordance.phrase_occurrences("الرحمن غفور") == []
+
+    stats = quran_concordance.word_stats("ٱلرَّحْمَٰنِ")
+    assert (stats["occurrences"], stats["ayat"], stats["surahs"]) == (3, 3, 2)
+    assert stats["by_surah"] == [(1, 2), (2, 1)] and stats["first"] == (1, 3)
+
+    first = quran_search.search_page("الرحمن الرحيم", limit=1, mode="phrase")
+    assert first["total"] == 2 and first["results"][0]["id"] == "1"
+    assert "**ٱلرَّحْمَٰنِ**" in first["results"][0]["snippet"]
+    second = quran_search.search_page("الرحمن الرحيم", first["next"], limit=1, mode="phrase")
+    assert [r["id"] for r in second["results"]] == ["3"] and second["next"] is None
+    assert quran_search.search_page("الله", mode="words")["total"] == 2
@@ -0,0 +1,47 @@
+from services import complete_quran_service, quran_coordinates as coordinates
+from services.complete_quran_service import QURAN_STRUCTURE
+from db.database import content_writer
+from db.models import init_db
+
+
+def test_surah_starts_match_verse_counts():
+    ends = coordinates.SURAH_START[1:] + (coordinates.TOTAL_AYAHS + 1,)
+    assert [end - start for start, end in zip(coordinates.SURAH_START, ends)] == [
+        QURAN_STRUCTURE[s]["verses"] for s in range(1, 115)
+    ]
+    for number in (1, 7, 8, 262, 6236):
+        surah, ayah = complete_quran_service.locate_global_ayah(number)
+        assert complete_quran_service.calculate_global_ayah_number(surah, ayah) == number
+
+
+def test_division_tables_cover_the_mushaf():
+    for starts, units in ((coordinates.JUZ_START, 30), (coordinates.HIZB_QUARTER_START, 240),
+                          (coordinates.PAGE_START, 604), (coordinates.RUKU_START, 556)):
+        assert len(starts) == units and starts[0] == 1
+        assert list(starts) == sorted(set(starts))
+        assert coordinates.unit_of(starts, coordinates.TOTAL_AYAHS) == units
+
+
+def test_known_positions():
+    assert complete_quran_service.get_ayah_position(2, 255) == {
+        "global": 262, "juz": 3, "hizb": 5, "hizb_quarter": 17, "page": 42, "ruku": 35
+    }
+    assert complete_quran_service.get_ayah_position(114, 6)["page"] == 604
+    assert complete_quran_service.get_ayah_position(114, 7) is None
+    assert complete_quran_service.get_ayah_position(115, 1) is None
+    assert complete_quran_service.get_ayah_position(1, 0) is None
+    assert complete_quran_service.get_juz_info(2)["start"] == (2, 142)
+    assert complete_quran_service.get_juz_info(30)["start"] == (78, 1)
+    page = complete_quran_service.get_page_info(604)
+    assert (page["juz"], page["start"], page["end"]) == (30, (112, 1), (114, 6))
+    assert complete_quran_service.get_page_info(605) is None
+
+
+def test_page_text_returns_its_ayahs(temp_db):
+    init_db()
+    with content_writer() as conn:
+        conn.executemany("INSERT INTO ayat (id, ref, text) VALUES (?, ?, ?)",
+                         [(str(n), "", f"ayah {n}") for n in range(1, 10)])
+
+    page = complete_quran_service.get_page_text(2)
+    assert [(a["surah"], a["ayah"]) for a in page["ayahs"]] == [(2, 1), (2, 2)]
@@ -0,0 +1,36 @@
+from db.database import content_writer
+from db.models import init_db
+from services import complete_quran_service
+from services.quran_corpus import get_corpus
+
+
+def load_ayat(rows):
+    with content_writer() as conn:
+        conn.executemany("INSERT OR REPLACE INTO ayat (id, ref, text) VALUES (?, ?, ?)", rows)
+
+
+def test_corpus_serves_ayat_and_ranges_from_memory(temp_db):
+    init_db()
+    # Al-Ikhlas is global 6222..6225, plus the first ayah of An-Nas
+    load_ayat([(str(6221 + n), f"112:{n}", f"ikhlas {n} ﷽") for n in range(1, 5)] + [("6231", "114:1", "nas 1")])
+
+    corpus = get_corpus()
+    assert len(corpus) == 5
+    assert corpus.global_number(112, 1) == 6222 and corpus.locate(6231) == (114, 1)
+    assert corpus.global_number(112, 5) == 0
+
+    assert complete_quran_service.get_ayah_text(112, 2) == {"text": "ikhlas 2 ﷽", "ref": "112:2", "surah": 112, "ayah": 2}
+    assert complete_quran_service.get_ayah_text(1, 1) is None
+
+    surah = complete_quran_service.get_surah_text(112, 2)
+    assert [(a["number"], a["text"]) for a in surah["ayahs"]] == [(2, "ikhlas 2 ﷽"), (3, "ikhlas 3 ﷽"), (4, "ikhlas 4 ﷽")]
+
+    # Ranges are views into one buffer, not copies
+    span = corpus.span(6222, 6223)
+    assert isinstance(span, memoryview)
+    assert bytes(span).decode() == "ikhlas 1 ﷽ikhlas 2 ﷽"
+
+    # Rewriting the content database reloads the corpus on next use
+    load_ayat([("1", "1:1", "fatiha 1")])
+    assert get_corpus() is not corpus
+    assert complete_quran_service.get_ayah_text(1, 1)["text"] == "fatiha 1"
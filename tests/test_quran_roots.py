@@ -0,0 +1,42 @@
+from db.database import content_writer
+from db.models import init_db
+from services import quran_roots, quran_search
+
+# Lines in the format of the Quranic Arabic Corpus morphology file
+MORPHOLOGY = """\
+# comment lines and the header are skipped
+LOCATION\tFORM\tTAG\tFEATURES
+(2:2:1:1)\t*a`lika\tDEM\tSTEM|POS:DEM|LEM:*a`lik|MS
+(2:2:2:1)\t{lo\tDET\tPREFIX|Al+
+(2:2:2:2)\tkita`bu\tN\tSTEM|POS:N|LEM:kita`b|ROOT:ktb|M|NOM
+(2:3:2:1)\tyu&ominu\tV\tSTEM|POS:V|IMPF|(IV)|LEM:'aAmana|ROOT:'mn|3MP
+(2:44:7:1)\ttatoluwna\tV\tSTEM|POS:V|IMPF|LEM:talaA|ROOT:tlw|2MP
+(2:44:8:1)\t{lo\tDET\tPREFIX|Al+
+(2:44:8:2)\tkita`ba\tN\tSTEM|POS:N|LEM:kita`b|ROOT:ktb|M|ACC
+(96:1:1:1)\t{qora>o\tV\tSTEM|POS:V|IMPV|LEM:qara>a|ROOT:qr'|2MS
+"""
+
+
+def test_root_queries_combine_bitsets(temp_db, tmp_path):
+    init_db()
+    path = tmp_path / "morphology.txt"
+    path.write_text(MORPHOLOGY, encoding="utf-8")
+    with content_writer() as conn:
+        assert quran_roots.build_root_index(conn, str(path)) == 4
+        conn.executemany("INSERT INTO ayat (id, ref, text) VALUES (?, ?, ?)", [
+            ("9", "2:2", "ذَٰلِكَ ٱلْكِتَٰبُ لَا رَيْبَ ۛ فِيهِ ۛ هُدًى لِّلْمُتَّقِينَ"),
+            ("51", "2:44", "أَتَأْمُرُونَ ٱلنَّاسَ بِٱلْبِرِّ وَتَنسَوْنَ أَنفُسَكُمْ وَأَنتُمْ تَتْلُونَ ٱلْكِتَٰبَ"),
+        ])
+
+    assert quran_roots.parse_query("ك ت ب") == [["كتب"]]
+    assert quran_roots.parse_query("كتب أمن | قرأ") == [["كتب", "ءمن"], ["قرء"]]
+    assert list(quran_roots.iter_bits(quran_roots.matching_bits("كتب"))) == [9, 51]
+    assert list(quran_roots.iter_bits(quran_roots.matching_bits("كتب & تلو"))) == [51]
+    assert list(quran_roots.iter_bits(quran_roots.matching_bits("امن | قرا"))) == [10, 6107]
+    assert quran_roots.matching_bits("كتب علم") == 0
+
+    page = quran_search.search_page("ك ت ب", limit=1, mode="root")
+    assert page["total"] == 2 and page["next"] == 9
+    assert page["results"][0]["snippet"].startswith("ذَٰلِكَ **ٱلْكِتَٰبُ** لَا")
+    page = quran_search.search_page("ك ت ب", page["next"], limit=1, mode="root")
+    assert page["results"][0]["snippet"].endswith("**ٱلْكِتَٰبَ**") and page["next"] is None
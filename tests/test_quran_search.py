@@ -0,0 +1,38 @@
+from db.database import content_writer
+from db.models import init_db, normalize_ayat
+from services import complete_quran_service, quran_search
+
+
+def load_ayat(rows):
+    with content_writer() as conn:
+        conn.executemany("INSERT OR REPLACE INTO ayat (id, ref, text) VALUES (?, ?, ?)", rows)
+        normalize_ayat(conn)
+
+
+def test_ranked_search_pages_through_every_match(temp_db):
+    init_db()
+    load_ayat([(str(n), f"1:{n}", f"الحمد لله {'رب ' * (n % 3)}العالمين") for n in range(1, 13)])
+    load_ayat([("13", "2:1", "ذلك الكتاب لا ريب فيه"), ("5", "1:5", "رب رب رب رب")])
+
+    seen, after, pages = [], None, 0
+    while True:
+        page = quran_search.search_page("رب", after, limit=3)
+        if after is None:
+            total = page["total"]
+        seen += [r["id"] for r in page["results"]]
+        ranks = [r["rank"] for r in page["results"]]
+        assert ranks == sorted(ranks)
+        pages += 1
+        after = page["next"]
+        if after is None:
+            break
+
+    # INSERT OR REPLACE kept the index in sync: ayah 5 matches with its new text
+    assert len(seen) == len(set(seen)) == total == 8 and pages == 3
+    assert seen[0] == "5"
+    assert "**رب**" in quran_search.search_page("رب")["results"][0]["snippet"]
+
+    # Word prefixes match, FTS5 syntax in user input is searched literally
+    assert [r["id"] for r in complete_quran_service.search_in_quran("الكت")["results"]] == ["13"]
+    assert complete_quran_service.search_in_quran('"لا" OR (ريب')["results"] == []
+    assert quran_search.search_page("   ") == {"results": [], "total": 0, "next": None}
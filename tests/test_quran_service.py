@@ -0,0 +1,25 @@
+from db.database import content_writer
+from db.models import init_db
+from services import quran_service
+
+
+def test_each_scope_cycles_through_every_ayah_without_repeats(temp_db):
+    init_db()
+    with content_writer() as conn:
+        conn.executemany("INSERT INTO ayat (id, ref, text) VALUES (?, ?, ?)",
+                         [(str(n), f"ref {n}", f"ayah {n}") for n in range(1, 21)])
+
+    channel = quran_service.channel_scope(42)
+    first_cycle = [int(quran_service.get_random_ayah(channel)["id"]) for _ in range(20)]
+    assert sorted(first_cycle) == list(range(1, 21))
+
+    # Other scopes keep their own cursor
+    assert quran_service.get_random_ayah()["text"].startswith("ayah ")
+    row = temp_db.execute("SELECT cursor, cycle FROM ayah_rotation WHERE scope = ?", (channel,)).fetchone()
+    assert tuple(row) == (20, 1)
+
+    second_cycle = [quran_service.next_ayah_number(channel) for _ in range(20)]
+    assert sorted(second_cycle) == list(range(1, 21))
+    assert second_cycle[0] != first_cycle[-1]
+    assert temp_db.execute("SELECT cycle FROM ayah_rotation WHERE scope = ?", (channel,)).fetchone()[0] == 2
+    assert temp_db.execute("SELECT COUNT(*) FROM ayah_rotation").fetchone()[0] == 2
@@ -0,0 +1,37 @@
+from db.database import content_writer
+from db.models import init_db, normalize_ayat
+from services import quran_similar
+
+
+def test_minhash_estimates_jaccard():
+    words = [f"w{i}" for i in range(60)]
+    a = quran_similar.shingles(" ".join(words))
+    b = quran_similar.shingles(" ".join(words[:45] + ["x", "y", "z"]))
+    assert quran_similar.shingles("الله") == {"الله"}
+    assert abs(quran_similar.jaccard(a, b) - 44 / 62) < 1e-9
+
+    signatures = quran_similar.minhash_signatures([a, b, a])
+    assert (signatures[0] == signatures[2]).all()
+    assert abs((signatures[0] == signatures[1]).mean() - 44 / 62) < 0.15
+    assert (0, 2) in quran_similar.candidate_pairs(signatures)
+
+
+def test_similar_ayat_graph(temp_db):
+    init_db()
+    with content_writer() as conn:
+        conn.executemany("INSERT INTO ayat (id, ref, text) VALUES (?, ?, ?)", [
+            # 2:48 and 2:123 differ in two words
+            ("55", "2:48", "وَٱتَّقُوا۟ يَوْمًا لَّا تَجْزِى نَفْسٌ عَن نَّفْسٍ شَيْـًٔا "
+                           "وَلَا يُقْبَلُ مِنْهَا شَفَـٰعَةٌ وَلَا يُؤْخَذُ مِنْهَا عَدْلٌ وَلَا هُمْ يُنصَرُونَ"),
+            ("130", "2:123", "وَٱتَّقُوا۟ يَوْمًا لَّا تَجْزِى نَفْسٌ عَن نَّفْسٍ شَيْـًٔا "
+                             "وَلَا يُقْبَلُ مِنْهَا عَدْلٌ وَلَا تَنفَعُهَا شَفَـٰعَةٌ وَلَا هُمْ يُنصَرُونَ"),
+            ("6222", "112:1", "قُلْ هُوَ ٱللَّهُ أَحَدٌ"),
+        ])
+        normalize_ayat(conn)
+        assert quran_similar.build_similar_index(conn) == 1
+
+    (match,) = quran_similar.similar_ayat(2, 48)
+    assert (match["surah"], match["ayah"], match["ref"]) == (2, 123, "2:123")
+    assert 0.5 <= match["score"] < 1
+    assert quran_similar.similar_ayat(2, 123)[0]["number"] == 55
+    assert quran_similar.similar_ayat(112, 1) == []
@@ -0,0 +1,79 @@
+from db.database import content_writer
+from db.models import init_db, normalize_ayat
+from services import quran_search, quran_spelling
+from services.quran_concordance import build_concordance
+from services.quran_spelling import SpellingIndex, edit_distance, max_distance_for
+
+
+def test_edit_distance_counts_transpositions_once():
+    assert edit_distance("الرحمن", "الرحمن", 2) == 0
+    assert edit_distance("الرحمن", "الرمحن", 2) == 1
+    assert edit_distance("كتاب", "كتب", 2) == 1
+    assert edit_distance("كتاب", "مسجد", 2) == 3
+
+
+def test_suggestions_rank_by_distance_then_frequency():
+    index = SpellingIndex({"الرحمن": 57, "الرحيم": 115, "رحيم": 81, "الكتاب": 230, "الكتابه": 1})
+    assert index.suggest("الرحمن") == [("الرحمن", 0, 57)]
+    # Both one edit away: the commoner word first
+    assert [s[0] for s in index.suggest("الرحمم")] == ["الرحيم", "الرحمن"]
+    # Two edits from الرحيم, more than a 6-letter word allows
+    assert [s[0] for s in index.suggest("الرحمق")] == ["الرحمن"]
+    assert index.suggest("الكتاب")[0][1] == 0
+    assert index.suggest("مسجد") == []
+    # Only words past PREFIX_LENGTH differ: still found through the full-word check
+    assert index.suggest("الكتابة")[0][:2] == ("الكتاب", 1)
+    assert index.corrections("الرحمم الكتاب") == ["الرحيم الكتاب", "الرحمن الكتاب"]
+    assert index.corrections("الرحمن") == []
+
+
+def test_search_retries_with_the_top_correction(temp_db):
+    init_db()
+    with content_writer() as conn:
+        conn.executemany("INSERT INTO ayat (id, ref, text) VALUES (?, ?, ?)", [
+            ("1", "1:1", "بِسْمِ ٱللَّهِ ٱلرَّحْمَٰنِ ٱلرَّحِيمِ"),
+            ("2", "1:2", "ٱلْحَمْدُ لِلَّهِ رَبِّ ٱلْعَٰلَمِينَ"),
+        ])
+        normalize_ayat(conn)
+        build_concordance(conn)
+
+    # The Uthmani spelling has no alef where users write one
+    page = quran_search.search_page("العالمين", mode="phrase")
+    assert page["corrected"] == "العلمين" and page["total"] == 1
+    page = quran_search.search_page("الحمدد لله", mode="phrase")
+    assert page["corrected"] == "الحمد لله" and [r["id"] for r in page["results"]] == ["2"]
+    assert "corrected" not in quran_search.search_page("الحمد")
+
+
+def test_short_and_non_arabic_words_are_left_alone():
+    index = SpellingIndex({"من": 3226, "قوم": 383, "الصبر": 14, "صبر": 5, "ما": 2000, "هو": 500})
+    # Up to 3 letters only exact matches count, and "" is never a key
+    assert "" not in index._deletes
+    assert index.suggest("صوم") == [] and index.suggest("هي") == []
+    assert index.corrections("صوم") == []
+    # Non-Arabic words never turn into Arabic ones
+    assert index.suggest("is") == []
+    assert index.corrections("what is patience") == []
+    assert index.corrections("what is الصبرر") == ["what is الصبر"]
+    # 4-6 letters allow one edit: الصوم is two away from الصبر
+    assert index.suggest("الصوم") == []
+    assert max_distance_for("كتاب") == 1 and max_distance_for("الكتابة") == 2
+
+
+def test_autocorrect_only_fixes_unambiguous_arabic_typos(temp_db):
+    init_db()
+    with content_writer() as conn:
+        conn.executemany("INSERT INTO ayat (id, ref, text) VALUES (?, ?, ?)", [
+            ("1", "1:1", "بِسْمِ ٱللَّهِ ٱلرَّحْمَٰنِ ٱلرَّحِيمِ"),
+            ("2", "1:2", "ٱلْحَمْدُ لِلَّهِ رَبِّ ٱلْعَٰلَمِينَ"),
+        ])
+        normalize_ayat(conn)
+        build_concordance(conn)
+
+    assert quran_spelling.autocorrect_query("الحمدد لله") == "الحمد لله"
+    # Known words, short words and English are searched as typed
+    for query in ("الحمد لله", "صوم", "what is patience"):
+        assert quran_spelling.autocorrect_query(query) is None
+    # الرحمم is one edit from both الرحمن and الرحيم: a hint, not a fix
+    assert quran_spelling.autocorrect_query("الرحمم") is None
+    assert len(quran_spelling.suggest_queries("الرحمم")) == 2
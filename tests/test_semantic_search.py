@@ -0,0 +1,143 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from db.database import content_writer
+from db.models import init_db
+from services import embeddings_service, semantic_search
+from services.embeddings_service import model, store_embedding
+
+
+def test_vector_index_top_k_matches_full_sort():
+    rng = np.random.default_rng(7)
+    vectors = rng.normal(size=(500, 32))
+    index = semantic_search.VectorIndex([str(i) for i in range(500)], [None] * 500, [None] * 500, vectors)
+    assert np.allclose(np.linalg.norm(index.matrix, axis=1), 1)
+
+    query = rng.normal(size=32)
+    cosine = vectors @ query / (np.linalg.norm(vectors, axis=1) * np.linalg.norm(query))
+    found = index.search(query, 10)
+    assert [row for row, _ in found] == list(np.argsort(-cosine)[:10])
+    assert np.allclose([score for _, score in found], np.sort(cosine)[::-1][:10], atol=1e-5)
+
+    assert len(index.search(query, 1000)) == 500
+    assert index.search(np.zeros(32)) == [] and index.search(np.ones(8)) == []
+
+
+def test_semantic_search_returns_ayat(temp_db):
+    init_db()
+    texts = {
+        "1": "بِسْمِ ٱللَّهِ ٱلرَّحْمَٰنِ ٱلرَّحِيمِ",
+        "2": "ٱلْحَمْدُ لِلَّهِ رَبِّ ٱلْعَٰلَمِينَ",
+        "6222": "قُلْ هُوَ ٱللَّهُ أَحَدٌ",
+    }
+    with content_writer() as conn:
+        conn.executemany("INSERT INTO ayat (id, ref, text) VALUES (?, ?, ?)", [
+            (ayah_id, f"ref {ayah_id}", text) for ayah_id, text in texts.items()
+        ])
+        for ayah_id, text in texts.items():
+            store_embedding(ayah_id, text, conn)
+
+    results = semantic_search.semantic_search(texts["2"], limit=2)
+    assert len(results) == 2
+    assert (results[0]["id"], results[0]["ref"], results[0]["text"]) == ("2", "ref 2", texts["2"])
+    assert results[0]["score"] > results[1]["score"]
+    assert semantic_search.get_vector_index().dimensions == len(model.encode("x"))
+
+
+def test_empty_embeddings_table_gives_an_empty_index(temp_db):
+    init_db()
+    index = semantic_search.load_vector_index()
+    assert len(index) == 0 and index.matrix.shape == (0, len(model.encode("x")))
+    assert semantic_search.semantic_search("بسم الله") == []
+    assert semantic_search.get_vector_index() is semantic_search.get_vector_index()
+
+
+def test_pickled_rows_convert_and_sidecar_is_memory_mapped(temp_db):
+    init_db()
+    texts = {str(i): f"نص رقم {i}" for i in range(1, 9)}
+    with content_writer() as conn:
+        conn.executemany("INSERT INTO embeddings (ref_id, vector, text) VALUES (?, ?, ?)", [
+            (ayah_id, pickle.dumps(model.encode(text)), text) for ayah_id, text in texts.items()
+        ])
+        assert embeddings_service.convert_pickled_embeddings(conn) == 8
+        assert embeddings_service.convert_pickled_embeddings(conn) == 0
+        blob = conn.execute("SELECT vector FROM embeddings WHERE ref_id = '3'").fetchone()[0]
+    assert np.array_equal(embeddings_service.decode_vector(blob), model.encode(texts["3"]))
+
+    from_blobs = semantic_search.load_vector_index()
+    assert embeddings_service.export_embeddings() == 8
+    mapped = semantic_search.load_vector_index()
+    assert isinstance(mapped.matrix, np.memmap) and mapped.ids == from_blobs.ids
+    assert np.allclose(mapped.matrix, from_blobs.matrix)
+    assert mapped.search(model.encode(texts["5"]), 1)[0][0] == mapped.ids.index("5")
+
+    # A re-embedded table no longer matches the sidecar
+    store_embedding("9", "نص جديد")
+    assert not isinstance(semantic_search.load_vector_index().matrix, np.memmap)
+
+
+def test_generate_embeddings_resumes_after_interruption(temp_db):
+    init_db()
+    with content_writer() as conn:
+        conn.executemany("INSERT INTO ayat (id, ref, text) VALUES (?, ?, ?)", [
+            (str(n), f"ref {n}", f"نص رقم {n}") for n in range(1, 11)
+        ])
+
+    def interrupt(message):
+        raise KeyboardInterrupt
+
+    # The first chunk of 4 is committed with its checkpoint before the interruption
+    with pytest.raises(KeyboardInterrupt):
+        embeddings_service.generate_embeddings(batch_size=3, chunk_size=4, report=interrupt)
+    with content_writer() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0] == 4
+        assert conn.execute("SELECT last_ayah FROM embedding_progress").fetchone()[0] == 4
+
+    reports = []
+    stats = embeddings_service.generate_embeddings(batch_size=3, chunk_size=4, report=reports.append)
+    assert (stats["embedded"], stats["resumed_after"]) == (6, 4) and stats["rate"] > 0
+    assert reports[-1].startswith("   … 6/6 verses")
+    assert embeddings_service.generate_embeddings()["embedded"] == 0
+
+    index = semantic_search.load_vector_index()
+    assert len(index) == 10
+    assert index.search(model.encode("نص رقم 7"), 1)[0][0] == index.ids.index("7")
+
+
+def test_quantize_round_trip():
+    matrix = np.random.default_rng(5).normal(size=(200, 16)).astype(np.float32)
+    codes, scale, offset = embeddings_service.quantize(matrix)
+    assert codes.dtype == np.int8 and codes.min() == -128 and codes.max() == 127
+    error = np.abs(embeddings_service.dequantize(codes, scale, offset) - matrix)
+    assert (error <= scale / 2 + 1e-6).all()
+
+
+def test_int8_mode_reranks_with_float_vectors(temp_db, monkeypatch):
+    init_db()
+    with content_writer() as conn:
+        conn.executemany("INSERT INTO ayat (id, ref, text) VALUES (?, ?, ?)", [
+            (str(n), f"ref {n}", f"نص رقم {n}") for n in range(1, 31)
+        ])
+    embeddings_service.generate_embeddings(report=lambda message: None)
+    monkeypatch.setattr(semantic_search, "EMBEDDINGS_MODE", "int8")
+    # Not quantized yet: float32 fallback
+    assert isinstance(semantic_search.load_vector_index(), semantic_search.VectorIndex)
+
+    with content_writer() as conn:
+        assert embeddings_service.quantize_embeddings(conn) == 30
+    exact = semantic_search.load_vectors()
+    query = model.encode("نص رقم 17")
+    expected = exact.search(query, 3)
+
+    from_blobs = semantic_search.load_vector_index()
+    assert isinstance(from_blobs, semantic_search.QuantizedIndex)
+    assert from_blobs.memory_bytes < exact.memory_bytes / 3
+    embeddings_service.export_embeddings()
+    from_sidecar = semantic_search.load_vector_index()
+    for index in (from_blobs, from_sidecar):
+        found = index.search(query, 3)
+        assert [row for row, _ in found] == [row for row, _ in expected]
+        assert np.allclose([score for _, score in found], [score for _, score in expected], atol=1e-5)
+    assert semantic_search.semantic_search("نص رقم 17", limit=1)[0]["id"] == "17"
@@ -0,0 +1,94 @@
+import os
+
+import pytest
+
+import db.storage as storage
+from db.models import init_db
+from db.rollups import rebuild_rollups
+from services import favorites_service, tracking_service
+
+# PostgreSQL runs only against a throwaway database, e.g.
+#   TEST_DATABASE_URL=postgresql://postgres@localhost/islamic_bot_test pytest
+BACKENDS = ["sqlite"] + (["postgresql"] if os.getenv("TEST_DATABASE_URL") else [])
+
+SHARED_TABLES = (
+    "favorites", "scheduled_azkar", "qada_prayers", "prayer_tracking", "tasbeeh_tracking",
+    "quran_reading", "fasting_tracking", "prayer_daily", "tasbeeh_daily", "quran_daily",
+)
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request, temp_db, monkeypatch):
+    if request.param == "sqlite":
+        init_db()
+        store = storage.SQLiteStorage()
+    else:
+        store = storage.PostgresStorage(os.environ["TEST_DATABASE_URL"])
+        store.init_schema()
+        with store.transaction() as conn:
+            conn.execute(f"TRUNCATE {', '.join(SHARED_TABLES)} RESTART IDENTITY")
+    monkeypatch.setattr(storage, "_storage", store)
+    yield store
+    tracking_service.flush_tracking_writes()
+    store.close()
+
+
+def test_create_storage_from_url():
+    assert isinstance(storage.create_storage(""), storage.SQLiteStorage)
+    with pytest.raises(ValueError):
+        storage.create_storage("mysql://localhost/bot")
+
+
+def test_placeholders_are_rewritten_for_postgres():
+    assert storage._to_pyformat("SELECT 1 WHERE a = ? AND b LIKE '5%'") == "SELECT 1 WHERE a = %s AND b LIKE '5%%'"
+
+
+def test_tracking_round_trip(backend):
+    for _ in range(2):
+        tracking_service.track_prayer("1459564811183591686", "fajr")
+    tracking_service.track_tasbeeh("1459564811183591686", "الحمد لله", 33)
+    tracking_service.track_quran_reading("1459564811183591686", 18, 10)
+    tracking_service.track_fasting("1459564811183591686", date="2026-03-01")
+    tracking_service.track_fasting("1459564811183591686", date="2026-03-01", status="missed")
+
+    assert tracking_service.get_prayer_stats("1459564811183591686") == {"fajr": {"completed": 2}}
+    assert tracking_service.get_tasbeeh_stats("1459564811183591686") == {"الحمد لله": 33}
+    assert tracking_service.get_quran_reading_stats("1459564811183591686") == {
+        "total_verses": 10, "surahs_read": 1, "days_read": 1
+    }
+    assert tracking_service.get_fasting_stats("1459564811183591686", 2026) == {"missed": 1}
+
+    assert rebuild_rollups() == {"prayer_daily": 1, "tasbeeh_daily": 1, "quran_daily": 1}
+    assert tracking_service.get_prayer_stats("1459564811183591686") == {"fajr": {"completed": 2}}
+
+
+def test_qada_prayers(backend):
+    tracking_service.track_qada_prayers("7", "asr", count=2)
+    assert tracking_service.mark_qada_completed("7", "asr")
+    assert tracking_service.get_qada_count("7") == {"asr": 1}
+    assert tracking_service.mark_qada_completed("7", "asr")
+    assert tracking_service.get_qada_count("7") == {}
+    assert not tracking_service.mark_qada_completed("7", "asr")
+
+
+def test_favorites(backend):
+    assert favorites_service.add_favorite("7", "ayah", "255")
+    assert not favorites_service.add_favorite("7", "ayah", "255")
+    assert favorites_service.is_favorite("7", "ayah", "255")
+    assert [(f["item_type"], f["item_id"]) for f in favorites_service.get_user_favorites("7")] == [("ayah", "255")]
+    assert favorites_service.remove_favorite("7", "ayah", "255")
+    assert not favorites_service.is_favorite("7", "ayah", "255")
+
+
+def test_channel_subscriptions(backend):
+    scheduled_azkar_service = pytest.importorskip("services.scheduled_azkar_service")
+    hourly_messages_service = pytest.importorskip("services.hourly_messages_service")
+
+    assert scheduled_azkar_service.toggle_scheduled_azkar("1", "10", "morning")
+    assert hourly_messages_service.toggle_hourly_messages("1", "11")
+    assert scheduled_azkar_service.get_scheduled_channels("morning") == ["10"]
+    assert hourly_messages_service.get_hourly_message_channels() == ["11"]
+    assert len(scheduled_azkar_service.get_active_schedules()) == 2
+
+    assert not hourly_messages_service.toggle_hourly_messages("1", "11")
+    assert hourly_messages_service.get_hourly_message_channels() == []
@@ -0,0 +1,121 @@
+import time
+
+from db.models import init_db
+from db.rollups import rebuild_rollups
+from db.storage import transaction
+from services import tracking_service
+
+
+def test_stats_see_buffered_writes_and_match_rebuilt_rollups(temp_db):
+    init_db()
+
+    for _ in range(3):
+        tracking_service.track_prayer("42", "fajr")
+    tracking_service.track_prayer("42", "isha", status="missed")
+    tracking_service.track_tasbeeh("42", "سبحان الله", 33)
+    tracking_service.track_tasbeeh("42", "سبحان الله", 10)
+    tracking_service.track_quran_reading("42", 2, 20)
+    tracking_service.track_quran_reading("42", 3, 5)
+
+    # Read straight after the writes, before the background flush runs
+    prayers = tracking_service.get_prayer_stats("42")
+    tasbeeh = tracking_service.get_tasbeeh_stats("42")
+    quran = tracking_service.get_quran_reading_stats("42")
+
+    assert prayers == {"fajr": {"completed": 3}, "isha": {"missed": 1}}
+    assert tasbeeh == {"سبحان الله": 43}
+    assert quran == {"total_verses": 25, "surahs_read": 2, "days_read": 1}
+
+    rebuild_rollups()
+    assert tracking_service.get_prayer_stats("42") == prayers
+    assert tracking_service.get_tasbeeh_stats("42") == tasbeeh
+    assert tracking_service.get_quran_reading_stats("42") == quran
+
+
+def test_fasting_stats_filter_by_year_and_replace_same_day(temp_db):
+    init_db()
+
+    tracking_service.track_fasting("42", date="2025-12-31")
+    tracking_service.track_fasting("42", date="2026-01-01")
+    tracking_service.track_fasting("42", date="2026-01-01", status="missed")
+    tracking_service.track_fasting("42", date="2026-12-31")
+
+    assert tracking_service.get_fasting_stats("42", 2026) == {"missed": 1, "fasted": 1}
+    assert tracking_service.get_fasting_stats("42", 2025) == {"fasted": 1}
+
+
+def _prayer_rows():
+    with transaction() as conn:
+        return conn.execute("SELECT COUNT(*) FROM prayer_tracking").fetchone()[0]
+
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def _prayer_event(user_id):
+    return ("INSERT INTO prayer_tracking (user_id, prayer_name, status, day) VALUES (?, 'fajr', 'completed', ?)",
+            (user_id, tracking_service.day_number()))
+
+
+def test_buffer_flushes_after_the_interval(temp_db):
+    init_db()
+    buffer = tracking_service.WriteBehindBuffer(interval_ms=50, max_rows=100)
+    buffer.add(1, _prayer_event(1))
+    assert _prayer_rows() == 0
+    assert _wait_for(lambda: _prayer_rows() == 1)
+    buffer.close()
+
+
+def test_buffer_flushes_early_at_max_rows(temp_db):
+    init_db()
+    buffer = tracking_service.WriteBehindBuffer(interval_ms=60_000, max_rows=3)
+    buffer.add(1, _prayer_event(1))
+    buffer.add(1, _prayer_event(1))
+    time.sleep(0.05)
+    assert _prayer_rows() == 0
+    buffer.add(1, _prayer_event(1))
+    assert _wait_for(lambda: _prayer_rows() == 3)
+    buffer.close()
+
+
+def test_buffer_flushes_inline_at_its_limit(temp_db):
+    init_db()
+    buffer = tracking_service.WriteBehindBuffer(interval_ms=60_000, max_rows=100, limit=2)
+    buffer.add(1, _prayer_event(1))
+    buffer.add(1, _prayer_event(1))
+    assert _prayer_rows() == 2
+    buffer.close()
+
+
+def test_buffer_close_flushes_and_then_writes_through(temp_db):
+    init_db()
+    buffer = tracking_service.WriteBehindBuffer(interval_ms=60_000, max_rows=100)
+    buffer.add(1, _prayer_event(1))
+    buffer.add(2, _prayer_event(2))
+    buffer.close()
+    assert _prayer_rows() == 2
+    buffer.add(3, _prayer_event(3))
+    assert _prayer_rows() == 3
+
+
+def test_failed_event_is_dropped_without_losing_the_others(temp_db):
+    init_db()
+    buffer = tracking_service.WriteBehindBuffer(interval_ms=60_000, max_rows=100)
+    # prayer_daily.prayer_name is NOT NULL
+    buffer.add(1, _prayer_event(1), ("INSERT INTO prayer_daily (user_id, day, prayer_name, status, count) "
+                                     "VALUES (1, 0, NULL, 'completed', 1)", ()))
+    buffer.add(2, _prayer_event(2))
+    assert buffer.flush() == 1
+    assert _prayer_rows() == 1
+    buffer.add(3, _prayer_event(3))
+    assert buffer.flush() == 1
+    buffer.close()
+
+    # Through the module buffer, as the bot uses it
+    assert tracking_service.track_prayer("1", None)
+    assert tracking_service.track_prayer("2", "fajr")
+    assert tracking_service.get_prayer_stats("2") == {"fajr": {"completed": 1}}
@@ -3,10 +3,11 @@ Web Server for keeping the bot alive on Render
 This Flask app provides a health check endpoint
 """
 
-from flask import Flask, jsonify, render_template_string
+from flask import Flask, jsonify, render_template_string, request
 import threading
 import logging
 from datetime import datetime
+from db.query_stats import query_stats, get_query_stats, get_slow_queries
 
 # Disable Flask's default logging to avoid cluttering the bot logs
 log = logging.getLogger('werkzeug')
@@ -276,6 +277,19 @@ def api_stats():
         "timestamp": datetime.now().isoformat()
     })
 
+@app.route('/api/db/queries')
+def api_db_queries():
+    """Per-statement database timings (enable with DB_QUERY_STATS=1)"""
+    limit = request.args.get('limit', default=50, type=int)
+    return jsonify({
+        "status": "success",
+        "enabled": query_stats.enabled,
+        "slow_query_ms": query_stats.slow_query_ms,
+        "data": get_query_stats(limit),
+        "slow_queries": get_slow_queries(),
+        "timestamp": datetime.now().isoformat()
+    })
+
 def update_bot_status(status, commands=0, guilds=0):
     """Update bot status from the main bot"""
     bot_status["status"] = status